@@ -1,16 +1,38 @@
+import numpy as np
 import pandas as pd
-
+from snapshot import load_or_build
+from spatial_index import SpatialIndex
+from profiling import profiled
+from dtypes import compact, share_id_categories
+from tables import read_table, read_visit_area
+import metrics
+
+# 숙박 데이터 스냅샷의 원본 파일
+LODGING_SOURCE_FILES = [
+    'data/tn_visit_area_info_방문지정보2nd.csv',
+    'data/tn_travel_여행.csv',
+    'data/tn_traveller_master_여행객 Master.csv',
+]
+
+# 운영 지표 (result: found 반경 안에 숙소 있음, empty 없음)
+LODGING_RESULTS = metrics.counter('travel_lodging_results_total', "숙소 추천 결과별 횟수", ['result'])
+
+@profiled()
 def load_data():
-    lodging_data= pd.read_csv('data/tn_visit_area_info_방문지정보2nd.csv')
-    lodging_data= lodging_data[lodging_data['VISIT_AREA_TYPE_CD'] == 24]
+    # 숙박(VISIT_AREA_TYPE_CD == 24) 행만 나눠 읽은 방문지 데이터
+    lodging_data= read_visit_area('lodging')
 
     # 숙박일수를 통해 같은 이름의 숙박 업소가 여러번 나오더라도 실제 숙박 일수를 알아내기 위해 추가
     lodging_data['VISIT_START_YMD'] = pd.to_datetime(lodging_data['VISIT_START_YMD'])
     lodging_data['VISIT_END_YMD'] = pd.to_datetime(lodging_data['VISIT_END_YMD'])
     lodging_data['SLEEP'] = (lodging_data['VISIT_END_YMD'] - lodging_data['VISIT_START_YMD']).dt.days
 
-    tv = pd.read_csv('data/tn_travel_여행.csv', encoding='ANSI')
-    tm = pd.read_csv('data/tn_traveller_master_여행객 Master.csv', encoding='ANSI')
+    tv = read_table('travel')
+    tm = read_table('traveller_master')
+    # 왼쪽 병합이므로 숙박 기록이 있는 여행/여행객만 남겨 공통 ID 범주를 작게 유지
+    tv = tv[tv['TRAVEL_ID'].isin(lodging_data['TRAVEL_ID'])]
+    tm = tm[tm['TRAVELER_ID'].isin(tv['TRAVELER_ID'])]
+    share_id_categories([lodging_data, tv, tm])
 
     lodging_data = pd.merge(lodging_data, tv[['TRAVEL_ID', 'TRAVELER_ID', 'MVMN_NM']], on='TRAVEL_ID', how='left')
     lodging_data = pd.merge(lodging_data, tm[['TRAVELER_ID','TRAVEL_STATUS_ACCOMPANY']], on='TRAVELER_ID', how='left')
@@ -18,6 +40,7 @@ def load_data():
     
     return lodging_data
 
+@profiled()
 def load_lodging_data():
     lodging_data = load_data()
 
@@ -66,33 +89,65 @@ def load_lodging_data():
 
     grouped_lodgings = grouped_lodgings[~grouped_lodgings['Y_COORD'].isna()]
 
-    return grouped_lodgings
-
-import math
-
-# X = 경도 / y = 위도
-def haversine(lat1, lon1, lat2, lon2): 
-    # 지구의 반지름 (킬로미터 단위)
-    R = 6371.0
-    
-    # 위도와 경도를 라디안 단위로 변환
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # 위도와 경도의 차이 계산
-    delta_lat = lat2_rad - lat1_rad
-    delta_lon = lon2_rad - lon1_rad
-    
-    # 하버사인 공식 적용
-    a = math.sin(delta_lat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    # 거리 계산
-    distance = R * c
-    
-    return distance
+    return compact(grouped_lodgings)
+
+class LodgingIndex:
+    """
+    숙박 추천 엔진.
+    그룹화된 숙박 데이터(grouped_lodgings)를 한 번만 만들고, 이동수단/가족 비율을 배열로 미리 계산해 두며,
+    좌표 공간 인덱스로 반경 내 후보를 찾은 뒤 FINAL_SCORE를 한 번의 배열 연산으로 계산합니다.
+    """
+
+    def __init__(self, grouped_lodgings):
+        self.data = grouped_lodgings.reset_index(drop=True)
+
+        total = self.data['TOTAL_COUNT'].to_numpy(dtype=np.float64)
+        sum_mvmn = self.data['SUM_MVMN_TYPE'].to_numpy(dtype=np.float64)
+        sum_family = self.data['SUM_FAMILY_TPYE'].to_numpy(dtype=np.float64)
+
+        self.avg_score = self.data['AVG_SCORE'].to_numpy(dtype=np.float64)
+        # [자가용 비율, 대중교통 비율], [비가족 비율, 가족 비율] - 사용자 유형(0/1)으로 바로 선택
+        self.mvmn_ratio = np.stack([(total - sum_mvmn) / total, sum_mvmn / total])
+        self.family_ratio = np.stack([(total - sum_family) / total, sum_family / total])
+
+        self.index = SpatialIndex(self.data['Y_COORD'].values, self.data['X_COORD'].values)
+
+    def score(self, positions, n_mvmn, n_family):
+        """
+        후보 위치들의 FINAL_SCORE (평균 점수 + 이동수단 비율 * 0.5 + 가족 비율 * 0.5)
+        """
+        return (
+            self.avg_score[positions]
+            + self.mvmn_ratio[n_mvmn][positions] * 0.5
+            + self.family_ratio[n_family][positions] * 0.5
+        )
+
+    def query(self, x_coord, y_coord, boundary, mvmn, family, top_k=1):
+        """
+        (x_coord, y_coord) 반경 boundary km 이내 숙소 중 FINAL_SCORE 상위 top_k개를 반환합니다.
+        """
+        n_mvmn = 0 if (mvmn == '자가용') else 1
+        n_family = accompany_mapping[family]
+
+        positions, distances = self.index.query_radius(y_coord, x_coord, boundary)
+
+        filtered_df = self.data.iloc[positions].copy()
+        filtered_df['DISTANCE'] = distances
+        filtered_df['FINAL_SCORE'] = self.score(positions, n_mvmn, n_family)
+        return filtered_df.sort_values(['FINAL_SCORE'], ascending=False).head(top_k)
+
+# 숙박 추천 엔진 캐시 (스냅샷이 바뀌면 다시 생성)
+_lodging_index = {'source': None, 'index': None}
+
+def get_lodging_index():
+    """
+    숙박 추천 엔진(LodgingIndex)을 반환합니다. 원본 CSV가 바뀐 경우에만 다시 만듭니다.
+    """
+    df = load_or_build('lodging', LODGING_SOURCE_FILES, load_lodging_data)
+    if _lodging_index['source'] is not df:
+        _lodging_index['index'] = LodgingIndex(df)
+        _lodging_index['source'] = df
+    return _lodging_index['index']
 
 # 가족 여행 횟수만 세서 나중에 보정해주기 
 # 가족 여행 횟수 / 전체 여행 횟수 => 이 비율에 따라 가족 여행인지 아닌지에 따라 추가 점수 주기 
@@ -126,29 +181,11 @@ simple_category_mapping = {
     '기타' : '기타'
 }
 
-def get_lodging_score_result(x_coord, y_coord, boundary, mvmn, family):
-    df = load_lodging_data()
-
-    n_mvmn = 0 if (mvmn == '자가용') else 1
-    n_family = accompany_mapping[family]
-
-    #거리 측정
-    df['DISTANCE'] = df.apply(
-        lambda row: haversine(y_coord, x_coord, row['Y_COORD'], row['X_COORD']),
-        axis=1
-    )
-    
-    filtered_df = df[df['DISTANCE'] <= boundary]
-
-    #점수 가산
-    filtered_df = filtered_df.copy() 
-    filtered_df.loc[:, 'FINAL_SCORE'] = filtered_df.apply(
-        lambda row: row['AVG_SCORE'] 
-        + ((row['SUM_MVMN_TYPE'] / row['TOTAL_COUNT']) if n_mvmn == 1 else ((row['TOTAL_COUNT'] - row['SUM_MVMN_TYPE']) / row['TOTAL_COUNT'])) * 0.5
-        + ((row['SUM_FAMILY_TPYE'] / row['TOTAL_COUNT']) if n_family == 1 else ((row['TOTAL_COUNT'] - row['SUM_FAMILY_TPYE']) / row['TOTAL_COUNT'])) * 0.5
-        , axis=1
-    )
-    return filtered_df.sort_values(['FINAL_SCORE'], ascending=False).head(1)
+@profiled()
+def get_lodging_score_result(x_coord, y_coord, boundary, mvmn, family, top_k=1):
+    result = get_lodging_index().query(x_coord, y_coord, boundary, mvmn, family, top_k=top_k)
+    LODGING_RESULTS.inc(result='empty' if result.empty else 'found')
+    return result
 
 # # 예제 코드 
 # test_case = get_lodging_score_result(126.915684, 33.501715, 3, '기차', '자녀 동반 여행')
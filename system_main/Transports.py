@@ -0,0 +1,491 @@
+import numpy as np
+import pandas as pd
+from geo import haversine_one_to_many
+from snapshot import load_or_build
+from spatial_index import SpatialIndex
+from profiling import profiled
+from tables import load_csv, read_visit_area
+
+# Define mappings
+category_mapping = {
+    1: '자가용(승용/승합/트럭 등등)',
+    2: '렌터카(승용/승합/버스 등등)',
+    3: '캠핑카(자차 및 렌탈)',
+    4: '택시',
+    5: '지하철',
+    6: '고속전철(ITX 등)',
+    7: 'KTX/SRT(고속열차)',
+    8: '새마을/무궁화열차',
+    9: '항공기',
+    10: '배/선박',
+    11: '관광버스',
+    12: '시외/고속버스',
+    13: '시내/마을버스',
+    14: '자전거',
+    15: '도보',
+    16: '기타',
+    50: '버스 + 지하철'
+}
+
+transport_priority = {
+    '자가용(승용/승합/트럭 등등)' : 4,
+    '렌터카(승용/승합/버스 등등)' : 3,
+    '캠핑카(자차 및 렌탈)' : 3,
+    '택시' : 2,
+    '지하철' : 1,
+    '고속전철(ITX 등)' : 4,
+    'KTX/SRT(고속열차)' : 4,
+    '새마을/무궁화열차' : 4,
+    '항공기' : 10,
+    '배/선박' : 4,
+    '관광버스' : 3,
+    '시외/고속버스' : 3,
+    '시내/마을버스' : 1,
+    '자전거' : 1,
+    '도보' : 0.1,
+    '기타' : 0.01,
+    '출발' : 0
+}
+
+
+# 1. 하버사인 거리 계산은 geo 모듈의 벡터화 함수를 사용
+
+# 2. START와 END 조건 추가
+def add_start_end_flags(df, boundary, input_coords):
+    df['START_DISTANCE'] = haversine_one_to_many(
+        input_coords['PREV_Y_COORD'], input_coords['PREV_X_COORD'], df['Y_COORD'], df['X_COORD']
+    )
+    df['END_DISTANCE'] = haversine_one_to_many(
+        input_coords['Y_COORD'], input_coords['X_COORD'], df['Y_COORD'], df['X_COORD']
+    )
+    df['START'] = df['START_DISTANCE'] <= boundary
+    df['END'] = df['END_DISTANCE'] <= boundary
+    return df
+
+# 3. 가능한 경로 생성
+def generate_possible_routes(temp):
+    start_points = temp[temp['START']][['TRAVEL_ID', 'VISIT_AREA_ID', 'START_DISTANCE']].rename(
+        columns={'VISIT_AREA_ID': 'START_AREA'}
+    )
+    end_points = temp[temp['END']][['TRAVEL_ID', 'VISIT_AREA_ID', 'END_DISTANCE']].rename(
+        columns={'VISIT_AREA_ID': 'END_AREA'}
+    )
+    possible_routes = pd.merge(start_points, end_points, on='TRAVEL_ID')
+    possible_routes = possible_routes[possible_routes['START_AREA'] < possible_routes['END_AREA']]
+    possible_routes['DISTANCE'] = (possible_routes['START_DISTANCE'] + possible_routes['END_DISTANCE']) / 2
+    return possible_routes[['TRAVEL_ID', 'START_AREA', 'END_AREA', 'DISTANCE']]
+
+# 4. 이동 수단 연결 및 중복 제거
+def compress_transport_modes(route, category_mapping):
+    route['MVMN_CD_1'] = route['MVMN_CD_1'].map(category_mapping)
+    transport_modes = route['MVMN_CD_1'].tolist()
+    # 두 번째 지점부터 이동 수단 표시
+    if len(transport_modes) <= 1:  # 데이터가 하나뿐이면 빈 이동 수단 반환
+        return ''
+    transport_modes = transport_modes[1:]
+    compressed_modes = [transport_modes[0]]
+    for mode in transport_modes[1:]:
+        if mode != compressed_modes[-1]:
+            compressed_modes.append(mode)
+    return '->'.join(compressed_modes)
+
+# 5. 우선순위 기반 대표 이동 수단 선정
+def determine_representative_transport_with_priority(sequence, priority_mapping):
+    transports = sequence.split('->')
+    transport_scores = {transport: priority_mapping.get(transport, 0) for transport in transports}
+    return max(transport_scores, key=transport_scores.get)
+
+def split_routes_by_private_car_after_generation(possible_routes, temp, boundary, input_coords):
+    """
+    자가용 경로를 기준으로 이미 생성된 경로를 분리하고 유효한 경로만 반환.
+    """
+    engine = TransportEngine(temp)
+    return engine.split_routes_by_private_car(possible_routes, boundary, input_coords)
+
+############################ 이동 경로 엔진 ############################
+
+MOVE_FILE = 'data/tn_move_his_이동내역.csv'
+VISIT_AREA_FILE = 'data/tn_visit_area_info_방문지정보2nd.csv'
+TRANSPORT_SOURCE_FILES = [MOVE_FILE, VISIT_AREA_FILE]
+
+MOVE_COLUMNS = ['TRAVEL_ID', 'VISIT_AREA_ID', 'MVMN_CD_1', 'X_COORD', 'Y_COORD']
+PRIVATE_CAR_CODE = 1
+UNKNOWN_TRANSPORT = '기타'
+
+# 반경 검색 후 기존과 같은 하버사인 식으로 다시 거르므로, 경계값 누락만 막을 만큼 조금 넓게 검색
+RADIUS_MARGIN_KM = 1e-6
+
+EMPTY_RESULT_COLUMNS = ['X_COORD', 'Y_COORD', 'TRANSPORT_MODES', 'PRIMARY_TRANSPORT']
+ROUTE_COLUMNS = ['TRAVEL_ID', 'START_AREA', 'END_AREA', 'DISTANCE']
+
+@profiled()
+def build_transport_moves():
+    """
+    이동내역과 방문지 정보를 병합한 경로 데이터 (기존 transport_pipeline의 temp와 같은 행 순서)
+    """
+    mv = load_csv(MOVE_FILE)
+    vst = read_visit_area('transport', VISIT_AREA_FILE)
+    mv.rename(columns={'TRIP_ID': 'VISIT_AREA_ID'}, inplace=True)
+    merged = pd.merge(mv, vst, on=['TRAVEL_ID', 'VISIT_AREA_ID'], how='inner')
+    return merged[MOVE_COLUMNS].reset_index(drop=True)
+
+class TransportEngine:
+    """
+    여행(TRAVEL_ID)별로 방문지 순서대로 정렬해 연속 배열로 저장한 이동 경로 데이터.
+    - 한 여행의 경로(START_AREA ~ END_AREA)는 정렬 키에 대한 이진 탐색으로 구한 인덱스 범위
+    - 출발/도착 후보는 공간 인덱스 반경 검색으로 찾고, 모든 후보 경로를 배열 연산으로 한 번에 평가
+    """
+
+    def __init__(self, moves):
+        moves = moves.dropna(subset=['TRAVEL_ID', 'VISIT_AREA_ID'])
+        travel_codes, self.travel_ids = pd.factorize(moves['TRAVEL_ID'])
+        area = moves['VISIT_AREA_ID'].to_numpy().astype(np.int64)
+        # 병합 결과에서의 원래 행 순서 (기존 코드의 후보 경로 순서를 재현할 때 사용)
+        source_pos = np.arange(len(moves))
+
+        order = np.lexsort((source_pos, area, travel_codes))
+        self.travel = travel_codes[order]
+        self.area = area[order]
+        self.source_pos = source_pos[order]
+        self.mode_codes = moves['MVMN_CD_1'].to_numpy()[order]
+        self.lat = moves['Y_COORD'].to_numpy(dtype=np.float64)[order]
+        self.lon = moves['X_COORD'].to_numpy(dtype=np.float64)[order]
+
+        # 여행별 시작 위치 (travel t의 행은 offsets[t]:offsets[t + 1])
+        self.offsets = np.searchsorted(self.travel, np.arange(len(self.travel_ids) + 1))
+
+        # (여행, 방문지) 정렬 키 - 경로 범위를 searchsorted 한 번으로 계산
+        self.area_min = int(self.area.min()) if len(self.area) else 0
+        self.area_span = int(self.area.max()) - self.area_min + 1 if len(self.area) else 1
+        self.keys = self.travel.astype(np.int64) * self.area_span + (self.area - self.area_min)
+
+        # 자가용 구간 분리용: 자가용이 아닌 행의 위치와 연속 구간 번호
+        is_car = self.mode_codes == PRIVATE_CAR_CODE
+        self.non_car_rows = np.flatnonzero(~is_car)
+        run_starts = np.ones(len(self.non_car_rows), dtype=bool)
+        run_starts[1:] = np.diff(self.non_car_rows) > 1
+        self.non_car_run = np.cumsum(run_starts) - 1
+        self.run_first = self.non_car_rows[run_starts]
+        self.run_last = self.non_car_rows[np.r_[run_starts[1:], True]] if len(run_starts) else self.non_car_rows
+
+        self.index = SpatialIndex(self.lat, self.lon)
+
+    def __len__(self):
+        return len(self.travel)
+
+    def _within(self, lat, lon, boundary):
+        """
+        (lat, lon)에서 boundary(km) 이내인 행 위치(정렬 순서)와 거리
+        """
+        positions, _ = self.index.query_radius(lat, lon, boundary + RADIUS_MARGIN_KM)
+        distances = haversine_one_to_many(lat, lon, self.lat[positions], self.lon[positions])
+        keep = distances <= boundary
+        return positions[keep], distances[keep]
+
+    def route_bounds(self, start_rows, end_rows):
+        """
+        출발 행과 도착 행이 주어진 경로의 행 범위 [lo, hi) - 같은 방문지 번호의 행까지 포함
+        """
+        lo = np.searchsorted(self.keys, self.keys[start_rows], side='left')
+        hi = np.searchsorted(self.keys, self.keys[end_rows], side='right')
+        return lo, hi
+
+    def candidate_pairs(self, input_coords, boundary):
+        """
+        같은 여행 안에서 출발 반경 내 행 -> 도착 반경 내 행(방문지 번호가 더 큰 것) 쌍을 모두 구합니다.
+        반환값: (출발 행, 도착 행, 평균 거리) - 기존 병합 방식과 같은 순서
+        """
+        starts, start_dist = self._within(input_coords['PREV_Y_COORD'], input_coords['PREV_X_COORD'], boundary)
+        ends, end_dist = self._within(input_coords['Y_COORD'], input_coords['X_COORD'], boundary)
+        if len(starts) == 0 or len(ends) == 0:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, np.array([], dtype=np.float64)
+
+        # 도착 후보는 같은 여행의 행 중 출발 방문지 번호보다 큰 구간 [first_after_start, travel_end)
+        first_after_start = np.searchsorted(self.keys, self.keys[starts], side='right')
+        travel_end = self.offsets[self.travel[starts] + 1]
+        lo = np.searchsorted(ends, first_after_start, side='left')
+        hi = np.searchsorted(ends, travel_end, side='left')
+        counts = np.maximum(hi - lo, 0)
+
+        total = int(counts.sum())
+        pair_start = np.repeat(np.arange(len(starts)), counts)
+        pair_end = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+
+        start_rows, end_rows = starts[pair_start], ends[pair_end]
+        distances = (start_dist[pair_start] + end_dist[pair_end]) / 2
+
+        # 기존 pd.merge 결과 순서: 출발 행의 원래 순서, 그 안에서 도착 행의 원래 순서
+        order = np.lexsort((self.source_pos[end_rows], self.source_pos[start_rows]))
+        return start_rows[order], end_rows[order], distances[order]
+
+    def mode_tables(self, category_mapping, transport_priority):
+        """
+        행별 이동 수단 이름과 우선순위 순위 (매핑에 없는 코드는 '기타')
+        """
+        codes, uniques = pd.factorize(self.mode_codes, use_na_sentinel=False)
+        names = np.array([category_mapping.get(code, UNKNOWN_TRANSPORT) for code in uniques], dtype=object)
+        priorities = np.array([transport_priority.get(name, 0) for name in names], dtype=np.float64)
+        _, rank = np.unique(priorities, return_inverse=True)
+        return names[codes], rank[codes]
+
+    def route_modes(self, lo, hi, row_names):
+        """
+        한 경로의 이동 수단을 연속 중복 제거 후 '->'로 연결 (첫 지점은 제외)
+        """
+        modes = row_names[lo + 1:hi]
+        if len(modes) == 0:
+            return ''
+        changed = np.r_[True, modes[1:] != modes[:-1]]
+        return '->'.join(modes[changed])
+
+    def primary_transports(self, lo, hi, row_names, row_rank):
+        """
+        모든 경로의 대표 이동 수단을 한 번에 계산합니다.
+        우선순위가 가장 높은 수단, 같으면 경로에서 먼저 나온 수단을 선택합니다.
+        """
+        result = np.full(len(lo), '', dtype=object)
+        valid = hi > lo + 1
+        if not valid.any():
+            return result
+
+        # (우선순위, 앞선 위치) 복합 키의 구간 최댓값 - 구간은 [lo + 1, hi)
+        n = len(row_rank)
+        composite = row_rank.astype(np.int64) * (n + 1) + (n - np.arange(n))
+        composite = np.r_[composite, 0]
+        bounds = np.column_stack([lo[valid] + 1, hi[valid]]).ravel()
+        best = np.maximum.reduceat(composite, bounds)[::2]
+        best_rows = n - best % (n + 1)
+        result[valid] = row_names[best_rows]
+        return result
+
+    def candidate_routes(self, input_coords, boundary, category_mapping=category_mapping, transport_priority=transport_priority):
+        """
+        조건을 만족하는 모든 후보 경로와 대표 이동 수단 (기존 generate_possible_routes 순서)
+        """
+        start_rows, end_rows, distances = self.candidate_pairs(input_coords, boundary)
+        lo, hi = self.route_bounds(start_rows, end_rows)
+        row_names, row_rank = self.mode_tables(category_mapping, transport_priority)
+        return pd.DataFrame({
+            'TRAVEL_ID': self.travel_ids[self.travel[start_rows]],
+            'START_AREA': self.area[start_rows],
+            'END_AREA': self.area[end_rows],
+            'DISTANCE': distances,
+            'PRIMARY_TRANSPORT': self.primary_transports(lo, hi, row_names, row_rank),
+        })
+
+    def first_route(self, input_coords, boundary, category_mapping=category_mapping, transport_priority=transport_priority):
+        """
+        첫 번째 후보 경로의 (이동 수단 문자열, 대표 이동 수단). 후보가 없으면 None
+        """
+        start_rows, end_rows, _ = self.candidate_pairs(input_coords, boundary)
+        if len(start_rows) == 0:
+            return None
+        lo, hi = self.route_bounds(start_rows[:1], end_rows[:1])
+        row_names, row_rank = self.mode_tables(category_mapping, transport_priority)
+        transport_modes = self.route_modes(lo[0], hi[0], row_names)
+        primary_transport = self.primary_transports(lo, hi, row_names, row_rank)[0]
+        return transport_modes, primary_transport
+
+    def split_routes_by_private_car(self, possible_routes, boundary, input_coords):
+        """
+        각 경로를 자가용 구간에서 끊은 서브 경로 중 시작/끝이 반경 안에 있는 것만 반환합니다.
+        """
+        if possible_routes.empty or len(self.non_car_rows) == 0:
+            return pd.DataFrame(columns=ROUTE_COLUMNS)
+
+        travel = pd.Index(self.travel_ids).get_indexer(possible_routes['TRAVEL_ID'])
+        known = travel >= 0
+        travel = np.where(known, travel, 0).astype(np.int64)
+        start_key = travel * self.area_span + (possible_routes['START_AREA'].to_numpy().astype(np.int64) - self.area_min)
+        end_key = travel * self.area_span + (possible_routes['END_AREA'].to_numpy().astype(np.int64) - self.area_min)
+        lo = np.searchsorted(self.keys, start_key, side='left')
+        hi = np.where(known, np.searchsorted(self.keys, end_key, side='right'), lo)
+
+        # 경로 범위와 겹치는 비자가용 연속 구간들 (경로 경계에서 잘라냄)
+        first = np.searchsorted(self.non_car_rows, lo, side='left')
+        last = np.searchsorted(self.non_car_rows, hi, side='left') - 1
+        has_segment = (last >= first) & (hi > lo)
+        first_run = np.where(has_segment, self.non_car_run[np.minimum(first, len(self.non_car_run) - 1)], 0)
+        last_run = np.where(has_segment, self.non_car_run[np.clip(last, 0, len(self.non_car_run) - 1)], -1)
+        counts = np.maximum(last_run - first_run + 1, 0)
+
+        route_idx = np.repeat(np.arange(len(lo)), counts)
+        runs = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first_run, counts)
+        seg_first = np.maximum(self.run_first[runs], lo[route_idx])
+        seg_last = np.minimum(self.run_last[runs], hi[route_idx] - 1)
+
+        start_distance = haversine_one_to_many(
+            input_coords['PREV_Y_COORD'], input_coords['PREV_X_COORD'], self.lat[seg_first], self.lon[seg_first]
+        )
+        end_distance = haversine_one_to_many(
+            input_coords['Y_COORD'], input_coords['X_COORD'], self.lat[seg_last], self.lon[seg_last]
+        )
+        keep = (start_distance <= boundary) & (end_distance <= boundary)
+        return pd.DataFrame({
+            'TRAVEL_ID': possible_routes['TRAVEL_ID'].to_numpy()[route_idx[keep]],
+            'START_AREA': self.area[seg_first[keep]],
+            'END_AREA': self.area[seg_last[keep]],
+            'DISTANCE': (start_distance[keep] + end_distance[keep]) / 2,
+        })
+
+    def segment_table(self, category_mapping=category_mapping, transport_priority=transport_priority):
+        """
+        여행마다 자가용 이동에서 끊은 비자가용 구간 전체를 한 번에 만듭니다.
+        각 구간의 이동 수단 문자열과 대표 이동 수단은 transport_pipeline과 같은 규칙(첫 지점 제외)으로 계산합니다.
+        """
+        rows = self.non_car_rows
+        if len(rows) == 0:
+            return pd.DataFrame(columns=SEGMENT_COLUMNS)
+
+        # 자가용 행이나 여행이 바뀌는 곳에서 새 구간 시작
+        starts = np.ones(len(rows), dtype=bool)
+        starts[1:] = (np.diff(rows) > 1) | (np.diff(self.travel[rows]) != 0)
+        segment_of_row = np.cumsum(starts) - 1
+        first = rows[starts]
+        last = rows[np.r_[starts[1:], True]]
+
+        row_names, row_rank = self.mode_tables(category_mapping, transport_priority)
+
+        # 구간의 두 번째 행부터 연속 중복을 제거하고 '->'로 연결
+        mode_rows = rows[~starts]
+        mode_segments = segment_of_row[~starts]
+        names = row_names[mode_rows]
+        changed = np.ones(len(mode_rows), dtype=bool)
+        changed[1:] = (names[1:] != names[:-1]) | (mode_segments[1:] != mode_segments[:-1])
+        joined = pd.Series(names[changed]).groupby(mode_segments[changed]).agg('->'.join)
+        transport_modes = joined.reindex(np.arange(len(first)), fill_value='').to_numpy()
+
+        return pd.DataFrame({
+            'TRAVEL_ID': self.travel_ids[self.travel[first]],
+            'START_AREA': self.area[first],
+            'END_AREA': self.area[last],
+            'START_X_COORD': self.lon[first],
+            'START_Y_COORD': self.lat[first],
+            'END_X_COORD': self.lon[last],
+            'END_Y_COORD': self.lat[last],
+            'TRANSPORT_MODES': transport_modes,
+            'PRIMARY_TRANSPORT': self.primary_transports(first, last + 1, row_names, row_rank),
+        })
+
+# 모듈 전역 엔진 (원본 데이터가 바뀌면 다시 생성)
+_transport_engine = {'source': None, 'engine': None}
+
+def get_transport_engine():
+    moves = load_or_build('transport_moves', TRANSPORT_SOURCE_FILES, build_transport_moves)
+    if _transport_engine['source'] is not moves:
+        _transport_engine['engine'] = TransportEngine(moves)
+        _transport_engine['source'] = moves
+    return _transport_engine['engine']
+
+############################ 비자가용 구간 테이블 ############################
+
+SEGMENT_COLUMNS = [
+    'TRAVEL_ID', 'START_AREA', 'END_AREA', 'START_X_COORD', 'START_Y_COORD',
+    'END_X_COORD', 'END_Y_COORD', 'TRANSPORT_MODES', 'PRIMARY_TRANSPORT'
+]
+
+@profiled()
+def build_transport_segments():
+    """
+    오프라인 단계: 모든 비자가용 구간을 미리 계산한 테이블 (스냅샷으로 저장)
+    """
+    return get_transport_engine().segment_table()
+
+class SegmentTable:
+    """
+    미리 계산한 비자가용 구간 테이블과 구간 시작/끝 좌표의 공간 인덱스.
+    조회는 출발 반경과 도착 반경을 각각 검색한 뒤 양쪽에 모두 걸린 구간만 남기는 방식입니다.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments.reset_index(drop=True)
+        self.start_lat = self.segments['START_Y_COORD'].to_numpy(dtype=np.float64)
+        self.start_lon = self.segments['START_X_COORD'].to_numpy(dtype=np.float64)
+        self.end_lat = self.segments['END_Y_COORD'].to_numpy(dtype=np.float64)
+        self.end_lon = self.segments['END_X_COORD'].to_numpy(dtype=np.float64)
+        self.start_index = SpatialIndex(self.start_lat, self.start_lon)
+        self.end_index = SpatialIndex(self.end_lat, self.end_lon)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def query(self, input_coords, boundary):
+        """
+        시작점이 이전 좌표 반경 안, 끝점이 다음 좌표 반경 안에 있는 구간 (테이블 순서)
+        """
+        starts, _ = self.start_index.query_radius(
+            input_coords['PREV_Y_COORD'], input_coords['PREV_X_COORD'], boundary + RADIUS_MARGIN_KM
+        )
+        ends, _ = self.end_index.query_radius(
+            input_coords['Y_COORD'], input_coords['X_COORD'], boundary + RADIUS_MARGIN_KM
+        )
+        positions = np.intersect1d(starts, ends, assume_unique=True)
+
+        # 경계값은 기존과 같은 하버사인 식으로 판정
+        start_distance = haversine_one_to_many(
+            input_coords['PREV_Y_COORD'], input_coords['PREV_X_COORD'], self.start_lat[positions], self.start_lon[positions]
+        )
+        end_distance = haversine_one_to_many(
+            input_coords['Y_COORD'], input_coords['X_COORD'], self.end_lat[positions], self.end_lon[positions]
+        )
+        keep = (start_distance <= boundary) & (end_distance <= boundary)
+
+        result = self.segments.iloc[positions[keep]].reset_index(drop=True)
+        result['DISTANCE'] = (start_distance[keep] + end_distance[keep]) / 2
+        return result
+
+# 모듈 전역 구간 테이블 (원본 데이터가 바뀌면 다시 생성)
+_segment_table = {'source': None, 'table': None}
+
+def get_segment_table():
+    segments = load_or_build('transport_segments', TRANSPORT_SOURCE_FILES, build_transport_segments)
+    if _segment_table['source'] is not segments:
+        _segment_table['table'] = SegmentTable(segments)
+        _segment_table['source'] = segments
+    return _segment_table['table']
+
+@profiled()
+def find_non_car_segments(prev_lon, prev_lat, next_lon, next_lat, boundary=3):
+    """
+    이전 좌표 근처에서 시작해 다음 좌표 근처에서 끝나는 비자가용 구간을 거리순으로 반환합니다.
+    """
+    input_coords = {'PREV_X_COORD': prev_lon, 'PREV_Y_COORD': prev_lat, 'X_COORD': next_lon, 'Y_COORD': next_lat}
+    segments = get_segment_table().query(input_coords, boundary)
+    return segments.sort_values('DISTANCE', kind='stable').reset_index(drop=True)
+
+@profiled()
+def transport_pipeline(prev_lon, prev_lat, next_lon, next_lat, boundary=3, category_mapping=category_mapping, transport_priority=transport_priority):
+    # 좌표를 사전으로 변환
+    input_coords = {'PREV_X_COORD': prev_lon, 'PREV_Y_COORD': prev_lat, 'X_COORD': next_lon, 'Y_COORD': next_lat}
+
+    # 병합된 이동 경로 데이터는 한 번만 만들어 재사용
+    engine = get_transport_engine()
+    route = engine.first_route(input_coords, boundary, category_mapping, transport_priority)
+
+    # 빈 결과 처리
+    if route is None:
+        return pd.DataFrame(columns=EMPTY_RESULT_COLUMNS)
+
+    # 첫 번째 결과값만 반환
+    transport_modes, primary_transport = route
+    return pd.DataFrame([{
+        'X_COORD': next_lon,
+        'Y_COORD': next_lat,
+        'TRANSPORT_MODES': transport_modes,
+        'PRIMARY_TRANSPORT': primary_transport
+    }])
+
+
+if __name__ == "__main__":
+    # 필수 인자 정의
+    prev_x = 125.98157399467  # 이전 경도
+    prev_y = 36.2987714202851  # 이전 위도
+    x = 126.5303615        # 현재 경도
+    y = 34.6786846        # 현재 위도
+    boundary = 100     # 반경 (km)
+
+    # 함수 실행
+    result = transport_pipeline(prev_x, prev_y, x, y, boundary)
+
+    print(result)
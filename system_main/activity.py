@@ -1,21 +1,40 @@
 import pandas as pd
 import numpy as np
 import math
-from geopy.distance import geodesic
+import threading
+from geo import distance_one_to_many, HAVERSINE_MAX_REL_ERROR
+from snapshot import load_or_build
+from spatial_index import SpatialIndex
+from profiling import profiled
+from dtypes import compact, share_id_categories
+from tables import read_table, read_visit_area, NON_ACTIVITY_TYPES
 
 ############################ 데이터 로드 ############################
 
+# 전처리 결과 스냅샷의 원본 파일 (하나라도 바뀌면 스냅샷을 다시 생성)
+ACTIVITY_SOURCE_FILES = [
+    'data/tn_travel_여행.csv',
+    'data/tn_traveller_master_여행객 Master.csv',
+    'data/tn_activity_his_활동내역.csv',
+    'data/tn_visit_area_info_방문지정보2nd.csv',
+    'data/tc_codeb_코드B.csv',
+    'data/temp_cluster.csv',
+]
+
+@profiled()
 def load_datasets():
-    df_tv = pd.read_csv("data/tn_travel_여행.csv", encoding='ANSI')
-    df_tm = pd.read_csv('data/tn_traveller_master_여행객 Master.csv', encoding='ANSI')
-    df_acthis = pd.read_csv('data/tn_activity_his_활동내역.csv', encoding='utf-8')
-    df_visarea = pd.read_csv('data/tn_visit_area_info_방문지정보2nd.csv')
-    df_code = pd.read_csv('data/tc_codeb_코드B.csv', encoding='ANSI')
-    df_cluster = pd.read_csv('data/temp_cluster.csv', encoding='ANSI')
+    df_tv = read_table('travel')
+    df_tm = read_table('traveller_master')
+    df_acthis = read_table('activity_his')
+    df_visarea = read_visit_area('activity')
+    df_code = read_table('code')
+    df_cluster = read_table('cluster')
+    share_id_categories([df_tv, df_tm, df_acthis, df_visarea, df_cluster])
     return df_tv, df_tm, df_acthis, df_visarea, df_code, df_cluster
 
 ############################ 전처리 단계 ############################
 
+@profiled()
 def preprocess_data():
     # 데이터 로드
     df_tv, df_tm, df_acthis, df_visarea, df_code, df_cluster = load_datasets()
@@ -35,15 +54,47 @@ def preprocess_data():
     # 가중치 계산
     final_df = calculate_weights(processed_df, df_cluster)
     
-    return final_df
+    # 스냅샷으로 저장되어 계속 메모리에 남으므로 점수도 float32로 줄임
+    return compact(final_df)
+
+def load_preprocessed_data():
+    """
+    preprocess_data() 결과를 스냅샷에서 가져옵니다.
+    원본 CSV가 바뀐 경우에만 전처리를 다시 수행합니다.
+    """
+    return load_or_build('activity', ACTIVITY_SOURCE_FILES, preprocess_data)
+
+# 클러스터별 좌표 공간 인덱스 캐시 (스냅샷이 바뀌면 초기화)
+# 조회 스레드 풀에서 동시에 호출되므로 초기화/생성은 잠금 안에서 처리
+_cluster_indexes = {'source': None, 'indexes': {}}
+_cluster_indexes_lock = threading.Lock()
+
+def get_cluster_index(df, cluster_label):
+    """
+    클러스터 데이터와 해당 좌표의 공간 인덱스를 반환합니다.
+    같은 데이터셋에 대해서는 클러스터별로 한 번만 생성합니다.
+    """
+    with _cluster_indexes_lock:
+        if _cluster_indexes['source'] is not df:
+            _cluster_indexes['source'] = df
+            _cluster_indexes['indexes'] = {}
+
+        indexes = _cluster_indexes['indexes']
+        if cluster_label not in indexes:
+            cluster_data = df[df['Cluster'] == cluster_label]
+            index = SpatialIndex(cluster_data['Y_COORD'].values, cluster_data['X_COORD'].values)
+            indexes[cluster_label] = (cluster_data, index)
+        return indexes[cluster_label]
 
 ############################ 보조 함수들 ############################
 
 # 여행 데이터 병합
+@profiled()
 def merge_travel_data(df_tm, df_tv):
     return df_tm.merge(df_tv[['TRAVELER_ID', 'TRAVEL_ID']], on='TRAVELER_ID', how='left')
 
 # 여행 목적 매핑 및 병합
+@profiled()
 def map_and_merge_travel_purpose(df_tm, df_tv):
     mapping_dict = {
         1: 2, 2: 3, 3: 4, 4: 4, 5: 3, 6: 4, 7: 3, 8: 5,
@@ -59,6 +110,7 @@ def map_and_merge_travel_purpose(df_tm, df_tv):
     return df_tm.merge(df_tv[['TRAVEL_ID', 'TRAVEL_PURPOSE']], on='TRAVEL_ID', how='left')
 
 # 활동 데이터 처리 및 매핑
+@profiled()
 def process_and_map_activity(df_tm, df_acthis, df_code):
     df_list = df_acthis.groupby('TRAVEL_ID')['ACTIVITY_TYPE_CD'].apply(list).reset_index()
     df_tm = pd.merge(df_tm, df_list[['TRAVEL_ID', 'ACTIVITY_TYPE_CD']], on='TRAVEL_ID', how='left')
@@ -78,8 +130,9 @@ def process_and_map_activity(df_tm, df_acthis, df_code):
     return df_tm
 
 # 방문지 데이터 전처리
+@profiled()
 def preprocessed(df_visarea, df_acthis, df_code, df_tm):
-    exclude_values = [9,10, 11, 12, 21, 22, 23, 24]
+    exclude_values = NON_ACTIVITY_TYPES
     filtered_df = df_visarea[~df_visarea['VISIT_AREA_TYPE_CD'].isin(exclude_values)]
     filtered_df = filtered_df[['VISIT_AREA_ID', 'TRAVEL_ID', 'VISIT_AREA_NM', 'ROAD_NM_ADDR', 
                                'X_COORD', 'Y_COORD', 'REVISIT_YN', 'DGSTFN', 
@@ -93,6 +146,7 @@ def preprocessed(df_visarea, df_acthis, df_code, df_tm):
     return df
 
 # 가중치 계산
+@profiled()
 def calculate_weights(df, df_cluster):
     df['ACT_WEIGHT'] = np.where(
         df['ACTIVITY_TYPE_CD'] == df['ACTIVITY'],
@@ -105,38 +159,43 @@ def calculate_weights(df, df_cluster):
 
 ############################ 추천 함수 ############################
 
+@profiled()
 def activity_first_rmd(cluster_label, user_lat, user_lon, top_n=10):
-    df = preprocess_data()
+    df = load_preprocessed_data()
     cluster_data = df[df['Cluster'] == cluster_label].copy()
     grouped_data = cluster_data.groupby(['X_COORD', 'Y_COORD'], as_index=False).agg({'TOTAL_WEIGHT': 'mean'}).rename(columns={'TOTAL_WEIGHT': 'TOTAL_WEIGHT_avg'})
     merged_data = pd.merge(cluster_data, grouped_data, on=['X_COORD', 'Y_COORD'], how='left')
     top_recommendations = merged_data.sort_values(by='TOTAL_WEIGHT_avg', ascending=False).drop_duplicates(subset=['X_COORD', 'Y_COORD']).head(top_n).reset_index(drop=True)
 
-    def calculate_distance(row):
-        return geodesic((user_lat, user_lon), (row['Y_COORD'], row['X_COORD'])).km
-
-    top_recommendations['distance_to_user'] = top_recommendations.apply(calculate_distance, axis=1).round(2)
+    # 상위 top_n개만 계산하므로 geodesic 정확도를 유지 (tolerance_km=0)
+    top_recommendations['distance_to_user'] = distance_one_to_many(
+        user_lat, user_lon, top_recommendations['Y_COORD'], top_recommendations['X_COORD'], tolerance_km=0
+    ).round(2)
     return top_recommendations[['VISIT_AREA_NM', 'ROAD_NM_ADDR', 'X_COORD', 'Y_COORD', 'TOTAL_WEIGHT_avg', 'distance_to_user', 'Cluster']]
 
+@profiled()
 def activity_second_rmd(cluster_label, user_lat, user_lon, radius=5, top_n=10, exclude_coords=None):
     """
     첫 번째 추천 지역과 겹치지 않는 두 번째 추천 지역 반환.
     """
-    df = preprocess_data()
-    cluster_data = df[df['Cluster'] == cluster_label].copy()
+    df = load_preprocessed_data()
+    cluster_data, index = get_cluster_index(df, cluster_label)
+
+    # 공간 인덱스로 반경 내 후보만 추출
+    # (haversine은 geodesic과 최대 0.5% 정도 차이가 나므로 여유를 두고 조회한 뒤 후보만 정확히 다시 계산)
+    candidates, _ = index.query_radius(user_lat, user_lon, radius * (1 + HAVERSINE_MAX_REL_ERROR))
+    nearby_data = cluster_data.iloc[candidates].copy()
 
     # 거리 계산
-    cluster_data['DISTANCE'] = cluster_data.apply(
-        lambda row: geodesic((user_lat, user_lon), (row['Y_COORD'], row['X_COORD'])).km,
-        axis=1
+    nearby_data['DISTANCE'] = distance_one_to_many(
+        user_lat, user_lon, nearby_data['Y_COORD'], nearby_data['X_COORD'], tolerance_km=0
     )
-    nearby_data = cluster_data[cluster_data['DISTANCE'] <= radius]
+    nearby_data = nearby_data[nearby_data['DISTANCE'] <= radius]
 
     # 제외 좌표 필터링
     if exclude_coords:
-        nearby_data = nearby_data[~nearby_data.apply(
-            lambda row: (row['X_COORD'], row['Y_COORD']) in exclude_coords, axis=1
-        )]
+        coords = pd.MultiIndex.from_arrays([nearby_data['X_COORD'], nearby_data['Y_COORD']])
+        nearby_data = nearby_data[~coords.isin(list(exclude_coords))]
 
     # 가중치 계산 및 추천
     grouped_data = nearby_data.groupby(['X_COORD', 'Y_COORD'], as_index=False).agg({'TOTAL_WEIGHT': 'mean'})
@@ -153,8 +212,9 @@ def activity_second_rmd(cluster_label, user_lat, user_lon, radius=5, top_n=10, e
 
     return top_recommendations[['VISIT_AREA_NM', 'ROAD_NM_ADDR', 'X_COORD', 'Y_COORD', 'TOTAL_WEIGHT_avg', 'DISTANCE']]
 
+@profiled()
 def des_act_rmd(cluster_label, target_sido, target_sgg=None, target_dong=None, top_n=10):
-    df = preprocess_data()
+    df = load_preprocessed_data()
     filtered_df = df[df['Cluster'] == cluster_label]
     if not target_sgg and not target_dong:
         filtered_df = filtered_df[filtered_df['SIDO_NM'].str.contains(target_sido, na=False)]
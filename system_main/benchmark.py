@@ -0,0 +1,282 @@
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+import pandas as pd
+import geocoding
+import snapshot
+
+# 기본 측정 설정
+ITERATIONS = 20               # warm 측정 반복 횟수
+REGRESSION_THRESHOLD = 0.20   # 기준 대비 20% 이상 느려지거나 메모리가 늘면 회귀로 판단
+COMPARED_METRICS = ['cold_s', 'warm_p50_ms', 'warm_p95_ms', 'warm_peak_mb']
+# 이보다 작은 절대 변화는 측정 잡음으로 보고 회귀로 판단하지 않음
+MIN_ABSOLUTE_CHANGE = {'cold_s': 0.01, 'warm_p50_ms': 0.05, 'warm_p95_ms': 0.05, 'warm_peak_mb': 0.5}
+SEED = 0
+
+# 입력 좌표 (경도, 위도) - 반복마다 순서대로 사용
+SAMPLE_POINTS = [
+    (126.9780, 37.5665),   # 서울
+    (129.1604, 35.1587),   # 부산 해운대
+    (126.5312, 33.4996),   # 제주
+    (127.0286, 37.2636),   # 수원
+    (128.8961, 37.7519),   # 강릉
+]
+
+# 기본 프로필 (나이대, 동행자 수, 동행 형태, 숙박 일수, 여행 목적, 이동 수단)
+SAMPLE_PROFILE = {
+    'age': 34, 'cp_status': '2인 가족 여행', 'cp_num': 1, 'nights': 2, 'traffic': '자가용', 'purpose': '휴식',
+}
+
+############################ 캐시 초기화 ############################
+
+def reset_caches():
+    """
+    프로세스 메모리에 올라간 데이터/인덱스/모델 캐시를 모두 비웁니다. (디스크 스냅샷은 유지)
+    """
+    import activity
+    import Lodging
+    import consumption
+    import cluster_input
+    import Transports
+    import reverse_geocoder
+
+    snapshot.clear_memory_snapshots()
+    activity._cluster_indexes.update(source=None, indexes={})
+    Lodging._lodging_index.update(source=None, index=None)
+    consumption._restaurant_index.update(fingerprint=None, index=None)
+    consumption.visited_places.clear()
+    cluster_input._predictor = None
+    Transports._transport_engine.update(source=None, engine=None)
+    reverse_geocoder._local_geocoder.update(source=None, geocoder=None, checked_at=None)
+    gc.collect()
+
+############################ 측정 대상 ############################
+
+def _point(i):
+    return SAMPLE_POINTS[i % len(SAMPLE_POINTS)]
+
+def case_cluster_predict(i):
+    from cluster_input import cluster_predict
+    age_grps = [10, 20, 30, 40, 50, 60]
+    p = SAMPLE_PROFILE
+    return cluster_predict(age_grps[i % len(age_grps)], i % 5, p['cp_status'], i % 4, p['purpose'], p['traffic'])
+
+def case_activity_first_rmd(i):
+    from activity import activity_first_rmd
+    x, y = _point(i)
+    return activity_first_rmd(i % 8, y, x, top_n=10)
+
+def case_activity_second_rmd(i):
+    from activity import activity_second_rmd
+    x, y = _point(i)
+    return activity_second_rmd(i % 8, y, x, radius=5, top_n=10)
+
+def case_des_act_rmd(i):
+    from activity import des_act_rmd
+    sido = ['서울', '부산', '제주', '경기', '강원'][i % 5]
+    return des_act_rmd(i % 8, target_sido=sido, top_n=10)
+
+def case_food_top_place(i):
+    import consumption
+    x, y = _point(i)
+    return consumption.food_top_place(x, y, i % 8, visited=set())
+
+def case_get_lodging_score_result(i):
+    from Lodging import get_lodging_score_result
+    x, y = _point(i)
+    return get_lodging_score_result(x, y, boundary=5, mvmn='자가용', family='2인 가족 여행')
+
+def case_transport_pipeline(i):
+    from Transports import transport_pipeline
+    (prev_x, prev_y), (x, y) = _point(i), _point(i + 1)
+    return transport_pipeline(prev_x, prev_y, x, y, boundary=100)
+
+def case_itinerary(i):
+    from recommendation_engine import RecommendationEngine, TravelProfile
+    x, y = _point(i)
+    engine = _engines.get('engine')
+    if engine is None:
+        engine = _engines['engine'] = RecommendationEngine()
+    return engine.recommend(TravelProfile(x, y, **SAMPLE_PROFILE))
+
+# 일정 생성 엔진은 측정 사이에 재사용 (cold 측정 시 초기화)
+_engines = {}
+
+CASES = {
+    'cluster_predict': case_cluster_predict,
+    'activity_first_rmd': case_activity_first_rmd,
+    'activity_second_rmd': case_activity_second_rmd,
+    'des_act_rmd': case_des_act_rmd,
+    'food_top_place': case_food_top_place,
+    'get_lodging_score_result': case_get_lodging_score_result,
+    'transport_pipeline': case_transport_pipeline,
+    'itinerary': case_itinerary,
+}
+
+############################ 측정 ############################
+
+def _run_cold(func):
+    reset_caches()
+    _engines.clear()
+    np.random.seed(SEED)
+    start = time.perf_counter()
+    func(0)
+    return time.perf_counter() - start
+
+def _peak_memory_mb(func, i, cold):
+    """
+    tracemalloc으로 한 번 실행했을 때의 최대 할당량(MB) (시간 측정과 따로 실행)
+    """
+    if cold:
+        reset_caches()
+        _engines.clear()
+    np.random.seed(SEED)
+    tracemalloc.start()
+    try:
+        func(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def benchmark_case(name, iterations=ITERATIONS, cold=True, memory=True):
+    """
+    한 측정 대상의 cold(캐시 비운 첫 호출) 시간과 warm 반복 시간의 p50/p95, 최대 메모리를 측정합니다.
+    """
+    func = CASES[name]
+    result = {'iterations': iterations}
+    try:
+        if cold:
+            result['cold_s'] = _run_cold(func)
+            if memory:
+                result['cold_peak_mb'] = _peak_memory_mb(func, 0, cold=True)
+
+        # warm: 캐시가 찬 상태에서 반복 (첫 호출은 준비 단계로 제외)
+        np.random.seed(SEED)
+        func(0)
+        timings = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            func(i)
+            timings.append(time.perf_counter() - start)
+        timings_ms = np.array(timings) * 1000
+        result['warm_p50_ms'] = float(np.percentile(timings_ms, 50))
+        result['warm_p95_ms'] = float(np.percentile(timings_ms, 95))
+        result['warm_mean_ms'] = float(timings_ms.mean())
+        if memory:
+            result['warm_peak_mb'] = _peak_memory_mb(func, 0, cold=False)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def _process_peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def run_benchmarks(cases=None, iterations=ITERATIONS, cold=True, memory=True, verbose=True):
+    cases = list(cases or CASES)
+    results = {}
+    for name in cases:
+        results[name] = benchmark_case(name, iterations=iterations, cold=cold, memory=memory)
+        if verbose:
+            print(f"{name}: {format_result(results[name])}")
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'offline': geocoding.OFFLINE_MODE,
+            'iterations': iterations,
+            'process_peak_rss_mb': _process_peak_rss_mb(),
+        },
+        'results': results,
+    }
+
+def format_result(result):
+    if 'error' in result:
+        return f"오류 ({result['error']})"
+    parts = []
+    if 'cold_s' in result:
+        parts.append(f"cold {result['cold_s']:.3f}s")
+    parts.append(f"p50 {result['warm_p50_ms']:.2f}ms")
+    parts.append(f"p95 {result['warm_p95_ms']:.2f}ms")
+    if 'warm_peak_mb' in result:
+        parts.append(f"peak {result['warm_peak_mb']:.1f}MB")
+    return ', '.join(parts)
+
+############################ 기준값 비교 ############################
+
+def compare_results(current, baseline, threshold=REGRESSION_THRESHOLD, metrics=COMPARED_METRICS):
+    """
+    기준(baseline) 결과와 비교해 항목별 변화율과 회귀 여부를 반환합니다.
+    반환값: [{'case', 'metric', 'baseline', 'current', 'change', 'regression'}, ...]
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'error' in result or 'error' in base:
+            continue
+        for metric in metrics:
+            if metric not in result or not base.get(metric):
+                continue
+            change = result[metric] / base[metric] - 1
+            significant = result[metric] - base[metric] > MIN_ABSOLUTE_CHANGE.get(metric, 0)
+            rows.append({
+                'case': name, 'metric': metric, 'baseline': base[metric], 'current': result[metric],
+                'change': change, 'regression': change > threshold and significant,
+            })
+    return rows
+
+def print_comparison(rows, threshold=REGRESSION_THRESHOLD):
+    for row in rows:
+        flag = '회귀' if row['regression'] else ''
+        print(f"{row['case']:<26} {row['metric']:<14} {row['baseline']:>10.3f} -> {row['current']:>10.3f} ({row['change']:+.1%}) {flag}")
+    regressions = [row for row in rows if row['regression']]
+    print(f"회귀 {len(regressions)}건 (기준: {threshold:.0%} 초과)")
+    return regressions
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 함수 성능 측정")
+    parser.add_argument('--cases', default=','.join(CASES), help="쉼표로 구분한 측정 대상")
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('--no-cold', action='store_true', help="cold 측정 생략")
+    parser.add_argument('--no-memory', action='store_true', help="메모리 측정 생략")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument('--online', action='store_true', help="카카오 API 사용 (기본은 오프라인)")
+    args = parser.parse_args()
+
+    geocoding.OFFLINE_MODE = not args.online
+    results = run_benchmarks(
+        cases=[name for name in args.cases.split(',') if name],
+        iterations=args.iterations, cold=not args.no_cold, memory=not args.no_memory
+    )
+    if args.output:
+        save_results(results, args.output)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        regressions = print_comparison(compare_results(results, load_results(args.baseline), args.threshold), args.threshold)
+        sys.exit(1 if regressions else 0)
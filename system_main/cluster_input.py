@@ -1,28 +1,53 @@
 import pandas as pd
+import numpy as np
 import pickle
 import os
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.preprocessing import StandardScaler
 from kmodes import kprototypes
+from profiling import profiled
+from dtypes import compact
+from tables import load_csv
 
 # 파일 경로 설정
 MODEL_FILE = './kprototype_model.pkl'
 CLUSTER_FILE = './data/temp_cluster.csv'
+SCALER_FILE = './kprototype_scaler.json'  # 학습 데이터 정규화 통계 (모델 파일 옆에 저장)
+
+# 모델 입력 컬럼 순서
+NUMERIC_FEATURES = ['AGE_GRP', 'TRAVEL_COMPANIONS_NUM', 'SLEEP']
+FEATURE_COLUMNS = ['AGE_GRP', 'TRAVEL_COMPANIONS_NUM', 'TRAVEL_STATUS_ACCOMPANY', 'SLEEP', 'ACTIVITY', 'RESULT_MVMN']
+CATEGORICAL_INDICES = [2, 4, 5]
+CATEGORICAL_FEATURES = [FEATURE_COLUMNS[i] for i in CATEGORICAL_INDICES]
+
+# 일괄 예측 시 한 번에 처리할 행 수 (메모리 상한 조절)
+BATCH_CHUNK_SIZE = 100_000
+
+# 전체 입력 조합에 대한 클러스터 조회 테이블
+# 생성(약 48만 조합 일괄 예측)은 build_lookup_table() 또는 `python cluster_input.py --build-lookup`으로 따로 실행하고,
+# 예측기는 첫 예측 때 저장된 파일만 불러옵니다. (없으면 모델로 바로 예측)
+LOOKUP_FILE = './data/cache/cluster_lookup.npz'
+USE_CLUSTER_LOOKUP = True
+LOOKUP_AGE_GROUPS = [10, 20, 30, 40, 50, 60]  # recommendation_engine.age_to_age_grp 결과
+LOOKUP_MAX_COMPANIONS = 20                   # 동행자 수 상한 (학습 데이터 최대값)
+LOOKUP_DAYS = list(range(8))                 # main.day_to_numberic_day 결과 (당일 ~ 7박 8일)
 
 # 데이터 및 모델 로드 함수
+@profiled()
 def load_data_and_model():
     """
     temp_clutster.csv와 kmeans_model.pkl 파일을 로드합니다.
     """
     if os.path.exists(CLUSTER_FILE) and os.path.exists(MODEL_FILE):
         try:
-            # CSV 파일 읽기 (utf-8-sig 인코딩)
-            df_cluster = pd.read_csv(CLUSTER_FILE, encoding='utf-8-sig')
-        except UnicodeDecodeError:
-            try:
-                # 만약 utf-8-sig가 실패하면 cp949로 시도
-                df_cluster = pd.read_csv(CLUSTER_FILE, encoding='cp949')
-            except Exception as e:
-                raise ValueError(f"CSV 파일 읽기 중 문제가 발생했습니다: {e}")
+            # CSV 파일 읽기 (인코딩은 tables에서 판별, 같은 프로세스에서는 한 번만 파싱)
+            df_cluster = compact(load_csv(CLUSTER_FILE))
+        except Exception as e:
+            raise ValueError(f"CSV 파일 읽기 중 문제가 발생했습니다: {e}")
 
         try:
             # Pickle로 모델 로드
@@ -42,6 +67,8 @@ def load_data_and_model():
 def preprocessing_dataframe(df, model_features):
     """
     입력 데이터를 학습된 데이터와 동일한 형태로 전처리합니다.
+    기존 cluster_predict 방식(학습 데이터 + 입력으로 StandardScaler 재학습)으로,
+    ClusterPredictor 결과가 같은지 비교하는 테스트(tests/test_cluster_input.py)의 기준으로 사용합니다.
     """
     ## 범주형 데이터를 원-핫 인코딩
     #df = pd.get_dummies(df)
@@ -63,42 +90,330 @@ def preprocessing_dataframe(df, model_features):
 def cluster_predict(age_grp, cp_num, cp_status, day, purpose, traffic):
     """
     입력 데이터를 받아 클러스터를 예측합니다.
+    모델과 정규화 통계는 처음 한 번만 로드한 예측기(ClusterPredictor)를 사용합니다.
     """
+    return get_cluster_predictor().predict(age_grp, cp_num, cp_status, day, purpose, traffic)
 
-    # 입력값을 데이터프레임 형태로 준비
-    input_data = pd.DataFrame({
-        'AGE_GRP': [age_grp],
-        'TRAVEL_COMPANIONS_NUM': [cp_num],
-        'TRAVEL_STATUS_ACCOMPANY': [cp_status],
-        'SLEEP': [day - 1],
-        'ACTIVITY': [', '.join(purpose) if isinstance(purpose, list) else purpose],
-        'RESULT_MVMN': [traffic]
-    })
-    
-    # 데이터 및 모델 로드
-    df_cluster, model, model_features = load_data_and_model()
-
-    # ACTIVITY 컬럼을 문자열 형태로 변환
-    df_cluster['ACTIVITY'] = df_cluster['ACTIVITY'].apply(
-        lambda x: ', '.join(x) if isinstance(x, list) else x
-    )
-
-    # 기존 데이터와 입력 데이터를 병합
-    try:
-        combined_data = pd.concat([df_cluster.drop(columns=['TRAVEL_ID', 'Cluster']), input_data], ignore_index=True)
-    except KeyError as e:
-        raise KeyError(f"데이터 병합 중 오류 발생: {e}")
-    
-    # 데이터 전처리
-    try:
-        preprocessed_data = preprocessing_dataframe(combined_data, model_features)
-    except Exception as e:
-        raise Exception(f"데이터 전처리 중 오류 발생: {e}")
+############################ 정규화 통계 저장 / 로드 ############################
+
+def file_sha1(path):
+    """
+    파일 내용의 SHA-1 (학습 데이터가 바뀌었는지 확인용)
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def build_scaler_stats(df_cluster):
+    """
+    학습 데이터 수치형 컬럼의 개수, 평균, 편차 제곱합(M2)을 계산합니다.
+    M2를 함께 저장하면 새 입력 1행을 더한 평균/표준편차를 학습 데이터 없이 바로 구할 수 있습니다.
+    """
+    values = df_cluster[NUMERIC_FEATURES].to_numpy(dtype=np.float64)
+    mean = values.mean(axis=0)
+    return {
+        'features': NUMERIC_FEATURES,
+        'n': int(len(values)),
+        'mean': mean.tolist(),
+        'm2': ((values - mean) ** 2).sum(axis=0).tolist(),
+        'std': values.std(axis=0).tolist(),
+    }
+
+def load_scaler_stats(cluster_file=CLUSTER_FILE, scaler_file=SCALER_FILE):
+    """
+    저장된 정규화 통계를 불러옵니다.
+    파일이 없거나 학습 데이터 내용이 바뀌었으면 다시 계산해서 저장합니다.
+    """
+    source_hash = file_sha1(cluster_file)
+    if os.path.exists(scaler_file):
+        with open(scaler_file, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        if stats.get('source_sha1') == source_hash and stats.get('features') == NUMERIC_FEATURES:
+            return stats
 
-    # 클러스터 예측
+    df_cluster, _, _ = load_data_and_model()
+    stats = build_scaler_stats(df_cluster)
+    stats['source_sha1'] = source_hash
     try:
-        categorical_indices = [preprocessed_data.columns.get_loc(col) for col in preprocessed_data.select_dtypes(include=['object', 'category']).columns]     
-        predicted_cluster = model.predict(preprocessed_data.tail(1), categorical=categorical_indices)
-    except ValueError as e:
-        raise ValueError(f"클러스터 예측 중 오류 발생: {e}")
-    return predicted_cluster[0]
\ No newline at end of file
+        with open(scaler_file, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"정규화 통계 저장 중 오류 발생: {e}")
+    return stats
+
+############################ 예측기 ############################
+
+class ClusterPredictor:
+    """
+    모델과 학습 데이터 정규화 통계를 한 번만 불러와 재사용하는 클러스터 예측기.
+    기존 cluster_predict는 학습 데이터 전체 + 입력 1행으로 StandardScaler를 다시 학습했는데,
+    저장된 (n, 평균, M2)에 입력 행을 더한 통계로 같은 값을 바로 계산하므로
+    예측 비용이 학습 데이터 크기와 무관합니다.
+    """
+
+    def __init__(self, model_file=MODEL_FILE, cluster_file=CLUSTER_FILE, scaler_file=SCALER_FILE,
+                 use_lookup=USE_CLUSTER_LOOKUP, lookup_file=LOOKUP_FILE):
+        if not (os.path.exists(model_file) and os.path.exists(cluster_file)):
+            raise FileNotFoundError("필요한 파일이 누락되었습니다: CSV 또는 모델 파일")
+        try:
+            with open(model_file, 'rb') as f:
+                self.model = pickle.load(f)
+        except Exception as e:
+            raise ValueError(f"모델 로드 중 오류 발생: {e}")
+
+        stats = load_scaler_stats(cluster_file, scaler_file)
+        self.n = stats['n']
+        self.mean = np.asarray(stats['mean'], dtype=np.float64)
+        self.m2 = np.asarray(stats['m2'], dtype=np.float64)
+
+        # 조회 테이블은 모델과 정규화 통계가 같을 때만 유효
+        self.version = {'model_sha1': file_sha1(model_file), 'scaler_sha1': stats['source_sha1']}
+        self.use_lookup = use_lookup
+        self.lookup_file = lookup_file
+        self.lookup_table = None
+        self.lookup_positions = None
+        self._lookup_checked = False   # 저장된 조회 테이블을 불러오려고 시도했는지
+        self._lookup_lock = threading.Lock()
+
+    def scale_numeric(self, values):
+        """
+        수치형 입력 (m, 3)을 정규화합니다.
+        각 행은 "학습 데이터 + 해당 행"으로 StandardScaler를 학습한 것과 같은 값으로 변환됩니다.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = self.n + 1
+        delta = values - self.mean
+        mean = self.mean + delta / n
+        var = (self.m2 + delta * (values - mean)) / n
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0  # StandardScaler와 같은 0 분산 처리
+        return (values - mean) / scale
+
+    def make_input(self, age_grp, cp_num, cp_status, day, purpose, traffic):
+        """
+        cluster_predict와 같은 방식으로 입력 1행 데이터프레임을 만듭니다.
+        """
+        return pd.DataFrame({
+            'AGE_GRP': [age_grp],
+            'TRAVEL_COMPANIONS_NUM': [cp_num],
+            'TRAVEL_STATUS_ACCOMPANY': [cp_status],
+            'SLEEP': [day - 1],
+            'ACTIVITY': [', '.join(purpose) if isinstance(purpose, list) else purpose],
+            'RESULT_MVMN': [traffic]
+        })
+
+    def transform(self, input_data):
+        """
+        입력 데이터프레임의 수치형 컬럼만 정규화해서 모델 입력 형태로 반환합니다.
+        """
+        transformed = input_data[FEATURE_COLUMNS].copy()
+        transformed[NUMERIC_FEATURES] = self.scale_numeric(input_data[NUMERIC_FEATURES].to_numpy())
+        for col in FEATURE_COLUMNS:
+            if col not in NUMERIC_FEATURES:
+                transformed[col] = transformed[col].astype(object)
+        return transformed
+
+    @profiled()
+    def predict(self, age_grp, cp_num, cp_status, day, purpose, traffic):
+        # 조회 테이블 범위 안의 입력은 배열 인덱싱으로 바로 반환
+        if self.use_lookup and not self._lookup_checked:
+            with self._lookup_lock:
+                if not self._lookup_checked:
+                    self.load_lookup_table()
+                    self._lookup_checked = True
+        if self.lookup_table is not None:
+            label = self.lookup_label(age_grp, cp_num, cp_status, day, purpose, traffic)
+            if label is not None:
+                return label
+
+        input_data = self.make_input(age_grp, cp_num, cp_status, day, purpose, traffic)
+        try:
+            predicted_cluster = self.model.predict(self.transform(input_data), categorical=CATEGORICAL_INDICES)
+        except ValueError as e:
+            raise ValueError(f"클러스터 예측 중 오류 발생: {e}")
+        return predicted_cluster[0]
+
+    ############################ 일괄 예측 ############################
+
+    def encode_categorical(self, input_data):
+        """
+        범주형 컬럼을 모델 학습 시의 정수 코드로 변환합니다. (처음 보는 값은 -1 → 모든 중심과 불일치)
+        """
+        codes = np.empty((len(input_data), len(CATEGORICAL_FEATURES)), dtype=np.int32)
+        for i, (col, enc_map) in enumerate(zip(CATEGORICAL_FEATURES, self.model._enc_map)):
+            values = input_data[col]
+            if col == 'ACTIVITY' and values.dtype == object and any(isinstance(x, list) for x in values):
+                values = values.apply(lambda x: ', '.join(x) if isinstance(x, list) else x)
+
+            # 범주 순서 코드로 변환한 뒤 모델의 코드로 다시 매핑 (해시 기반 일괄 변환)
+            categories = list(enc_map.keys())
+            category_codes = pd.Categorical(values, categories=categories).codes
+            lookup = np.array([enc_map[c] for c in categories], dtype=np.int32)
+            codes[:, i] = np.where(category_codes >= 0, lookup[category_codes], -1)
+        return codes
+
+    @profiled()
+    def predict_batch(self, input_data, chunk_size=BATCH_CHUNK_SIZE, n_jobs=None):
+        """
+        여러 여행자 프로필의 클러스터를 한 번에 예측합니다.
+        input_data 컬럼은 temp_cluster.csv와 같은 FEATURE_COLUMNS (SLEEP은 숙박 일수 값 그대로)입니다.
+        n_jobs가 2 이상이면 청크를 프로세스 풀에 나눠 계산합니다.
+        """
+        missing = [col for col in FEATURE_COLUMNS if col not in input_data.columns]
+        if missing:
+            raise KeyError(f"입력 데이터에 필요한 컬럼이 없습니다: {missing}")
+
+        num_centroids, cat_centroids = self.model._enc_cluster_centroids
+        num_centroids = np.asarray(num_centroids, dtype=np.float64)
+        cat_centroids = np.asarray(cat_centroids, dtype=np.int32)
+        gamma = self.model.gamma
+
+        scaled = self.scale_numeric(input_data[NUMERIC_FEATURES].to_numpy(dtype=np.float64))
+        codes = self.encode_categorical(input_data)
+
+        chunks = [
+            (num_centroids, cat_centroids, gamma, scaled[start:start + chunk_size], codes[start:start + chunk_size])
+            for start in range(0, len(input_data), chunk_size)
+        ]
+        if n_jobs and n_jobs > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(_assign_chunk, chunks))
+        else:
+            results = [_assign_chunk(chunk) for chunk in chunks]
+
+        labels = np.concatenate(results) if results else np.array([], dtype=np.int64)
+        return pd.Series(labels, index=input_data.index, name='Cluster')
+
+    ############################ 조회 테이블 ############################
+
+    def lookup_domains(self):
+        """
+        조회 테이블 각 축의 값 목록 (cluster_predict 인자 순서)
+        """
+        status_map, purpose_map, traffic_map = self.model._enc_map
+        return [
+            LOOKUP_AGE_GROUPS,
+            list(range(LOOKUP_MAX_COMPANIONS + 1)),
+            list(status_map.keys()),
+            LOOKUP_DAYS,
+            list(purpose_map.keys()),
+            list(traffic_map.keys()),
+        ]
+
+    def compute_lookup_table(self):
+        """
+        모든 입력 조합(연령대 x 동행자 수 x 동행 형태 x 숙박 일수 x 여행 목적 x 이동 수단)의
+        클러스터를 일괄 예측해 uint8 배열로 만듭니다. 반환값: (배열, 축별 값 목록)
+        """
+        domains = self.lookup_domains()
+        shape = tuple(len(values) for values in domains)
+        grid = np.indices(shape).reshape(len(shape), -1)
+        ages, companions, statuses, days, purposes, traffics = (
+            np.asarray(values, dtype=object)[axis] for values, axis in zip(domains, grid)
+        )
+        profiles = pd.DataFrame({
+            'AGE_GRP': ages.astype(np.int64),
+            'TRAVEL_COMPANIONS_NUM': companions.astype(np.int64),
+            'TRAVEL_STATUS_ACCOMPANY': statuses,
+            'SLEEP': days.astype(np.int64) - 1,  # cluster_predict와 같이 SLEEP = day - 1
+            'ACTIVITY': purposes,
+            'RESULT_MVMN': traffics,
+        })
+        labels = self.predict_batch(profiles).to_numpy()
+        return labels.astype(np.uint8).reshape(shape), domains
+
+    def load_lookup_table(self, lookup_file=None):
+        """
+        저장된 조회 테이블을 불러옵니다. 파일이 없거나 모델 또는 정규화 통계가 바뀌었으면 False를 반환합니다.
+        """
+        lookup_file = lookup_file or self.lookup_file
+        table = None
+        if os.path.exists(lookup_file):
+            try:
+                with np.load(lookup_file, allow_pickle=False) as saved:
+                    version = json.loads(str(saved['version']))
+                    domains = json.loads(str(saved['domains']))
+                    if version == self.version and domains == self.lookup_domains():
+                        table = saved['table']
+            except Exception as e:
+                print(f"클러스터 조회 테이블 읽기 중 오류 발생: {e}")
+        if table is None:
+            return False
+        self._set_lookup_table(table)
+        return True
+
+    def build_lookup_table(self, lookup_file=None):
+        """
+        조회 테이블을 새로 만들어 저장하고 이후 예측에 사용합니다.
+        """
+        lookup_file = lookup_file or self.lookup_file
+        table, domains = self.compute_lookup_table()
+        try:
+            os.makedirs(os.path.dirname(lookup_file), exist_ok=True)
+            np.savez_compressed(
+                lookup_file, table=table,
+                version=json.dumps(self.version), domains=json.dumps(domains, ensure_ascii=False)
+            )
+        except OSError as e:
+            print(f"클러스터 조회 테이블 저장 중 오류 발생: {e}")
+        self._set_lookup_table(table)
+        return table
+
+    def _set_lookup_table(self, table):
+        # 위치 사전을 먼저 만든 뒤 테이블을 지정 (predict가 테이블 유무만 보고 사용하므로)
+        self.lookup_positions = [{value: pos for pos, value in enumerate(values)} for values in self.lookup_domains()]
+        self.lookup_table = table
+        self._lookup_checked = True
+
+    def lookup_label(self, age_grp, cp_num, cp_status, day, purpose, traffic):
+        """
+        조회 테이블에서 클러스터를 찾습니다. 범위를 벗어난 값이 있으면 None을 반환합니다.
+        """
+        purpose = ', '.join(purpose) if isinstance(purpose, list) else purpose
+        index = []
+        for value, positions in zip((age_grp, cp_num, cp_status, day, purpose, traffic), self.lookup_positions):
+            try:
+                pos = positions.get(value)
+            except TypeError:  # 해시할 수 없는 값
+                pos = None
+            if pos is None:
+                return None
+            index.append(pos)
+        return int(self.lookup_table[tuple(index)])
+
+def _assign_chunk(args):
+    """
+    k-prototypes 비용(수치형 유클리드 제곱합 + gamma * 범주형 불일치 수)이 가장 작은 중심을 고릅니다.
+    kmodes의 labels_cost와 같은 계산을 모든 행과 중심에 대해 배열 연산으로 처리합니다.
+    """
+    num_centroids, cat_centroids, gamma, scaled, codes = args
+    num_costs = ((scaled[:, None, :] - num_centroids[None, :, :]) ** 2).sum(axis=2)
+    cat_costs = (codes[:, None, :] != cat_centroids[None, :, :]).sum(axis=2)
+    return np.argmin(num_costs + gamma * cat_costs, axis=1)
+
+# 모듈 전역 예측기 (처음 사용할 때 생성)
+_predictor = None
+
+def get_cluster_predictor():
+    global _predictor
+    if _predictor is None:
+        _predictor = ClusterPredictor()
+    return _predictor
+
+# 일괄 클러스터 예측 함수
+def cluster_predict_batch(df, chunk_size=BATCH_CHUNK_SIZE, n_jobs=None):
+    """
+    여러 여행자 프로필(FEATURE_COLUMNS 형태의 데이터프레임)의 클러스터를 한 번에 예측합니다.
+    각 행의 결과는 같은 값으로 cluster_predict를 호출한 결과와 같습니다.
+    """
+    return get_cluster_predictor().predict_batch(df, chunk_size=chunk_size, n_jobs=n_jobs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="클러스터 예측기 도구")
+    parser.add_argument('--build-lookup', action='store_true', help="전체 입력 조합의 클러스터 조회 테이블을 만들어 저장")
+    args = parser.parse_args()
+
+    if args.build_lookup:
+        table = get_cluster_predictor().build_lookup_table()
+        print(f"클러스터 조회 테이블 저장 완료: {LOOKUP_FILE} ({table.size:,}개 조합)")
+    else:
+        parser.print_help()
@@ -1,93 +1,226 @@
-import pandas as pd
+import numpy as np
 from geocoding import get_region_from_coords
+from snapshot import file_fingerprint
+from profiling import profiled, stage
+import metrics
+from dtypes import compact, share_id_categories, id_codes
+from tables import load_csv
 
 
-visited_places = set()  # 방문한 지역 정보를 관리하는 세트
+visited_places = set()  # 방문한 지역 정보를 관리하는 세트 (visited를 넘기지 않았을 때 쓰는 기본값)
 
-def food_top_place(x, y, cluster):
+# 데이터 파일 경로
+CONSUMPTION_FILE = 'data/consumption_category.csv'
+CLUSTER_FILE = 'data/temp_cluster.csv'
+
+# 운영 지표 (result: ok, no_region, exhausted 추천할 음식점 없음, no_top 상위 후보 없음, error)
+FOOD_RECOMMENDATIONS = metrics.counter('travel_food_recommendations_total', "음식점 추천 결과별 횟수", ['result'])
+FOOD_CLUSTER_FALLBACKS = metrics.counter(
+    'travel_food_cluster_fallbacks_total', "클러스터 후보가 없어 클러스터 제한을 해제한 횟수"
+)
+
+############################ 음식점 인덱스 ############################
+
+class RestaurantPartition:
+    """
+    한 (시/도, 시군구)의 음식점 데이터.
+    점수 내림차순(동점은 원래 순서)으로 미리 정렬된 배열과 클러스터별 소속 비트맵을 가집니다.
+    점수가 없는(NaN) 행은 맨 뒤에 있으며 n_scored 이후에 위치합니다.
+    """
+
+    def __init__(self, group, traveler_clusters):
+        scores = group['Calculated_Final_Score'].to_numpy(dtype=np.float64)
+        order = np.lexsort((np.arange(len(group)), -scores))
+
+        self.names = group['VISIT_AREA_NM'].to_numpy(dtype=object)[order]
+        self.addresses = group['ROAD_NM_ADDR'].to_numpy(dtype=object)[order]
+        self.x_coords = group['X_COORD'].to_numpy()[order]
+        self.y_coords = group['Y_COORD'].to_numpy()[order]
+        self.scores = scores[order].astype(np.float32)
+        self.n_scored = int((~np.isnan(self.scores)).sum())
+
+        # 클러스터별 소속 여부 비트맵 {클러스터: bool 배열}
+        travel_ids = id_codes(group['TRAVEL_ID'])[order]
+        self.cluster_bitmaps = {
+            cluster: np.isin(travel_ids, ids) for cluster, ids in traveler_clusters.items()
+        }
+        self.all_rows = np.arange(len(order))
+
+    def __len__(self):
+        return len(self.scores)
+
+    def candidates(self, cluster=None):
+        """
+        후보 행 위치 (점수순). cluster가 None이면 클러스터 제한 없이 전체
+        """
+        if cluster is None:
+            return self.all_rows
+        bitmap = self.cluster_bitmaps.get(cluster)
+        if bitmap is None:
+            return self.all_rows[:0]
+        return np.flatnonzero(bitmap)
+
+class RestaurantIndex:
+    """
+    CATEGORY == "음식점" 데이터를 (SIDO_NM, SGG_NM) 단위로 나눈 메모리 인덱스.
+    한 번의 추천은 해당 지역 파티션만 확인합니다.
+    """
+
+    def __init__(self, consumption_data, cluster_data):
+        restaurants = consumption_data[consumption_data['CATEGORY'] == "음식점"]
+        traveler_clusters = {
+            cluster: np.unique(id_codes(group['TRAVEL_ID']))
+            for cluster, group in cluster_data.groupby('Cluster')
+        }
+        self.partitions = {
+            region: RestaurantPartition(group, traveler_clusters)
+            for region, group in restaurants.groupby(['SIDO_NM', 'SGG_NM'], sort=False)
+        }
+
+    def get(self, sido_nm, sgg_nm):
+        return self.partitions.get((sido_nm, sgg_nm))
+
+def load_consumption_data():
+    return compact(load_csv(CONSUMPTION_FILE))
+
+def load_cluster_data():
+    return compact(load_csv(CLUSTER_FILE))
+
+# 음식점 인덱스 캐시 (원본 파일이 바뀌면 다시 생성)
+_restaurant_index = {'fingerprint': None, 'index': None}
+
+def get_restaurant_index():
+    fingerprint = file_fingerprint([CONSUMPTION_FILE, CLUSTER_FILE])
+    if _restaurant_index['fingerprint'] == fingerprint:
+        metrics.CACHE_REQUESTS.inc(cache='restaurant_index', result='hit')
+    else:
+        metrics.CACHE_REQUESTS.inc(cache='restaurant_index', result='miss')
+        with stage('consumption.build_restaurant_index') as s:
+            consumption_data = load_consumption_data()
+            cluster_data = load_cluster_data()
+            # 두 표의 TRAVEL_ID를 같은 정수 코드로 맞춰 클러스터 비트맵을 정수 비교로 만듦 (인덱스에는 코드만 저장하므로 항상 변환)
+            share_id_categories([consumption_data, cluster_data], ['TRAVEL_ID'], max_ratio=None)
+            _restaurant_index['index'] = RestaurantIndex(consumption_data, cluster_data)
+            s.rows_in = len(consumption_data)
+        _restaurant_index['fingerprint'] = fingerprint
+    return _restaurant_index['index']
+
+############################ 추천 함수 ############################
+
+@profiled()
+def food_region(x, y):
+    """
+    음식점 추천에 쓰는 좌표의 (시/도, 시군구). 조회에 실패하면 (None, None)
+    visited_places를 건드리지 않으므로 여러 좌표를 동시에 미리 조회해도 됩니다.
+    """
+    try:
+        return get_region_from_coords(x, y)
+    except Exception as e:
+        print(f"좌표 ({x}, {y}) 지역 조회 중 에러가 발생했습니다: {e}")
+        return None, None
+
+@profiled()
+def food_top_place(x, y, cluster, region=None, visited=None):
     """
     클러스터와 좌표 정보를 기반으로 상위 1개 음식점을 가중 확률로 추천하며,
     방문한 지역은 제외합니다. 음식점 정보를 모두 사용했을 경우 클러스터 제한을 해제합니다.
+    region에 미리 조회한 (시/도, 시군구)를 넘기면 지역 조회를 생략합니다.
+    visited는 방문한 음식점 이름 세트로, 추천한 곳을 추가합니다. (없으면 모듈 전역 visited_places 사용)
     """
+    if visited is None:
+        visited = visited_places
     try:
-        # 데이터 로드
-        consumption_data = pd.read_csv('data/consumption_category.csv', encoding='utf-8-sig')
-        cluster_data = pd.read_csv('data/temp_cluster.csv', encoding='cp949')
+        # 데이터 로드 (음식점 인덱스는 처음 한 번만 생성)
+        restaurant_index = get_restaurant_index()
 
         # 1. 입력된 좌표를 기반으로 시/도(SIDO_NM) 및 구 단위(SGG_NM) 추출
-        sido_nm, sgg_nm = get_region_from_coords(x, y)
+        sido_nm, sgg_nm = region if region is not None else get_region_from_coords(x, y)
         if not sido_nm or not sgg_nm or sido_nm == "알 수 없음" or sgg_nm == "알 수 없음":
             print(f"좌표 ({x}, {y})에서 지역 정보를 찾을 수 없어 기본값을 사용합니다.")
+            FOOD_RECOMMENDATIONS.inc(result='no_region')
             return None
 
-        # 2. 클러스터에서 TRAVEL_ID 필터링
-        relevant_travelers = cluster_data[cluster_data['Cluster'] == cluster]['TRAVEL_ID']
-
-        # 3. 필터링 데이터 생성 함수
-        def filter_data(consumption_data, travelers_filter=True):
-            """필터링된 데이터를 반환합니다."""
-            return consumption_data[
-                ((consumption_data['TRAVEL_ID'].isin(relevant_travelers)) if travelers_filter else True) &  # 클러스터 필터 옵션
-                (consumption_data['SIDO_NM'] == sido_nm) &                 # 시/도 필터
-                (consumption_data['SGG_NM'] == sgg_nm) &                   # 구 단위 필터
-                (consumption_data['CATEGORY'] == "음식점") &               # 음식점 필터
-                (~consumption_data['VISIT_AREA_NM'].isin(visited_places))  # 중복 제거
-            ]
+        # 2. 해당 지역 파티션만 사용
+        partition = restaurant_index.get(sido_nm, sgg_nm)
+
+        # 3. 필터링 함수 - 점수순 후보 중 방문하지 않은 곳을 앞에서부터 limit개까지 반환
+        def first_unvisited(rows, limit):
+            picked = []
+            for row in rows:
+                if partition.names[row] not in visited:
+                    picked.append(row)
+                    if len(picked) == limit:
+                        break
+            return picked
+
+        def filter_data(travelers_filter=True):
+            """(상위 10개 후보, 최소 점수 후보, 후보 존재 여부)를 반환합니다."""
+            if partition is None:
+                return [], [], False
+            rows = partition.candidates(cluster if travelers_filter else None)
+            scored = rows[:np.searchsorted(rows, partition.n_scored)]
+            top_rows = first_unvisited(scored, 10)
+            lowest_row = first_unvisited(scored[::-1], 1)
+            exists = bool(top_rows) or bool(first_unvisited(rows[len(scored):], 1))
+            return top_rows, lowest_row, exists
 
         # 4. 데이터 필터링
-        filtered_consumption = filter_data(consumption_data, travelers_filter=True)
+        top_rows, lowest_row, exists = filter_data(travelers_filter=True)
 
         # 5. 클러스터 데이터가 부족할 경우 클러스터 제한 해제
-        if filtered_consumption.empty:
-            filtered_consumption = filter_data(consumption_data, travelers_filter=False)
+        if not exists:
+            FOOD_CLUSTER_FALLBACKS.inc()
+            top_rows, lowest_row, exists = filter_data(travelers_filter=False)
 
         # 6. 재추천할 데이터가 없는 경우
-        if filtered_consumption.empty:
+        if not exists:
             print("추천할 음식점이 더 이상 없습니다.")
+            FOOD_RECOMMENDATIONS.inc(result='exhausted')
             return None
 
-        # 명시적으로 복사본을 생성
-        filtered_consumption = filtered_consumption.copy()
-
-        #7. 점수 양수화
-        min_score = filtered_consumption['Calculated_Final_Score'].min()
-        if min_score < 0:
-            filtered_consumption['Calculated_Final_Score'] -= min_score  # 모든 점수를 양수로 변환
-
-
-        # 8. 상위 10개 추출
-        top_places = filtered_consumption.nlargest(10, 'Calculated_Final_Score')
-        if top_places.empty:
+        # 7. 상위 10개 추출 (이미 점수순으로 정렬되어 있음)
+        if not top_rows:
             print("상위 10개 데이터를 추출할 수 없습니다.")
+            FOOD_RECOMMENDATIONS.inc(result='no_top')
             return None
+        top_rows = np.array(top_rows, dtype=np.int64)
+
+        # 8. 점수 양수화 (필터링된 전체 중 최소 점수 기준)
+        top_scores = partition.scores[top_rows].astype(np.float64)  # 저장은 float32, 계산은 float64
+        min_score = partition.scores[lowest_row[0]]
+        if min_score < 0:
+            top_scores = top_scores - min_score  # 모든 점수를 양수로 변환
 
         # 9. 가중치 계산
-        top_places.loc[:, 'Weight'] = (
-            top_places['Calculated_Final_Score'] / 
-            top_places['Calculated_Final_Score'].sum()
-        ).fillna(0)
+        weights = np.nan_to_num(top_scores / top_scores.sum())
 
-        # 10. 가중 확률 기반으로 1개 랜덤 선택
-        recommended_place = top_places.sample(n=1, weights=top_places['Weight'])
+        # 10. 가중 확률 기반으로 1개 랜덤 선택 (DataFrame.sample과 같은 방식)
+        weight_sum = weights.sum()
+        if weight_sum == 0:
+            raise ValueError("Invalid weights: weights sum to zero")
+        chosen = top_rows[np.random.choice(len(top_rows), size=1, replace=False, p=weights / weight_sum)[0]]
 
         # 11. 결과 구성
         result = {
-            'VISIT_AREA_NM': recommended_place.iloc[0].get('VISIT_AREA_NM', '정보 없음'),
-            'ROAD_NM_ADDR': recommended_place.iloc[0].get('ROAD_NM_ADDR', '정보 없음'),
-            'X_COORD': recommended_place.iloc[0].get('X_COORD', '정보 없음'),
-            'Y_COORD': recommended_place.iloc[0].get('Y_COORD', '정보 없음')
+            'VISIT_AREA_NM': partition.names[chosen],
+            'ROAD_NM_ADDR': partition.addresses[chosen],
+            'X_COORD': partition.x_coords[chosen],
+            'Y_COORD': partition.y_coords[chosen]
         }
 
         # 12. 방문한 지역에 추가
-        visited_places.add(result['VISIT_AREA_NM'])
+        visited.add(result['VISIT_AREA_NM'])
 
+        FOOD_RECOMMENDATIONS.inc(result='ok')
         return result
 
     except FileNotFoundError as e:
         print(f"파일을 찾을 수 없습니다: {e}")
+        FOOD_RECOMMENDATIONS.inc(result='error')
         return None
     except Exception as e:
         print(f"알 수 없는 에러가 발생했습니다: {e}")
+        FOOD_RECOMMENDATIONS.inc(result='error')
         return None
 
 # for i in range(20):
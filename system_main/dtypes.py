@@ -0,0 +1,187 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# 데이터 로드 시 공통으로 쓰는 컬럼 자료형 규칙
+# 값 종류가 적은 문자열은 category, 점수는 float32, 코드/번호는 가장 작은 정수형으로 줄입니다.
+# 좌표는 같은 좌표끼리 묶거나 비교하는 곳이 많고 float32로는 1~2m 오차가 생기므로 float64를 유지합니다.
+COMPACT_DTYPES = True   # False면 원래 자료형 그대로 사용 (비교 측정용)
+
+# category 후보 문자열 컬럼 (값 종류가 행 수의 CATEGORY_MAX_RATIO 이하일 때만 변환)
+CATEGORY_COLUMNS = [
+    'SIDO_NM', 'SGG_NM', 'DONG_NM', 'CATEGORY',
+    'TRAVEL_STATUS_ACCOMPANY', 'TRAVEL_STATUS_RESIDENCE', 'TRAVEL_STATUS_DESTINATION',
+    'ACTIVITY', 'ACTIVITY_TYPE_CD', 'RESULT_MVMN', 'MVMN_NM', 'GENDER', 'TRAVEL_NM',
+    'VISIT_AREA_NM', 'ROAD_NM_ADDR',
+]
+CATEGORY_MAX_RATIO = 0.5
+
+# float32로 줄이는 점수 컬럼
+SCORE_COLUMNS = [
+    'DGSTFN', 'REVISIT_INTENTION', 'RCMDTN_INTENTION', 'Calculated_Final_Score',
+    'ACT_WEIGHT', 'TOTAL_WEIGHT', 'FINAL_RECOMMENDATION_SCORE', 'AVG_SCORE', 'MAX_SCORE', 'MIN_SCORE',
+]
+
+# float64를 유지하는 좌표 컬럼
+COORD_COLUMNS = ['X_COORD', 'Y_COORD']
+
+# 값 범위에 맞는 가장 작은 정수형으로 줄이는 코드/번호 컬럼
+INTEGER_COLUMNS = [
+    'VISIT_AREA_ID', 'VISIT_AREA_TYPE_CD', 'ACTIVITY_TYPE_CD', 'TRIP_ID', 'MVMN_CD_1', 'Cluster',
+    'AGE_GRP', 'TRAVEL_COMPANIONS_NUM', 'SLEEP', 'REVISIT_YN',
+    'TOTAL_COUNT', 'TOTAL_SLEEP', 'SUM_MVMN_TYPE', 'SUM_FAMILY_TPYE',
+]
+
+# 여러 표를 잇는 ID 컬럼 - 표끼리 같은 category 자료형을 써서 정수 코드로 병합되게 합니다.
+ID_COLUMNS = ['TRAVEL_ID', 'TRAVELER_ID']
+
+############################ 자료형 변환 ############################
+
+def compact(df, float32=True, exclude=()):
+    """
+    규칙에 맞는 컬럼의 자료형을 줄인 데이터프레임을 반환합니다. (원본은 바꾸지 않음)
+    float32=False면 점수 컬럼은 float64로 두므로 점수 계산 전 원본 데이터에 사용합니다.
+    나중에 .map()/.replace()로 값을 바꾸는 컬럼은 exclude로 제외해야 합니다. (category가 유지되므로)
+    """
+    if not COMPACT_DTYPES:
+        return df
+    changes = {}
+    for column in df.columns:
+        if column in exclude:
+            continue
+        series = df[column]
+        if series.dtype == object and column in SCORE_COLUMNS + INTEGER_COLUMNS:
+            # 'Y'/'N'을 1/0으로 바꾼 컬럼과의 연산 결과처럼 숫자가 object로 남은 경우
+            series = _to_numeric(series)
+            if series is not df[column]:
+                changes[column] = series
+
+        if isinstance(series.dtype, pd.CategoricalDtype) and column not in ID_COLUMNS:
+            if series.nunique() > len(series) * CATEGORY_MAX_RATIO:
+                # 필터링/그룹화 후 값이 거의 겹치지 않으면 문자열이 더 작음
+                changes[column] = series.astype(series.cat.categories.dtype)
+            elif len(series.cat.categories) > series.nunique():
+                # 필터링/그룹화 후 남은 쓰지 않는 범주 제거
+                changes[column] = series.cat.remove_unused_categories()
+        elif column in CATEGORY_COLUMNS and _is_string(series):
+            if series.nunique() <= len(series) * CATEGORY_MAX_RATIO:
+                changes[column] = series.astype('category')
+        elif column in SCORE_COLUMNS and float32 and series.dtype == np.float64:
+            changes[column] = series.astype(np.float32)
+        elif column in COORD_COLUMNS and series.dtype != np.float64:
+            changes[column] = series.astype(np.float64)
+        elif column in INTEGER_COLUMNS and pd.api.types.is_integer_dtype(series.dtype):
+            changes[column] = pd.to_numeric(series, downcast='integer')
+    if not changes:
+        return df
+    return df.assign(**changes)
+
+def _to_numeric(series):
+    try:
+        return pd.to_numeric(series)
+    except (ValueError, TypeError):
+        return series
+
+def _is_string(series):
+    return pd.api.types.is_string_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype)
+
+def share_id_categories(frames, columns=ID_COLUMNS, max_ratio=CATEGORY_MAX_RATIO):
+    """
+    여러 데이터프레임의 ID 컬럼을 같은 category 자료형(모든 표의 값 합집합)으로 바꿉니다.
+    같은 자료형끼리는 병합/비교가 문자열 대신 정수 코드로 처리됩니다.
+    다른 category 컬럼처럼 값 종류가 가장 큰 표 행 수의 max_ratio를 넘으면(거의 모든 값이 다르면)
+    category가 문자열보다 크므로 바꾸지 않습니다. (max_ratio=None이면 항상 변환)
+    frames는 수정되며 변환에 사용한 {컬럼: 자료형}을 반환합니다.
+    """
+    if not COMPACT_DTYPES:
+        return {}
+    id_dtypes = {}
+    for column in columns:
+        owners = [df for df in frames if column in df.columns]
+        if not owners:
+            continue
+        values = pd.concat([pd.Series(np.asarray(df[column].dropna().unique(), dtype=object)) for df in owners]).unique()
+        if max_ratio is not None and len(values) > max(len(df) for df in owners) * max_ratio:
+            continue
+        id_dtype = pd.CategoricalDtype(np.sort(values))
+        for df in owners:
+            df[column] = df[column].astype(id_dtype)
+        id_dtypes[column] = id_dtype
+    return id_dtypes
+
+def id_codes(series):
+    """
+    ID 컬럼의 정수 코드 배열 (category가 아니면 값 배열). share_id_categories로 맞춘 표끼리만 비교 가능합니다.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy()
+    return series.to_numpy()
+
+############################ 메모리 측정 ############################
+
+def memory_mb(df):
+    """
+    데이터프레임이 차지하는 메모리(MB, 문자열 내용 포함)
+    """
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+def memory_report(builders):
+    """
+    {이름: 데이터프레임을 만드는 함수}마다 자료형 변환 전/후 메모리를 측정합니다.
+    반환값: [{'name', 'rows', 'before_mb', 'after_mb', 'saved'}, ...]
+    """
+    global COMPACT_DTYPES
+    previous = COMPACT_DTYPES
+    rows = []
+    try:
+        for name, builder in builders.items():
+            COMPACT_DTYPES = False
+            before = builder()
+            COMPACT_DTYPES = True
+            after = builder()
+            before_mb, after_mb = memory_mb(before), memory_mb(after)
+            rows.append({
+                'name': name, 'rows': len(after), 'before_mb': before_mb, 'after_mb': after_mb,
+                'saved': 1 - after_mb / before_mb if before_mb else 0.0,
+            })
+    finally:
+        COMPACT_DTYPES = previous
+    return rows
+
+def print_memory_report(rows):
+    print(f"{'데이터':<24} {'행 수':>8} {'변환 전(MB)':>12} {'변환 후(MB)':>12} {'절감':>7}")
+    for row in rows:
+        print(f"{row['name']:<24} {row['rows']:>8} {row['before_mb']:>12.2f} {row['after_mb']:>12.2f} {row['saved']:>7.1%}")
+    before = sum(row['before_mb'] for row in rows)
+    after = sum(row['after_mb'] for row in rows)
+    print(f"{'합계':<24} {'':>8} {before:>12.2f} {after:>12.2f} {1 - after / before if before else 0:>7.1%}")
+
+def loader_builders():
+    """
+    메모리 보고서에서 측정하는 로더 (스냅샷을 거치지 않고 원본 파일에서 새로 만듦)
+    """
+    import activity
+    import Lodging
+    import consumption
+    import cluster_input
+
+    return {
+        'activity': activity.preprocess_data,
+        'lodging_raw': Lodging.load_data,
+        'lodging': Lodging.load_lodging_data,
+        'consumption': consumption.load_consumption_data,
+        'cluster': lambda: cluster_input.load_data_and_model()[0],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="데이터 로더 자료형 변환 전/후 메모리 비교")
+    parser.add_argument('--loaders', default=None, help="쉼표로 구분한 로더 이름 (기본: 전체)")
+    args = parser.parse_args()
+
+    # 스크립트로 실행하면 이 파일은 __main__이므로, 로더가 보는 dtypes 모듈의 설정을 바꾸도록 다시 import
+    import dtypes
+
+    builders = dtypes.loader_builders()
+    if args.loaders:
+        builders = {name: builders[name] for name in args.loaders.split(',') if name}
+    dtypes.print_memory_report(dtypes.memory_report(builders))
@@ -0,0 +1,243 @@
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+from spatial_index import SpatialIndex
+from geocoding import REGION_NAME_NORMALIZATION
+from tables import read_visit_area
+
+# 카카오 로컬 API 대체 서버 (부하/지연 테스트용). 방문지 데이터로 응답을 만듭니다.
+VISIT_AREA_FILE = 'data/tn_visit_area_info_방문지정보2nd.csv'
+HOST = '127.0.0.1'
+PORT = 8100
+
+LATENCY_MS = 0.0        # 기본 응답 지연
+JITTER_MS = 0.0         # 지연 편차 (0 ~ JITTER_MS 사이 무작위로 추가)
+ERROR_RATE = 0.0        # 500 응답 비율
+RATE_LIMIT_RATE = 0.0   # 429 응답 비율
+MAX_DOCUMENTS = 15      # 한 번에 돌려주는 최대 문서 수 (카카오 기본 size)
+
+# 데이터셋 시/도 명칭 -> 카카오 응답 형식 (서울 -> 서울특별시)
+FULL_REGION_NAMES = {short: full for full, short in REGION_NAME_NORMALIZATION.items()}
+
+def normalize_query(text):
+    return ' '.join(str(text).split())
+
+############################ 응답 데이터 ############################
+
+class FakeKakaoData:
+    """
+    방문지 데이터에서 주소 -> 좌표, 장소명 -> 좌표, 좌표 -> 행정구역 응답을 만듭니다.
+    """
+
+    def __init__(self, visit_area_file=VISIT_AREA_FILE):
+        places = read_visit_area('places', visit_area_file).dropna(subset=['X_COORD', 'Y_COORD'])
+        places = places.drop_duplicates(subset=['VISIT_AREA_NM', 'X_COORD', 'Y_COORD']).reset_index(drop=True)
+        self.places = places
+
+        # 정확히 일치하는 주소/장소명 -> 행 번호 목록
+        self.address_rows = {}
+        for column in ['ROAD_NM_ADDR', 'LOTNO_ADDR']:
+            if column in places.columns:
+                for row, value in places[column].dropna().items():
+                    self.address_rows.setdefault(normalize_query(value), []).append(row)
+        self.keyword_rows = {}
+        for row, value in places['VISIT_AREA_NM'].dropna().items():
+            self.keyword_rows.setdefault(normalize_query(value), []).append(row)
+
+        labeled = places.dropna(subset=['SIDO_NM', 'SGG_NM']).reset_index(drop=True)
+        self.labeled = labeled
+        self.index = SpatialIndex(labeled['Y_COORD'].values, labeled['X_COORD'].values)
+
+    def _value(self, row, column, default=''):
+        if column not in self.places.columns or pd.isna(self.places.at[row, column]):
+            return default
+        return str(self.places.at[row, column])
+
+    def _region_fields(self, row):
+        sido_nm = self._value(row, 'SIDO_NM')
+        return {
+            'region_1depth_name': FULL_REGION_NAMES.get(sido_nm, sido_nm),
+            'region_2depth_name': self._value(row, 'SGG_NM'),
+            'region_3depth_name': self._value(row, 'DONG_NM'),
+        }
+
+    def search_address(self, query):
+        documents = []
+        for row in self.address_rows.get(normalize_query(query), [])[:MAX_DOCUMENTS]:
+            address_name = self._value(row, 'LOTNO_ADDR') or self._value(row, 'ROAD_NM_ADDR')
+            x, y = str(self.places.at[row, 'X_COORD']), str(self.places.at[row, 'Y_COORD'])
+            documents.append({
+                'address_name': address_name,
+                'address_type': 'REGION_ADDR',
+                'x': x, 'y': y,
+                'address': {'address_name': address_name, 'x': x, 'y': y, **self._region_fields(row)},
+                'road_address': {'address_name': self._value(row, 'ROAD_NM_ADDR'), 'x': x, 'y': y, **self._region_fields(row)},
+            })
+        return documents
+
+    def search_keyword(self, query):
+        documents = []
+        for row in self.keyword_rows.get(normalize_query(query), [])[:MAX_DOCUMENTS]:
+            documents.append({
+                'place_name': self._value(row, 'VISIT_AREA_NM'),
+                'address_name': self._value(row, 'LOTNO_ADDR') or self._value(row, 'ROAD_NM_ADDR'),
+                'road_address_name': self._value(row, 'ROAD_NM_ADDR'),
+                'x': str(self.places.at[row, 'X_COORD']),
+                'y': str(self.places.at[row, 'Y_COORD']),
+            })
+        return documents
+
+    def coord_to_region(self, x, y):
+        positions, _ = self.index.query_knn(y, x, 1)
+        if len(positions) == 0:
+            return []
+        row = self.labeled.iloc[positions[0]]
+        sido_nm = str(row['SIDO_NM'])
+        region = {
+            'region_type': 'H',
+            'region_1depth_name': FULL_REGION_NAMES.get(sido_nm, sido_nm),
+            'region_2depth_name': str(row['SGG_NM']),
+            'region_3depth_name': str(row['DONG_NM']) if 'DONG_NM' in row and pd.notna(row['DONG_NM']) else '',
+            'x': x, 'y': y,
+        }
+        region['address_name'] = ' '.join(v for v in [region['region_1depth_name'], region['region_2depth_name'], region['region_3depth_name']] if v)
+        return [region]
+
+############################ HTTP 서버 ############################
+
+class FakeKakaoServer(ThreadingHTTPServer):
+    """
+    카카오 로컬 API 3개 엔드포인트의 대체 서버.
+    - /v2/local/search/address.json?query=
+    - /v2/local/search/keyword.json?query=
+    - /v2/local/geo/coord2regioncode.json?x=&y=
+    지연(latency/jitter), 500 오류, 429 응답 비율을 설정할 수 있습니다.
+    """
+    daemon_threads = True
+
+    def __init__(self, data, host=HOST, port=PORT, latency_ms=LATENCY_MS, jitter_ms=JITTER_MS,
+                 error_rate=ERROR_RATE, rate_limit_rate=RATE_LIMIT_RATE, seed=None):
+        super().__init__((host, port), FakeKakaoHandler)
+        self.data = data
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.counters = {'requests': 0, 'errors': 0, 'rate_limited': 0}
+        self.path_counts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_fault(self):
+        """
+        이번 요청의 (지연 초, 상태 코드) - 상태 코드가 None이면 정상 응답
+        """
+        with self._lock:
+            delay = (self.latency_ms + self.random.random() * self.jitter_ms) / 1000
+            roll = self.random.random()
+        if roll < self.error_rate:
+            return delay, 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return delay, 429
+        return delay, None
+
+    def count(self, path, status):
+        with self._lock:
+            self.counters['requests'] += 1
+            self.path_counts[path] = self.path_counts.get(path, 0) + 1
+            if status == 500:
+                self.counters['errors'] += 1
+            elif status == 429:
+                self.counters['rate_limited'] += 1
+
+class FakeKakaoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        server = self.server
+
+        delay, fault = server.next_fault()
+        if delay > 0:
+            time.sleep(delay)
+
+        status, payload = fault, None
+        if fault == 500:
+            payload = {'errorType': 'InternalServerError', 'message': 'injected error'}
+        elif fault == 429:
+            payload = {'errorType': 'RateLimitExceeded', 'message': 'injected rate limit'}
+        else:
+            status, payload = self.route(url.path, query)
+
+        server.count(url.path, status)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self, path, query):
+        data = self.server.data
+        try:
+            if path == '/v2/local/search/address.json':
+                documents = data.search_address(query.get('query', ''))
+            elif path == '/v2/local/search/keyword.json':
+                documents = data.search_keyword(query.get('query', ''))
+            elif path == '/v2/local/geo/coord2regioncode.json':
+                documents = data.coord_to_region(float(query['x']), float(query['y']))
+            else:
+                return 404, {'errorType': 'NotFound', 'message': path}
+        except (KeyError, ValueError) as e:
+            return 400, {'errorType': 'InvalidArgument', 'message': str(e)}
+
+        meta = {'total_count': len(documents), 'pageable_count': len(documents), 'is_end': True}
+        return 200, {'meta': meta, 'documents': documents}
+
+def start_fake_kakao_server(host=HOST, port=0, visit_area_file=VISIT_AREA_FILE, **options):
+    """
+    대체 서버를 백그라운드 스레드에서 실행하고 서버 객체를 반환합니다. (port=0이면 빈 포트 자동 선택)
+    geocoding.set_kakao_base_url(server.base_url)로 연결하고, 끝나면 server.shutdown()을 호출합니다.
+    """
+    server = FakeKakaoServer(FakeKakaoData(visit_area_file), host=host, port=port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="카카오 로컬 API 대체 서버")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--latency-ms', type=float, default=LATENCY_MS)
+    parser.add_argument('--jitter-ms', type=float, default=JITTER_MS)
+    parser.add_argument('--error-rate', type=float, default=ERROR_RATE)
+    parser.add_argument('--rate-limit-rate', type=float, default=RATE_LIMIT_RATE)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeKakaoServer(
+        FakeKakaoData(), host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    )
+    print(f"카카오 대체 서버 실행 중: {server.base_url} (KAKAO_BASE_URL={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,69 @@
+import math
+import time
+import numpy as np
+import pandas as pd
+from geo import haversine_one_to_many, haversine_matrix, haversine_pairwise
+
+# 기존 코드의 행 단위 하버사인 (Lodging / Transports에 있던 구현)
+def row_haversine(lat1, lon1, lat2, lon2):
+    R = 6371.0
+    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(math.radians, [lat1, lon1, lat2, lon2])
+    delta_lat, delta_lon = lat2_rad - lat1_rad, lon2_rad - lon1_rad
+    a = math.sin(delta_lat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2)**2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def make_points(n, seed=0):
+    """
+    한반도 범위의 임의 좌표 데이터프레임 생성
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Y_COORD': rng.uniform(33.0, 38.6, n),
+        'X_COORD': rng.uniform(124.6, 131.0, n),
+    })
+
+def timeit(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(sizes=(1_000, 10_000, 100_000), include_geodesic=True):
+    """
+    기존 행 단위 apply 방식과 벡터화 커널의 실행 시간을 비교합니다.
+    """
+    user_lat, user_lon = 37.5665, 126.9780
+    results = []
+
+    for n in sizes:
+        df = make_points(n)
+        df32 = df.astype(np.float32)
+
+        row = {'n': n}
+        row['apply_haversine'] = timeit(lambda: df.apply(
+            lambda r: row_haversine(user_lat, user_lon, r['Y_COORD'], r['X_COORD']), axis=1), repeat=1)
+        if include_geodesic and n <= 10_000:
+            from geopy.distance import geodesic
+            row['apply_geodesic'] = timeit(lambda: df.apply(
+                lambda r: geodesic((user_lat, user_lon), (r['Y_COORD'], r['X_COORD'])).km, axis=1), repeat=1)
+        row['one_to_many_f64'] = timeit(lambda: haversine_one_to_many(user_lat, user_lon, df['Y_COORD'], df['X_COORD']))
+        row['one_to_many_f32'] = timeit(lambda: haversine_one_to_many(user_lat, user_lon, df32['Y_COORD'], df32['X_COORD']))
+        row['pairwise_f64'] = timeit(lambda: haversine_pairwise(df['Y_COORD'], df['X_COORD'], df['Y_COORD'][::-1], df['X_COORD'][::-1]))
+
+        # 거리 행렬은 n x 1000 크기로 제한
+        targets = make_points(1_000, seed=1)
+        row['matrix_n_x_1000'] = timeit(lambda: haversine_matrix(df['Y_COORD'], df['X_COORD'], targets['Y_COORD'], targets['X_COORD']), repeat=1)
+
+        # 정확도: 기존 구현과의 최대 차이 (km)
+        expected = np.array([row_haversine(user_lat, user_lon, lat, lon) for lat, lon in zip(df['Y_COORD'], df['X_COORD'])])
+        row['max_abs_diff_f64'] = float(np.max(np.abs(haversine_one_to_many(user_lat, user_lon, df['Y_COORD'], df['X_COORD']) - expected)))
+        row['max_abs_diff_f32'] = float(np.max(np.abs(haversine_one_to_many(user_lat, user_lon, df32['Y_COORD'], df32['X_COORD']) - expected)))
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    pd.set_option('display.width', 200)
+    print(run_benchmark())
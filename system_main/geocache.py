@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 캐시 파일 경로 및 기본 설정
+CACHE_FILE = 'data/cache/geocode_cache.sqlite3'
+MAX_ENTRIES = 50000                    # 최대 저장 개수 (초과 시 가장 오래 사용하지 않은 항목부터 삭제)
+TTL_SECONDS = 30 * 24 * 60 * 60        # 정상 결과 유효 기간 (30일)
+NEGATIVE_TTL_SECONDS = 24 * 60 * 60    # "검색 결과 없음" 유효 기간 (1일)
+COORD_DIGITS = 5                       # 좌표 반올림 자릿수 (약 1m)
+
+############################ 캐시 키 ############################
+
+def address_key(address):
+    """
+    주소/키워드 캐시 키 - 앞뒤 공백 제거, 연속 공백 하나로 통일
+    """
+    return 'addr:' + ' '.join(str(address).split()).lower()
+
+def coords_key(x, y, digits=COORD_DIGITS):
+    """
+    좌표 캐시 키 - 경도(x), 위도(y)를 반올림
+    """
+    return f"rgn:{round(float(x), digits):.{digits}f},{round(float(y), digits):.{digits}f}"
+
+############################ 캐시 본체 ############################
+
+class GeocodeCache:
+    """
+    SQLite 기반 지오코딩 결과 캐시.
+    - 최대 개수 초과 시 LRU(마지막 사용 시각) 순으로 삭제
+    - 정상 결과와 "결과 없음"(negative) 결과의 TTL을 따로 관리
+    - hit/miss 카운터 제공
+    여러 스레드에서 동시에 사용해도 되도록 하나의 잠금으로 보호합니다.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, negative_ttl=NEGATIVE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                negative INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_geocode_last_access ON geocode_cache (last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        캐시 조회. 반환값: (찾았는지 여부, 값)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, negative, created_at FROM geocode_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.counters['misses'] += 1
+                return False, None
+
+            value, negative, created_at = row
+            ttl = self.negative_ttl if negative else self.ttl
+            if now - created_at > ttl:
+                # 유효 기간이 지난 항목은 삭제 후 miss 처리
+                self._conn.execute("DELETE FROM geocode_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.counters['expired'] += 1
+                self.counters['misses'] += 1
+                return False, None
+
+            self._conn.execute("UPDATE geocode_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.counters['negative_hits' if negative else 'hits'] += 1
+            return True, json.loads(value)
+
+    def set(self, key, value, negative=False):
+        """
+        캐시 저장. negative=True는 "검색 결과 없음" 같은 빈 결과를 의미합니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (key, value, negative, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), int(negative), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+        count = self._conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM geocode_cache WHERE key IN (SELECT key FROM geocode_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.counters['evictions'] += overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM geocode_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+
+    def stats(self):
+        """
+        hit/miss 카운터와 적중률
+        """
+        total = self.counters['hits'] + self.counters['negative_hits'] + self.counters['misses']
+        hit_rate = (self.counters['hits'] + self.counters['negative_hits']) / total if total else 0.0
+        return {**self.counters, 'entries': len(self), 'hit_rate': hit_rate}
+
+# 모듈 전역 캐시 (처음 사용할 때 생성)
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_geocode_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = GeocodeCache()
+        return _default_cache
@@ -1,112 +1,269 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from geocache import get_geocode_cache, address_key, coords_key
+from reverse_geocoder import get_local_reverse_geocoder
+from kakao_client import KakaoClient
+from profiling import profiled, bind
+import geocache
+import metrics
 
 # 카카오 API 키 설정
 API_KEY = ""
 
-# 지오코딩 함수 정의
+# 카카오 API 주소 (로컬 대체 서버 fake_kakao_server.py를 쓸 때는 환경 변수나 set_kakao_base_url로 변경)
+KAKAO_BASE_URL = os.environ.get('KAKAO_BASE_URL', 'https://dapi.kakao.com')
+
+# 로컬 역지오코딩 설정 (신뢰도가 기준 미만일 때만 카카오 API 사용)
+USE_LOCAL_REVERSE_GEOCODER = True
+LOCAL_MIN_CONFIDENCE = 0.7
+
+# 오프라인 모드: 카카오 API를 호출하지 않고 캐시와 로컬 역지오코더만 사용 (서버/테스트용)
+OFFLINE_MODE = False
+
+# 카카오 로컬 API 경로
+# (단계 이름, 경로, 지역명 필드) - 도로명/일반 주소는 같은 address.json을 사용
+ADDRESS_SEARCH_STEPS = [
+    ("도로명 주소", 'v2/local/search/address.json', 'address'),
+    ("일반 주소", 'v2/local/search/address.json', 'address'),
+    ("키워드 검색", 'v2/local/search/keyword.json', 'address_name'),
+]
+REGION_PATH = 'v2/local/geo/coord2regioncode.json'
+
+# 여러 좌표를 한 번에 역지오코딩할 때 동시 요청 수
+BATCH_WORKERS = 8
+
+# API 응답 상태 (캐시 저장 여부 판단용)
+FETCH_OK = 'ok'        # 결과 있음 → 캐시
+FETCH_EMPTY = 'empty'  # 정상 응답이지만 결과 없음 → negative 캐시
+FETCH_ERROR = 'error'  # 요청 실패 → 캐시하지 않음
+
+# 운영 지표 (kind: address(주소→좌표), region(좌표→행정구역))
+GEOCODING_REQUESTS = metrics.counter(
+    'travel_geocoding_requests_total', "지오코딩 조회 수 (source: 응답을 만든 곳)", ['kind', 'source']
+)
+GEOCODING_FAILURES = metrics.counter(
+    'travel_geocoding_failures_total', "지오코딩 실패 수 (reason: empty 결과 없음, error 요청 실패)", ['kind', 'reason']
+)
+
+# 모듈 전역 카카오 클라이언트 (연결 풀 재사용, 처음 사용할 때 생성)
+_kakao_client = None
+_kakao_client_lock = threading.Lock()
+
+def get_kakao_client():
+    global _kakao_client
+    with _kakao_client_lock:
+        if _kakao_client is None:
+            _kakao_client = KakaoClient(api_key=API_KEY, base_url=KAKAO_BASE_URL)
+        return _kakao_client
+
+def set_kakao_base_url(base_url):
+    """
+    카카오 API 주소를 바꾸고 클라이언트를 다시 만듭니다. (예: 'http://127.0.0.1:8100')
+    """
+    global KAKAO_BASE_URL, _kakao_client
+    with _kakao_client_lock:
+        KAKAO_BASE_URL = base_url
+        if _kakao_client is not None:
+            _kakao_client.close()
+        _kakao_client = None
+
+# 지오코딩 함수 정의 (캐시 적용)
+@profiled()
 def get_coordinates(address, timeout=5):
     """
     주소나 키워드를 입력받아 위도(Y_COORD), 경도(X_COORD), 그리고 지역 정보를 반환하는 함수.
-    순서: 도로명 주소 → 일반 주소 → 키워드 검색
+    순서: 캐시 → 도로명 주소 → 일반 주소 → 키워드 검색
+    오프라인 모드에서는 캐시에 없는 주소를 "검색 결과 없음"으로 처리합니다.
     """
-    headers = {"Authorization": f"KakaoAK {API_KEY}"}
+    cache = get_geocode_cache()
+    key = address_key(address)
+    found, value = cache.get(key)
+    if found:
+        GEOCODING_REQUESTS.inc(kind='address', source='cache')
+        return tuple(value)
+    if OFFLINE_MODE:
+        GEOCODING_REQUESTS.inc(kind='address', source='offline')
+        return None, None, "검색 결과 없음"
 
-    # 1. 도로명 주소 검색
-    try:
-        url_road = f"https://dapi.kakao.com/v2/local/search/address.json?query={address}"
-        response_road = requests.get(url_road, headers=headers, timeout=timeout)
-        if response_road.status_code == 200:
-            result_road = response_road.json()
-            if result_road.get('documents'):
-                document = result_road['documents'][0]
-                x_coord = document['x']  # 경도
-                y_coord = document['y']  # 위도
-                region = document.get('address', {}).get('region_2depth_name', "알 수 없음")
-                return x_coord, y_coord, region
-    except requests.exceptions.RequestException as e:
-        print(f"도로명 주소 요청 중 오류 발생: {e}")
+    GEOCODING_REQUESTS.inc(kind='address', source='api')
+    result, status = _fetch_coordinates(address, timeout)
+    if status != FETCH_OK:
+        GEOCODING_FAILURES.inc(kind='address', reason=status)
+    if status != FETCH_ERROR:
+        cache.set(key, list(result), negative=(status == FETCH_EMPTY))
+    return result
 
-    # 2. 일반 주소 검색
-    try:
-        url_general = f"https://dapi.kakao.com/v2/local/search/address.json?query={address}"
-        response_general = requests.get(url_general, headers=headers, timeout=timeout)
-        if response_general.status_code == 200:
-            result_general = response_general.json()
-            if result_general.get('documents'):
-                document = result_general['documents'][0]
-                x_coord = document['x']  # 경도
-                y_coord = document['y']  # 위도
-                region = document.get('address', {}).get('region_2depth_name', "알 수 없음")
-                return x_coord, y_coord, region
-    except requests.exceptions.RequestException as e:
-        print(f"일반 주소 요청 중 오류 발생: {e}")
+def _fetch_coordinates(address, timeout=5):
+    """
+    카카오 API로 좌표를 조회합니다. 반환값: ((x, y, region), 응답 상태)
+    도로명/일반 주소 단계는 같은 URL이므로 한 번만 요청합니다.
+    """
+    client = get_kakao_client()
+    failed = False  # 한 단계라도 요청이 실패했는지 (예외, 200이 아닌 응답)
+    requested = set()
 
-    # 3. 키워드 검색
-    try:
-        url_keyword = f"https://dapi.kakao.com/v2/local/search/keyword.json?query={address}"
-        response_keyword = requests.get(url_keyword, headers=headers, timeout=timeout)
-        if response_keyword.status_code == 200:
-            result_keyword = response_keyword.json()
-            if result_keyword.get('documents'):
-                document = result_keyword['documents'][0]
-                x_coord = document['x']  # 경도
-                y_coord = document['y']  # 위도
+    for step_name, path, region_field in ADDRESS_SEARCH_STEPS:
+        if path in requested:
+            continue
+        requested.add(path)
+
+        try:
+            status_code, result = client.get_json(path, {'query': address}, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"{step_name} 요청 중 오류 발생: {e}")
+            failed = True
+            continue
+
+        if status_code != 200:
+            failed = True
+        elif result.get('documents'):
+            document = result['documents'][0]
+            x_coord = document['x']  # 경도
+            y_coord = document['y']  # 위도
+            if region_field == 'address':
+                region = (document.get('address') or {}).get('region_2depth_name', "알 수 없음")
+            else:
                 region = document.get('address_name', "알 수 없음")
-                return x_coord, y_coord, region
-    except requests.exceptions.RequestException as e:
-        print(f"키워드 검색 요청 중 오류 발생: {e}")
+            return (x_coord, y_coord, region), FETCH_OK
+
+    # 결과가 없으면 None 반환. 모든 단계가 정상 응답(200)에 결과가 없을 때만 negative 캐시 대상
+    return (None, None, "검색 결과 없음"), (FETCH_ERROR if failed else FETCH_EMPTY)
 
-    # 모든 단계 실패 시 None 반환
-    return None, None, "검색 결과 없음"
 
+# 카카오 시/도 명칭 -> 데이터셋 SIDO_NM 형식
+REGION_NAME_NORMALIZATION = {
+    "서울특별시": "서울",
+    "부산광역시": "부산",
+    "대구광역시": "대구",
+    "인천광역시": "인천",
+    "광주광역시": "광주",
+    "대전광역시": "대전",
+    "울산광역시": "울산",
+    "세종특별자치시": "세종",
+    "경기도": "경기",
+    "강원특별자치도": "강원",
+    "충청북도": "충북",
+    "충청남도": "충남",
+    "전라북도": "전북",
+    "전라남도": "전남",
+    "경상북도": "경북",
+    "경상남도": "경남",
+    "제주특별자치도": "제주"
+}
 
 # 정규화 함수 추가
 def normalize_region_name(region_name):
     """
     SIDO_NM(시/도 명칭)을 정규화하여 데이터셋 형식과 일치시킵니다.
     """
-    normalization_map = {
-        "서울특별시": "서울",
-        "부산광역시": "부산",
-        "대구광역시": "대구",
-        "인천광역시": "인천",
-        "광주광역시": "광주",
-        "대전광역시": "대전",
-        "울산광역시": "울산",
-        "세종특별자치시": "세종",
-        "경기도": "경기",
-        "강원특별자치도": "강원",
-        "충청북도": "충북",
-        "충청남도": "충남",
-        "전라북도": "전북",
-        "전라남도": "전남",
-        "경상북도": "경북",
-        "경상남도": "경남",
-        "제주특별자치도": "제주"
-    }
-    return normalization_map.get(region_name, region_name)  # 매핑되지 않은 값은 원래 값 반환
+    return REGION_NAME_NORMALIZATION.get(region_name, region_name)  # 매핑되지 않은 값은 원래 값 반환
 
+@profiled()
 def get_region_from_coords(x, y, timeout=5):
     """
     좌표(x, y)를 입력받아 시/도 및 구 단위 정보를 반환하는 함수.
+    순서: 로컬 역지오코더(신뢰도 충분 시) → 캐시 → 카카오 API
+    오프라인 모드에서는 캐시에 없으면 신뢰도와 관계없이 로컬 역지오코더 결과를 사용합니다.
+    """
+    local_result = None
+    if USE_LOCAL_REVERSE_GEOCODER or OFFLINE_MODE:
+        geocoder = get_local_reverse_geocoder()
+        if geocoder is not None:
+            sido_nm, sgg_nm, confidence = geocoder.lookup(x, y)
+            if confidence >= LOCAL_MIN_CONFIDENCE:
+                GEOCODING_REQUESTS.inc(kind='region', source='local')
+                return sido_nm, sgg_nm
+            if confidence > 0:
+                local_result = (sido_nm, sgg_nm)
+
+    cache = get_geocode_cache()
+    key = coords_key(x, y)
+    found, value = cache.get(key)
+    if found:
+        GEOCODING_REQUESTS.inc(kind='region', source='cache')
+        return tuple(value)
+    if OFFLINE_MODE:
+        GEOCODING_REQUESTS.inc(kind='region', source='offline')
+        if local_result is None:
+            GEOCODING_FAILURES.inc(kind='region', reason=FETCH_EMPTY)
+        return local_result or ("알 수 없음", "알 수 없음")
+
+    GEOCODING_REQUESTS.inc(kind='region', source='api')
+    result, status = _fetch_region_from_coords(x, y, timeout)
+    if status != FETCH_OK:
+        GEOCODING_FAILURES.inc(kind='region', reason=status)
+    if status != FETCH_ERROR:
+        cache.set(key, list(result), negative=(status == FETCH_EMPTY))
+    return result
+
+def _fetch_region_from_coords(x, y, timeout=5):
+    """
+    카카오 API로 좌표의 행정구역을 조회합니다. 반환값: ((sido_nm, sgg_nm), 응답 상태)
     """
-    headers = {"Authorization": f"KakaoAK {API_KEY}"}
+    status = FETCH_ERROR
 
     try:
         # 카카오 지도 API 요청
-        url = f"https://dapi.kakao.com/v2/local/geo/coord2regioncode.json?x={x}&y={y}"
-        response = requests.get(url, headers=headers, timeout=timeout)
+        status_code, result = get_kakao_client().get_json(REGION_PATH, {'x': x, 'y': y}, timeout=timeout)
 
-        if response.status_code == 200:
-            result = response.json()
+        if status_code == 200:
+            status = FETCH_EMPTY
             if result.get('documents'):
                 document = result['documents'][0]
                 sido_nm = normalize_region_name(document.get('region_1depth_name', "알 수 없음"))  # 시/도 정규화
                 sgg_nm = document.get('region_2depth_name', "알 수 없음")   # 구 단위 정보
-                return sido_nm, sgg_nm  # 시/도 및 구 단위 반환
+                return (sido_nm, sgg_nm), FETCH_OK  # 시/도 및 구 단위 반환
 
     except requests.exceptions.RequestException as e:
         print(f"좌표 기반 역지오코딩 요청 중 오류 발생: {e}")
 
     # 실패 시 기본값 반환
-    return "알 수 없음", "알 수 없음"
+    return ("알 수 없음", "알 수 없음"), status
+
+def collect_client_metrics():
+    """
+    지오코딩 캐시와 카카오 클라이언트의 counters를 지표로 내보냅니다. (아직 만들어지지 않았으면 건너뜀)
+    """
+    families = []
+    cache = geocache._default_cache
+    if cache is not None:
+        stats = cache.stats()
+        families.append(('travel_geocache_events_total', 'counter', "지오코딩 캐시 조회 결과별 횟수",
+                         [({'event': name}, stats[name]) for name in ['hits', 'negative_hits', 'misses', 'expired', 'evictions']]))
+        families.append(('travel_geocache_entries', 'gauge', "지오코딩 캐시 항목 수", [({}, stats['entries'])]))
+    client = _kakao_client
+    if client is not None:
+        families.append(('travel_kakao_client_events_total', 'counter', "카카오 클라이언트 요청/합류/재시도 횟수",
+                         [({'event': name}, value) for name, value in dict(client.counters).items()]))
+    return families
+
+metrics.register_collector(collect_client_metrics)
+
+############################ 일괄 역지오코딩 ############################
+
+@profiled()
+def get_regions_from_coords(coords, timeout=5, max_workers=BATCH_WORKERS):
+    """
+    여러 좌표 [(x, y), ...]의 (시/도, 시군구)를 동시에 조회하고 입력 순서대로 반환합니다.
+    """
+    coords = list(coords)
+    if len(coords) <= 1:
+        return [get_region_from_coords(x, y, timeout) for x, y in coords]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(coords))) as pool:
+        lookup = bind(lambda coord: get_region_from_coords(coord[0], coord[1], timeout))
+        return list(pool.map(lookup, coords))
+
+async def get_regions_from_coords_async(coords, timeout=5, max_concurrency=BATCH_WORKERS):
+    """
+    get_regions_from_coords의 비동기 버전 (이벤트 루프 안에서 사용)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def lookup(x, y):
+        async with semaphore:
+            return await asyncio.to_thread(get_region_from_coords, x, y, timeout)
+
+    return list(await asyncio.gather(*(lookup(x, y) for x, y in coords)))
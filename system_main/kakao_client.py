@@ -0,0 +1,166 @@
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from profiling import stage
+import metrics
+
+# 카카오 로컬 API 기본 설정
+KAKAO_BASE_URL = 'https://dapi.kakao.com'
+DEFAULT_TIMEOUT = 5
+POOL_SIZE = 16                 # 세션 연결 풀 크기 (동시 요청 수)
+RATE_LIMIT_PER_SECOND = 10.0   # 클라이언트 측 초당 요청 수 제한 (None이면 제한 없음)
+RATE_LIMIT_BURST = 10          # 순간적으로 허용하는 요청 수
+MAX_RETRIES = 3                # 429 응답 재시도 횟수
+BACKOFF_BASE_SECONDS = 0.5     # 재시도 대기 시간 (0.5, 1, 2, ... 초 + 약간의 무작위 지연)
+MAX_BACKOFF_SECONDS = 10.0
+
+# 운영 지표 (status: HTTP 상태 코드 또는 네트워크 오류 시 error)
+KAKAO_RESPONSES = metrics.counter('travel_kakao_responses_total', "카카오 API 응답 수", ['status'])
+KAKAO_LATENCY = metrics.histogram('travel_kakao_request_seconds', "카카오 API 요청 한 번의 응답 시간(초)")
+
+############################ 요청 속도 제한 ############################
+
+class RateLimiter:
+    """
+    토큰 버킷 방식의 요청 속도 제한. 여러 스레드에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST):
+        self.rate = rate
+        self.capacity = max(1, burst or 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+############################ 카카오 클라이언트 ############################
+
+class KakaoClient:
+    """
+    카카오 로컬 API 클라이언트.
+    - requests.Session 연결 풀을 재사용
+    - 같은 URL로 동시에 들어온 요청은 한 번만 보내고 결과를 공유 (single-flight)
+    - 클라이언트 측 속도 제한, 429 응답은 Retry-After 또는 지수 백오프 후 재시도
+    get_json은 (HTTP 상태 코드, JSON 또는 None)을 반환하고, 네트워크 오류는 requests 예외로 전달합니다.
+    """
+
+    def __init__(self, api_key='', base_url=KAKAO_BASE_URL, pool_size=POOL_SIZE, rate_limiter=None,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE_SECONDS):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.counters = {'requests': 0, 'coalesced': 0, 'retries': 0}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def build_url(self, path, params=None):
+        return requests.Request('GET', f"{self.base_url}/{path.lstrip('/')}", params=params).prepare().url
+
+    def get_json(self, path, params=None, timeout=DEFAULT_TIMEOUT):
+        url = self.build_url(path, params)
+
+        # 같은 URL 요청이 이미 진행 중이면 그 결과를 기다림
+        with self._lock:
+            future = self._inflight.get(url)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[url] = future
+            else:
+                self.counters['coalesced'] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._request(url, timeout)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def _request(self, url, timeout):
+        headers = {"Authorization": f"KakaoAK {self.api_key}"}
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            with self._lock:
+                self.counters['requests'] += 1
+            start = time.perf_counter()
+            try:
+                with stage('kakao.request'):
+                    response = self.session.get(url, headers=headers, timeout=timeout)
+            except requests.exceptions.RequestException:
+                KAKAO_RESPONSES.inc(status='error')
+                raise
+            finally:
+                KAKAO_LATENCY.observe(time.perf_counter() - start)
+            KAKAO_RESPONSES.inc(status=response.status_code)
+
+            if response.status_code == 429 and attempt < self.max_retries:
+                with self._lock:
+                    self.counters['retries'] += 1
+                time.sleep(self._retry_delay(response, attempt))
+                continue
+
+            if response.status_code != 200:
+                return response.status_code, None
+            return response.status_code, response.json()
+        return response.status_code, None
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After')
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = self.backoff_base * (2 ** attempt) * (1 + random.random() * 0.25)
+        return min(delay, MAX_BACKOFF_SECONDS)
+
+    async def get_json_async(self, path, params=None, timeout=DEFAULT_TIMEOUT):
+        """
+        get_json의 비동기 버전 (요청은 스레드에서 실행되므로 연결 풀과 single-flight를 그대로 공유)
+        """
+        return await asyncio.to_thread(self.get_json, path, params, timeout)
+
+    async def gather_json(self, requests_, timeout=DEFAULT_TIMEOUT, max_concurrency=POOL_SIZE):
+        """
+        여러 요청 [(path, params), ...]을 동시에 보내고 입력 순서대로 결과를 반환합니다.
+        실패한 요청은 예외 객체가 결과 자리에 들어갑니다.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(path, params):
+            async with semaphore:
+                return await self.get_json_async(path, params, timeout)
+
+        return await asyncio.gather(*(fetch(path, params) for path, params in requests_), return_exceptions=True)
+
+    def close(self):
+        self.session.close()
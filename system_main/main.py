@@ -1,13 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
 from geocoding import get_coordinates
-from cluster_input import cluster_predict, load_data_and_model
 import pandas as pd
 import os
-from activity import activity_first_rmd, des_act_rmd , activity_second_rmd
-from Transports import haversine
-from consumption import food_top_place
-from Lodging import get_lodging_score_result  
+from recommendation_engine import RecommendationEngine, TravelProfile, ANY_REGION, place_text
+from consumption import visited_places
+from profiling import profiled
+import metrics
 
 # 동행 형태와 동행자 수 매핑
 COMPANION_MAP = {
@@ -74,31 +73,13 @@ def load_previous_inputs():
         except Exception as e:
             print(f"입력값 로드 중 오류 발생: {e}")
     return {}  # 입력값이 없거나 파일이 없으면 빈 딕셔너리 반환
-# 나이를 숫자 연령대로 변환하는 함수
-def age_to_age_grp(age):
-    """
-    나이를 10, 20, 30 등 숫자 범주의 연령대로 변환
-    """
-    if age < 20:
-        return 10
-    elif age < 30:
-        return 20
-    elif age < 40:
-        return 30
-    elif age < 50:
-        return 40
-    elif age < 60:
-        return 50
-    else:
-        return 60
-
 
 
 # Tkinter GUI 만들기
 def main_gui():
-    # 모델과 데이터 로드
+    # 모델과 데이터 로드 (추천 엔진이 한 번만 로드)
     try:
-        df_cluster, kmeans_model, model_features = load_data_and_model()  # 반환값 3개로 수정
+        engine = RecommendationEngine()
     except Exception as e:
         print(f"데이터 및 모델 로드 실패: {e}")
         return
@@ -199,55 +180,21 @@ def main_gui():
     result_label_coords = tk.Label(root, text="좌표: ", justify="left")
     result_label_coords.grid(row=11, column=0, columnspan=2, padx=10, pady=5)
 
-    def show_recommendations(current_location, preferred_region, cluster_label, traffic, cp_status, user_lat, user_lon, top_n):
-
-        # 사용자의 위도와 경도를 float로 변환
-        user_lat = float(user_lat)
-        user_lon = float(user_lon)
+    @profiled('gui.show_recommendations')
+    def show_recommendations(current_location, profile, cluster_label):
+        # 추천 계산은 엔진에서 처리하고 GUI는 결과만 출력
+        # GUI는 한 사용자만 쓰므로 이전에 추천한 음식점을 다시 추천하지 않도록 모듈 전역 방문 목록을 사용
+        itinerary = engine.recommend(profile, cluster_label, visited=visited_places)
+        recommendations = itinerary.first_activities
 
         # 새로운 tkinter 창 생성
         new_window = tk.Toplevel()
         new_window.title("추천 결과")
 
         # 상단에 현재 위치와 선호 지역 표시
-        info_text = f"현재 위치: {current_location} | 선호 지역: {preferred_region}"
+        info_text = f"현재 위치: {current_location} | 선호 지역: {profile.preferred_region}"
         tk.Label(new_window, text=info_text, font=("Arial", 12, "bold")).grid(row=0, column=0, columnspan=10, pady=10)
 
-        # 첫 번째 추천 지역 계산
-        if preferred_region == "상관없음":
-            recommendations = activity_first_rmd(cluster_label, user_lat, user_lon, top_n)
-        else:
-            recommendations = des_act_rmd(cluster_label, target_sido=preferred_region, top_n=top_n)
-
-        # 추천 지역과 사용자의 거리 계산
-        recommendations['직선 거리 (km)'] = recommendations.apply(
-            lambda row: round(haversine(user_lat, user_lon, row['Y_COORD'], row['X_COORD']), 2),
-            axis=1
-        )
-
-        # 음식점 추천 결과 추가 (점심)
-        recommendations['점심'] = recommendations.apply(
-            lambda row: food_top_place(row['X_COORD'], row['Y_COORD'], cluster_label),
-            axis=1
-        )
-
-        # 숙박 정보 추가 (top_n > 1일 경우에만 실행)
-        lodging_info_text = None
-        if top_n > 1:  # 당일 여행이 아닌 경우
-            first_activity = recommendations.iloc[0]  # 첫 번째 추천 액티비티
-            lodging_info = get_lodging_score_result(
-                first_activity['X_COORD'], 
-                first_activity['Y_COORD'], 
-                boundary=5,  # 숙박 기준 거리 반경 (예: 5km)
-                mvmn=traffic, 
-                family=cp_status
-            )
-            # 숙박 정보 텍스트 생성
-            if not lodging_info.empty:
-                lodging_info_text = f"{lodging_info.iloc[0]['VISIT_AREA_NM']} ({lodging_info.iloc[0]['ROAD_NM_ADDR']})"
-            else:
-                lodging_info_text = "추천 데이터 없음"
-
         # 첫 번째 추천 지역 GUI 출력
         display_columns = ['추천 액티비티', '도로명 주소', '목표 거리(km)', '점심']
         for idx, col_name in enumerate(display_columns):
@@ -259,37 +206,15 @@ def main_gui():
                 tk.Label(new_window, text=value).grid(row=row_idx + 2, column=col_idx, padx=5, pady=5)
 
             # 점심 정보 출력
-            food_result = row['점심']
-            if food_result:
-                food_text = f"{food_result['VISIT_AREA_NM']} ({food_result['ROAD_NM_ADDR']})"
-            else:
-                food_text = "추천 데이터 없음"
+            food_text = place_text(itinerary.lunches[row_idx])
             tk.Label(new_window, text=food_text).grid(row=row_idx + 2, column=len(display_columns) - 1, padx=5, pady=5)
 
-        # 두 번째 추천 지역 계산
-        exclude_coords = list(zip(recommendations['X_COORD'], recommendations['Y_COORD']))
-        second_recommendations = []
-        display_columns_second = ['추천 액티비티', '도로명 주소', '저녁']
-        if not recommendations.empty:
-            for row_idx, row in recommendations.iterrows():
-                food_result = row['점심']
-                if food_result and isinstance(food_result, dict):
-                    food_lon = food_result.get('X_COORD')
-                    food_lat = food_result.get('Y_COORD')
-
-                    if food_lon and food_lat:
-                        second_rec = activity_second_rmd(
-                            cluster_label, food_lat, food_lon, radius=5, top_n=1, exclude_coords=exclude_coords
-                        )
-                        if not second_rec.empty:
-                            second_rec['점심'] = f"{food_result['VISIT_AREA_NM']} ({food_result['ROAD_NM_ADDR']})"
-                            second_recommendations.append(second_rec)
-
         # 두 번째 추천 지역 출력
+        second_recommendations_df = itinerary.second_activities
+        display_columns_second = ['추천 액티비티', '도로명 주소', '저녁']
         tk.Label(new_window, text="두 번째 추천 지역", font=("Arial", 12, "bold")).grid(row=len(recommendations) + 3, column=0, columnspan=10, pady=10)
 
-        if second_recommendations:
-            second_recommendations_df = pd.concat(second_recommendations, ignore_index=True)
+        if not second_recommendations_df.empty:
             for idx, col_name in enumerate(display_columns_second):
                 tk.Label(new_window, text=col_name, font=("Arial", 10, "bold")).grid(row=len(recommendations) + 4, column=idx, padx=5, pady=5)
 
@@ -299,20 +224,18 @@ def main_gui():
                     value = row[col_name] if col_name in second_recommendations_df.columns else "정보 없음"
                     tk.Label(new_window, text=value).grid(row=second_row_offset + row_idx, column=col_idx, padx=5, pady=5)
 
-                second_food_result = food_top_place(row['X_COORD'], row['Y_COORD'], cluster_label)
-                if second_food_result:
-                    second_food_text = f"{second_food_result['VISIT_AREA_NM']} ({second_food_result['ROAD_NM_ADDR']})"
-                else:
-                    second_food_text = "추천 데이터 없음"
+                second_food_text = place_text(itinerary.dinners[row_idx])
                 tk.Label(new_window, text=second_food_text).grid(row=second_row_offset + row_idx, column=len(display_columns_second) - 1, padx=5, pady=5)
 
-        # 숙박 정보 출력 (top_n > 1일 때만 표시)
+        # 숙박 정보 출력 (당일 여행이 아닐 때만 표시)
+        lodging_info_text = itinerary.lodging_text
         if lodging_info_text:
             tk.Label(new_window, text="숙박 추천", font=("Arial", 12, "bold")).grid(row=len(recommendations) + 4, column=len(display_columns_second), padx=5, pady=5)
             tk.Label(new_window, text=lodging_info_text).grid(row=len(recommendations) + 5, column=len(display_columns_second), padx=5, pady=5)
 
 
 
+    @profiled('gui.selection_complete')
     def selection_complete():
         location = location_entry.get()
         preferred_region = region_combo.get()  # 선호 지역 값
@@ -353,11 +276,14 @@ def main_gui():
 
         day = day + 1
         try:
-            # 나이를 숫자 연령대로 변환
-            age_grp = age_to_age_grp(int(age))
-            
+            profile = TravelProfile(
+                user_lon=x_coord, user_lat=y_coord, age=age, cp_status=cp_status, cp_num=cp_num,
+                nights=day - 1, traffic=traffic, purpose=purpose,
+                preferred_region=preferred_region, location=location, region=region
+            )
+
             # 클러스터 예측
-            cluster = cluster_predict(age_grp, int(cp_num), cp_status, day-1, purpose, traffic)
+            cluster = engine.predict_cluster(profile)
 
             # 결과 레이블 갱신
             result_label_cluster.config(text=f"클러스터: {cluster}")
@@ -386,23 +312,18 @@ def main_gui():
                 print(f"입력값 저장 중 오류 발생: {e}")
 
             # 선호 지역이 "상관없음"일 때 다른 창을 띄움
-            if preferred_region == "상관없음":
-                show_all_recommendations(location, cluster, y_coord, x_coord, day, top_n=5)
+            if preferred_region == ANY_REGION:
+                show_all_recommendations(location, profile, cluster)
             else:
-                show_recommendations(region, preferred_region, cluster, traffic, cp_status, y_coord, x_coord, top_n=day)
+                show_recommendations(region, profile, cluster)
 
         except Exception as e:
             result_label_cluster.config(text=f"오류: {str(e)}")
             result_label_region.config(text="")
 
 
-    def show_all_recommendations(current_location, cluster_label, user_lat, user_lon, day, top_n):
-        import tkinter as tk
-        from geocoding import get_region_from_coords
-
-        user_lat = float(user_lat)
-        user_lon = float(user_lon)
-
+    @profiled('gui.show_all_recommendations')
+    def show_all_recommendations(current_location, profile, cluster_label):
         all_recommendations_window = tk.Toplevel()
         all_recommendations_window.title("모든 추천 지역 보기")
 
@@ -410,14 +331,7 @@ def main_gui():
             row=0, column=0, columnspan=4, pady=10
         )
 
-        recommendations = activity_first_rmd(cluster_label, user_lat, user_lon, top_n)
-        recommendations['distance_to_user'] = recommendations.apply(
-            lambda row: haversine(user_lat, user_lon, row['Y_COORD'], row['X_COORD']),
-            axis=1
-        )
-        recommendations['시/도'] = recommendations.apply(
-            lambda row: get_region_from_coords(row['X_COORD'], row['Y_COORD'])[0], axis=1
-        )
+        recommendations = engine.candidate_regions(profile, cluster_label)
 
         display_columns = ['시/도', 'VISIT_AREA_NM', 'ROAD_NM_ADDR', 'distance_to_user']
         headers = ['시/도', '추천 액티비티', '도로명 주소', '직선 거리 (km)']
@@ -433,29 +347,21 @@ def main_gui():
             tk.Button(
                 all_recommendations_window,
                 text=f"선택 {row_idx + 1}",
-                command=lambda r=row: select_recommendation(r,day)
+                command=lambda r=row: select_recommendation(r)
             ).grid(row=row_idx + 2, column=len(display_columns), padx=5, pady=5)
 
-        def select_recommendation(selected_row,day):
+        def select_recommendation(selected_row):
             """
             사용자가 선택한 추천 지역을 처리하는 함수.
             선택한 지역 정보를 로그에 출력하고 창을 닫습니다.
             """
-            #print(f"사용자가 선택한 지역: {selected_row['VISIT_AREA_NM']}")
-            #print(f"도로명 주소: {selected_row['ROAD_NM_ADDR']}")
-            #print(f"좌표: ({selected_row['X_COORD']}, {selected_row['Y_COORD']})")
-
-            # 선택한 정보를 이후 프로세스로 전달
-            show_recommendations(
-                current_location=current_location,
+            # 선택한 시/도와 현재 선택된 이동 수단/동행 형태로 추천 진행
+            selected_profile = profile.replace(
                 preferred_region=selected_row['시/도'],
-                cluster_label=cluster_label,
                 traffic=traffic_combo.get(),
-                cp_status=cp_status_combo.get(),
-                user_lat=user_lat,
-                user_lon=user_lon,
-                top_n=day
+                cp_status=cp_status_combo.get()
             )
+            show_recommendations(current_location, selected_profile, cluster_label)
 
             # 창 닫기
             all_recommendations_window.destroy()
@@ -471,4 +377,5 @@ def main_gui():
 
 # 메인 실행
 if __name__ == "__main__":
+    metrics.start_dumper_from_env()
     main_gui()  # GUI 실행
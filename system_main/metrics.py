@@ -0,0 +1,331 @@
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+# 운영 지표 (카운터/게이지/히스토그램) 레지스트리. Prometheus 텍스트 형식으로 내보냅니다.
+# TRAVEL_METRICS_FILE을 지정하면 start_dumper_from_env()가 그 파일에 주기적으로 지표를 저장합니다.
+METRICS_FILE_ENV = 'TRAVEL_METRICS_FILE'
+DUMP_INTERVAL_SECONDS = 15
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# 지연 시간 히스토그램 기본 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+############################ 지표 ############################
+
+class Metric:
+    """
+    레이블 값 조합마다 값을 가지는 지표의 공통 부분. 여러 스레드에서 함께 갱신할 수 있습니다.
+    """
+    type_name = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 지표의 레이블은 {list(self.labelnames)}이어야 합니다: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key):
+        return list(zip(self.labelnames, key))
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+class Counter(Metric):
+    """
+    증가만 하는 누적 값 (예: 호출 수, 실패 수)
+    """
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("카운터는 감소할 수 없습니다.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+class Gauge(Metric):
+    """
+    오르내리는 현재 값 (예: 처리 중인 요청 수)
+    """
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+class Histogram(Metric):
+    """
+    값의 분포 (예: 지연 시간). 구간별 누적 개수와 합계/개수를 기록합니다.
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        with 블록 실행 시간(초)을 기록합니다.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """
+        {'count', 'sum', 'buckets': [(상한, 누적 개수), ...]}
+        """
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return {'count': 0, 'sum': 0.0, 'buckets': [(upper, 0) for upper in self.buckets]}
+            cumulative = list(zip(self.buckets, _cumsum(state['counts'])))
+            return {'count': state['count'], 'sum': state['sum'], 'buckets': cumulative}
+
+    def quantile(self, q, **labels):
+        """
+        구간 안에서 선형 보간한 분위수 추정값 (관측값이 없으면 None)
+        """
+        snapshot = self.snapshot(**labels)
+        if snapshot['count'] == 0:
+            return None
+        rank = q * snapshot['count']
+        lower, previous = 0.0, 0
+        for upper, cumulative in snapshot['buckets']:
+            if cumulative >= rank:
+                if upper == math.inf:
+                    return lower
+                in_bucket = cumulative - previous
+                return lower + (upper - lower) * ((rank - previous) / in_bucket if in_bucket else 0)
+            lower, previous = upper, cumulative
+        return lower
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, dict(state, counts=list(state['counts']))) for key, state in self._values.items())
+        result = []
+        for key, state in items:
+            labels = self._labels(key)
+            for upper, cumulative in zip(self.buckets, _cumsum(state['counts'])):
+                result.append((f"{self.name}_bucket", labels + [('le', _format_value(upper))], cumulative))
+            result.append((f"{self.name}_sum", labels, state['sum']))
+            result.append((f"{self.name}_count", labels, state['count']))
+        return result
+
+def _cumsum(counts):
+    total, result = 0, []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+############################ 레지스트리 ############################
+
+class MetricsRegistry:
+    """
+    이름으로 지표를 등록/조회하고 Prometheus 텍스트 형식으로 내보냅니다.
+    collector는 내보낼 때마다 호출되어 다른 곳에 있는 카운터(예: 캐시/클라이언트 counters)를 지표로 변환합니다.
+    collector 반환값: [(이름, 종류, 설명, [(레이블 dict, 값), ...]), ...]
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name, help_text, labelnames, **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help_text, labelnames, **options)
+            elif type(metric) is not metric_class or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"이미 다른 형태로 등록된 지표입니다: {name}")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def register_collector(self, collector):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def clear(self):
+        """
+        모든 지표 값을 0으로 되돌립니다. (등록은 유지)
+        """
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def render(self):
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type_name}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        for collector in list(self._collectors):
+            try:
+                families = collector()
+            except Exception as e:
+                lines.append(f"# collector 오류: {_escape(e)}")
+                continue
+            for name, type_name, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """
+        지표를 파일에 저장합니다. (임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 중간 상태를 보지 않음)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+# 기본 레지스트리 (각 모듈이 공유)
+REGISTRY = MetricsRegistry()
+
+def counter(name, help_text, labelnames=()):
+    return REGISTRY.counter(name, help_text, labelnames)
+
+def gauge(name, help_text, labelnames=()):
+    return REGISTRY.gauge(name, help_text, labelnames)
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, help_text, labelnames, buckets)
+
+def register_collector(collector):
+    REGISTRY.register_collector(collector)
+
+def render():
+    return REGISTRY.render()
+
+# 여러 모듈에서 쓰는 캐시 적중 지표
+CACHE_REQUESTS = counter(
+    'travel_cache_requests_total', "캐시 조회 수 (result: hit, disk, miss)", ['cache', 'result']
+)
+
+############################ 주기적 파일 저장 ############################
+
+_dumper = {'path': None, 'stop': None}
+
+def start_file_dumper(path, interval=DUMP_INTERVAL_SECONDS, registry=REGISTRY):
+    """
+    백그라운드 스레드에서 interval초마다 지표를 path에 저장합니다. 반환된 Event를 set()하면 멈춥니다.
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                registry.dump(path)
+            except OSError as e:
+                print(f"지표 파일 저장 중 오류 발생: {e}")
+        registry.dump(path)
+
+    thread = threading.Thread(target=run, name='metrics-dumper', daemon=True)
+    thread.start()
+    return stop
+
+def start_dumper_from_env(interval=DUMP_INTERVAL_SECONDS):
+    """
+    TRAVEL_METRICS_FILE이 지정되어 있으면 파일 저장을 시작합니다. (이미 실행 중이면 그대로 둠)
+    """
+    path = os.environ.get(METRICS_FILE_ENV)
+    if not path or _dumper['stop'] is not None:
+        return _dumper['stop']
+    _dumper.update(path=path, stop=start_file_dumper(path, interval))
+    return _dumper['stop']
@@ -0,0 +1,336 @@
+import os
+import json
+import time
+import threading
+import functools
+import itertools
+import tracemalloc
+from collections import deque
+from contextvars import ContextVar
+
+# 단계별 프로파일링 설정
+# TRAVEL_PROFILE=1 이면 단계별 시간/CPU/행 수를, TRAVEL_PROFILE=memory 이면 메모리 할당량까지 기록합니다.
+# TRAVEL_PROFILE_DIR을 지정하면 끝난 trace를 그 폴더에 JSON(.json)과 flame graph용 folded(.folded) 파일로 저장합니다.
+PROFILE_ENV = 'TRAVEL_PROFILE'
+PROFILE_DIR_ENV = 'TRAVEL_PROFILE_DIR'
+MAX_TRACES = 100   # 메모리에 보관하는 최근 trace 수
+
+_settings = {'enabled': False, 'memory': False, 'output_dir': None}
+_recent_traces = deque(maxlen=MAX_TRACES)
+_current_span = ContextVar('profiling_span', default=None)
+_trace_numbers = itertools.count(1)   # 저장 파일 이름 중복 방지용 일련번호
+
+def configure(enabled=None, memory=None, output_dir=None):
+    """
+    실행 중에 프로파일링을 켜고 끕니다. (None인 항목은 그대로 유지)
+    """
+    if enabled is not None:
+        _settings['enabled'] = bool(enabled)
+    if memory is not None:
+        _settings['memory'] = bool(memory)
+    if output_dir is not None:
+        _settings['output_dir'] = output_dir or None
+    if _settings['enabled'] and _settings['memory'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def configure_from_env():
+    value = os.environ.get(PROFILE_ENV, '').strip().lower()
+    configure(
+        enabled=value not in ('', '0', 'false', 'off'),
+        memory=value == 'memory',
+        output_dir=os.environ.get(PROFILE_DIR_ENV, ''),
+    )
+
+def is_enabled():
+    return _settings['enabled']
+
+############################ 단계 (span) ############################
+
+def _row_count(value):
+    """
+    DataFrame/배열/리스트의 행 수. 튜플이면 안의 표 행 수 합계, 알 수 없으면 None
+    """
+    if hasattr(value, 'shape') and len(getattr(value, 'shape', ())) > 0:
+        return int(value.shape[0])
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, tuple):
+        counts = [_row_count(v) for v in value if hasattr(v, 'shape')]
+        return sum(counts) if counts else None
+    return None
+
+class Span:
+    """
+    이름 붙은 한 단계의 측정 결과. with 문으로 사용하며, 안에서 rows_out을 직접 지정할 수 있습니다.
+    바깥 단계가 없으면 새 Trace를 시작하고 끝날 때 최근 trace 목록에 추가합니다.
+    메모리는 tracemalloc 기준이며 여러 스레드가 동시에 실행되면 서로의 할당이 섞일 수 있습니다.
+    """
+
+    def __init__(self, name, rows_in=None, new_trace=False):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.new_trace = new_trace
+        self.parent = None
+        self.trace = None
+        self.id = None
+        self.thread = None
+        self.start = None
+        self.wall = None
+        self.cpu = None
+        self.mem_delta = None
+        self.mem_peak = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is None or self.new_trace:
+            self.trace = Trace(self.name)
+        else:
+            self.parent = parent
+            self.trace = parent.trace
+        self.id = self.trace.add(self)
+        self.thread = threading.current_thread().name
+        self._token = _current_span.set(self)
+
+        if _settings['memory'] and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None and self.parent._mem_start is not None:
+                self.parent._peak_seen = max(self.parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            self._mem_start = self._peak_seen = current
+        else:
+            self._mem_start = None
+
+        self._cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = time.thread_time() - self._cpu_start
+
+        if self._mem_start is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self._peak_seen = max(self._peak_seen, peak)
+            self.mem_delta = current - self._mem_start
+            self.mem_peak = self._peak_seen - self._mem_start
+            if self.parent is not None and self.parent._mem_start is not None:
+                self.parent._peak_seen = max(self.parent._peak_seen, self._peak_seen)
+
+        _current_span.reset(self._token)
+        if self.trace.root is self:
+            self.trace.finish()
+        return False
+
+    def to_dict(self):
+        record = {
+            'id': self.id,
+            'parent': self.parent.id if self.parent is not None else None,
+            'name': self.name,
+            'thread': self.thread,
+            'start_s': self.start - self.trace.start,
+            'wall_s': self.wall,
+            'cpu_s': self.cpu,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+        }
+        if self.mem_delta is not None:
+            record['mem_delta_mb'] = self.mem_delta / 1024 / 1024
+            record['mem_peak_mb'] = self.mem_peak / 1024 / 1024
+        return record
+
+class _NullSpan:
+    """
+    프로파일링이 꺼져 있을 때 쓰는 아무 일도 하지 않는 단계 (속성 지정도 무시)
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def stage(name, rows_in=None):
+    """
+    with stage('activity.preprocessed', rows_in=len(df)) as s: ...; s.rows_out = len(result)
+    """
+    if not _settings['enabled']:
+        return _NULL_SPAN
+    return Span(name, rows_in)
+
+def trace(name):
+    """
+    바깥 단계와 관계없이 새 trace를 시작하는 단계 (요청 하나를 묶을 때 사용)
+    """
+    if not _settings['enabled']:
+        return _NULL_SPAN
+    return Span(name, new_trace=True)
+
+def profiled(name=None):
+    """
+    함수 실행을 하나의 단계로 기록하는 데코레이터.
+    rows_in은 첫 번째 표/배열 인자의 행 수, rows_out은 반환값의 행 수입니다.
+    프로파일링이 꺼져 있으면 설정 확인 한 번만 하고 원래 함수를 호출합니다.
+    """
+    def decorator(func):
+        stage_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _settings['enabled']:
+                return func(*args, **kwargs)
+            rows_in = next((_row_count(a) for a in args if hasattr(a, 'shape')), None)
+            with Span(stage_name, rows_in) as span:
+                result = func(*args, **kwargs)
+                span.rows_out = _row_count(result)
+                return result
+        return wrapper
+    return decorator
+
+def bind(func):
+    """
+    다른 스레드(스레드 풀)에서 실행할 함수가 현재 단계의 하위 단계로 기록되도록 묶습니다.
+    """
+    parent = _current_span.get() if _settings['enabled'] else None
+    if parent is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_span.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+    return wrapper
+
+############################ trace ############################
+
+class Trace:
+    """
+    한 요청(최상위 단계)에 속한 단계 목록과 내보내기 함수
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.root = None
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            if self.root is None:
+                self.root = span
+            self.spans.append(span)
+            return len(self.spans) - 1
+
+    @property
+    def wall(self):
+        return self.root.wall if self.root is not None else None
+
+    def finish(self):
+        _recent_traces.append(self)
+        if _settings['output_dir']:
+            try:
+                self.save(_settings['output_dir'])
+            except OSError as e:
+                print(f"프로파일 저장 중 오류 발생: {e}")
+
+    def finished_spans(self):
+        return [span for span in self.spans if span.wall is not None]
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'wall_s': self.wall,
+            'spans': [span.to_dict() for span in self.finished_spans()],
+        }
+
+    def to_json(self, path=None):
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    def summary(self):
+        """
+        단계 이름별 {'count', 'wall_s', 'cpu_s'} 합계
+        """
+        totals = {}
+        for span in self.finished_spans():
+            total = totals.setdefault(span.name, {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            total['count'] += 1
+            total['wall_s'] += span.wall
+            total['cpu_s'] += span.cpu
+        return totals
+
+    def to_collapsed(self):
+        """
+        flame graph 도구(flamegraph.pl, speedscope 등)의 folded 형식: "상위;하위;단계 자체시간(마이크로초)"
+        같은 스레드에서 실행된 하위 단계 시간만 빼므로 스레드 풀 단계는 부모 시간과 겹쳐 보일 수 있습니다.
+        """
+        spans = self.finished_spans()
+        child_wall = {}
+        for span in spans:
+            if span.parent is not None and span.parent.thread == span.thread:
+                child_wall[span.parent.id] = child_wall.get(span.parent.id, 0.0) + span.wall
+
+        stacks = {}
+        for span in spans:
+            names = []
+            node = span
+            while node is not None:
+                names.append(node.name)
+                node = node.parent
+            path = ';'.join(reversed(names))
+            self_us = max(0, int(round((span.wall - child_wall.get(span.id, 0.0)) * 1e6)))
+            stacks[path] = stacks.get(path, 0) + self_us
+        return '\n'.join(f"{path} {value}" for path, value in stacks.items()) + '\n'
+
+    def to_chrome_trace(self):
+        """
+        Chrome trace event 형식 (chrome://tracing, Perfetto, speedscope에서 열 수 있음)
+        """
+        events = []
+        for span in self.finished_spans():
+            record = span.to_dict()
+            args = {k: record[k] for k in ['cpu_s', 'rows_in', 'rows_out', 'mem_delta_mb', 'mem_peak_mb'] if record.get(k) is not None}
+            events.append({
+                'name': span.name, 'ph': 'X', 'pid': os.getpid(), 'tid': span.thread,
+                'ts': record['start_s'] * 1e6, 'dur': span.wall * 1e6, 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, directory):
+        """
+        directory에 <시각>-<일련번호>_<이름>.json, .folded 파일을 저장하고 경로 앞부분을 반환합니다.
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))
+        safe_name = ''.join(c if c.isalnum() or c in '._-' else '_' for c in self.name)
+        prefix = os.path.join(directory, f"{stamp}-{next(_trace_numbers):05d}_{safe_name}")
+        self.to_json(prefix + '.json')
+        with open(prefix + '.folded', 'w', encoding='utf-8') as f:
+            f.write(self.to_collapsed())
+        return prefix
+
+def recent_traces():
+    return list(_recent_traces)
+
+def last_trace():
+    return _recent_traces[-1] if _recent_traces else None
+
+def clear_traces():
+    _recent_traces.clear()
+
+configure_from_env()
@@ -0,0 +1,299 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from cluster_input import get_cluster_predictor
+from activity import activity_first_rmd, des_act_rmd, activity_second_rmd, load_preprocessed_data
+from consumption import food_top_place, food_region, get_restaurant_index
+from Lodging import get_lodging_score_result, get_lodging_index
+from geo import haversine_one_to_many
+from geocoding import get_regions_from_coords
+from profiling import profiled, bind
+import metrics
+
+# 추천 기본 설정 (기존 GUI에서 쓰던 값)
+ANY_REGION = "상관없음"           # 선호 지역을 고르지 않은 경우
+CANDIDATE_REGION_COUNT = 5       # 선호 지역이 없을 때 보여줄 후보 지역 수
+SECOND_ACTIVITY_RADIUS_KM = 5    # 점심 장소 기준 두 번째 액티비티 검색 반경
+LODGING_BOUNDARY_KM = 5          # 첫 번째 액티비티 기준 숙박 검색 반경
+NO_DATA_TEXT = "추천 데이터 없음"
+LOOKUP_WORKERS = 8               # 행별 조회(지역 조회, 두 번째 액티비티)를 동시에 실행할 스레드 수
+
+# 운영 지표
+ITINERARY_SECONDS = metrics.histogram('travel_itinerary_seconds', "여행 일정 한 건을 만드는 데 걸린 시간(초)")
+ITINERARIES_IN_PROGRESS = metrics.gauge('travel_itineraries_in_progress', "만들고 있는 여행 일정 수")
+
+############################ 입력 변환 ############################
+
+def age_to_age_grp(age):
+    """
+    나이를 10, 20, 30 등 숫자 범주의 연령대로 변환
+    """
+    if age < 20:
+        return 10
+    elif age < 30:
+        return 20
+    elif age < 40:
+        return 30
+    elif age < 50:
+        return 40
+    elif age < 60:
+        return 50
+    else:
+        return 60
+
+def place_text(place):
+    """
+    음식점/숙박 정보(dict)를 "이름 (도로명 주소)" 형태로 변환
+    """
+    if not place:
+        return NO_DATA_TEXT
+    return f"{place['VISIT_AREA_NM']} ({place['ROAD_NM_ADDR']})"
+
+############################ 입력 / 결과 ############################
+
+class TravelProfile:
+    """
+    추천에 필요한 사용자 입력. 좌표는 geocoding.get_coordinates 결과(경도 x, 위도 y)를 사용합니다.
+    nights는 숙박 일수(당일=0, 1박 2일=1, ...)입니다.
+    """
+
+    def __init__(self, user_lon, user_lat, age, cp_status, cp_num, nights, traffic, purpose,
+                 preferred_region=ANY_REGION, location=None, region=None):
+        self.user_lon = float(user_lon)
+        self.user_lat = float(user_lat)
+        self.age = int(age)
+        self.cp_status = cp_status
+        self.cp_num = int(cp_num)
+        self.nights = int(nights)
+        self.traffic = traffic
+        self.purpose = purpose
+        self.preferred_region = preferred_region
+        self.location = location    # 사용자가 입력한 현재 위치 문자열
+        self.region = region        # 현재 위치의 시군구
+
+    @property
+    def age_grp(self):
+        return age_to_age_grp(self.age)
+
+    @property
+    def top_n(self):
+        # 하루에 한 곳씩 추천 (당일 여행이면 1곳)
+        return self.nights + 1
+
+    def replace(self, **changes):
+        """
+        일부 값만 바꾼 새 프로필을 반환합니다.
+        """
+        profile = copy.copy(self)
+        for name, value in changes.items():
+            if not hasattr(profile, name):
+                raise AttributeError(f"알 수 없는 프로필 항목: {name}")
+            setattr(profile, name, value)
+        return profile
+
+    def to_dict(self):
+        return dict(vars(self))
+
+class Itinerary:
+    """
+    추천 결과.
+    - first_activities: 첫 번째 추천 액티비티 (직선 거리 포함)
+    - lunches: first_activities 각 행의 점심 음식점 (dict 또는 None)
+    - second_activities: 점심 장소 근처의 두 번째 추천 액티비티 ('점심' 열에 해당 점심 장소)
+    - dinners: second_activities 각 행의 저녁 음식점 (dict 또는 None)
+    - lodging: 숙박 추천 (dict, 추천 결과가 없으면 None). 당일 여행이면 lodging_requested=False
+    """
+
+    def __init__(self, profile, cluster, first_activities, lunches, second_activities, dinners, lodging, lodging_requested):
+        self.profile = profile
+        self.cluster = cluster
+        self.first_activities = first_activities
+        self.lunches = lunches
+        self.second_activities = second_activities
+        self.dinners = dinners
+        self.lodging = lodging
+        self.lodging_requested = lodging_requested
+
+    @property
+    def lodging_text(self):
+        if not self.lodging_requested:
+            return None
+        return place_text(self.lodging)
+
+    def to_dict(self):
+        """
+        JSON으로 바꿀 수 있는 형태 (서버/배치 작업용)
+        """
+        def records(df):
+            return df.astype(object).where(df.notna(), None).to_dict('records')
+
+        return {
+            'cluster': int(self.cluster),
+            'profile': self.profile.to_dict(),
+            'first_activities': records(self.first_activities),
+            'lunches': self.lunches,
+            'second_activities': records(self.second_activities),
+            'dinners': self.dinners,
+            'lodging': self.lodging,
+        }
+
+############################ 추천 엔진 ############################
+
+class RecommendationEngine:
+    """
+    클러스터 모델, 액티비티/음식점/숙박 데이터를 한 번만 로드하고
+    사용자 프로필에 대한 여행 일정(Itinerary)을 만듭니다. GUI와 무관하게 서버/배치에서도 사용할 수 있습니다.
+    """
+
+    def __init__(self, preload=True, lookup_workers=LOOKUP_WORKERS):
+        self.cluster_predictor = get_cluster_predictor()
+        # 행별로 독립적인 조회를 동시에 실행하는 스레드 풀 (결과는 항상 행 순서대로 모음)
+        self._lookup_pool = ThreadPoolExecutor(max_workers=lookup_workers, thread_name_prefix='lookup')
+        if preload:
+            self.preload()
+
+    def preload(self):
+        """
+        추천에 쓰는 데이터와 인덱스를 미리 만들어 첫 요청이 느려지지 않게 합니다.
+        """
+        load_preprocessed_data()
+        get_restaurant_index()
+        get_lodging_index()
+
+    @profiled()
+    def predict_cluster(self, profile):
+        return self.cluster_predictor.predict(
+            profile.age_grp, profile.cp_num, profile.cp_status, profile.nights, profile.purpose, profile.traffic
+        )
+
+    @profiled()
+    def candidate_regions(self, profile, cluster_label=None, top_n=CANDIDATE_REGION_COUNT):
+        """
+        선호 지역이 없을 때 고를 수 있는 후보 지역 (첫 번째 추천 액티비티 + 시/도)
+        """
+        if cluster_label is None:
+            cluster_label = self.predict_cluster(profile)
+
+        candidates = activity_first_rmd(cluster_label, profile.user_lat, profile.user_lon, top_n)
+        candidates['distance_to_user'] = haversine_one_to_many(
+            profile.user_lat, profile.user_lon, candidates['Y_COORD'], candidates['X_COORD']
+        )
+        regions = get_regions_from_coords(zip(candidates['X_COORD'], candidates['Y_COORD']))
+        candidates['시/도'] = [sido_nm for sido_nm, _ in regions]
+        return candidates
+
+    @profiled()
+    def first_activities(self, profile, cluster_label):
+        if profile.preferred_region == ANY_REGION:
+            activities = activity_first_rmd(cluster_label, profile.user_lat, profile.user_lon, profile.top_n)
+        else:
+            activities = des_act_rmd(cluster_label, target_sido=profile.preferred_region, top_n=profile.top_n)
+
+        # 추천 지역과 사용자의 거리
+        activities['직선 거리 (km)'] = haversine_one_to_many(
+            profile.user_lat, profile.user_lon, activities['Y_COORD'], activities['X_COORD']
+        ).round(2)
+        return activities
+
+    def _map(self, func, *iterables):
+        """
+        조회 스레드 풀에서 func를 동시에 실행하고 입력 순서대로 결과를 반환합니다.
+        """
+        return list(self._lookup_pool.map(bind(func), *iterables))
+
+    @profiled()
+    def food_regions(self, coords):
+        """
+        좌표들의 음식점 검색 지역을 동시에 조회합니다.
+        """
+        return self._map(food_region, [x for x, _ in coords], [y for _, y in coords])
+
+    @profiled()
+    def food_places(self, coords, cluster_label, regions=None, visited=None):
+        """
+        좌표마다 음식점을 1곳씩 추천합니다.
+        느린 지역 조회는 동시에 미리 하고, 방문 목록(visited)을 바꾸는 선택 단계만 행 순서대로 실행하므로
+        결과는 순서대로 food_top_place를 호출한 것과 같습니다.
+        """
+        coords = list(coords)
+        if regions is None:
+            regions = self.food_regions(coords)
+        return [
+            food_top_place(x, y, cluster_label, region=region, visited=visited)
+            for (x, y), region in zip(coords, regions)
+        ]
+
+    @profiled()
+    def second_activities(self, cluster_label, first_activities, lunches):
+        """
+        점심 장소마다 반경 내에서 첫 번째 추천과 겹치지 않는 액티비티를 1곳씩 추천합니다.
+        각 점심 장소의 검색은 서로 독립적이므로 동시에 실행합니다.
+        """
+        exclude_coords = list(zip(first_activities['X_COORD'], first_activities['Y_COORD']))
+        valid_lunches = [
+            lunch for lunch in lunches
+            if lunch and isinstance(lunch, dict) and lunch.get('X_COORD') and lunch.get('Y_COORD')
+        ]
+
+        def search(lunch):
+            return activity_second_rmd(
+                cluster_label, lunch['Y_COORD'], lunch['X_COORD'],
+                radius=SECOND_ACTIVITY_RADIUS_KM, top_n=1, exclude_coords=exclude_coords
+            )
+
+        second_recommendations = []
+        for lunch, second_rec in zip(valid_lunches, self._map(search, valid_lunches)):
+            if not second_rec.empty:
+                second_rec['점심'] = place_text(lunch)
+                second_recommendations.append(second_rec)
+
+        if not second_recommendations:
+            return pd.DataFrame(columns=['VISIT_AREA_NM', 'ROAD_NM_ADDR', 'X_COORD', 'Y_COORD', 'TOTAL_WEIGHT_avg', 'DISTANCE', '점심'])
+        return pd.concat(second_recommendations, ignore_index=True)
+
+    @profiled()
+    def lodging(self, profile, first_activities):
+        if first_activities.empty:
+            return None
+        first_activity = first_activities.iloc[0]
+        lodging_info = get_lodging_score_result(
+            first_activity['X_COORD'], first_activity['Y_COORD'],
+            boundary=LODGING_BOUNDARY_KM, mvmn=profile.traffic, family=profile.cp_status
+        )
+        if lodging_info.empty:
+            return None
+        return lodging_info.iloc[0].to_dict()
+
+    @profiled()
+    def recommend(self, profile, cluster_label=None, visited=None):
+        """
+        프로필에 대한 여행 일정을 만듭니다.
+        음식점 추천은 방문한 곳을 제외하므로 점심 -> 두 번째 액티비티 -> 저녁 순서를 유지하고,
+        각 단계 안의 행별 조회만 동시에 실행합니다.
+        visited는 이미 추천한 음식점 이름 세트입니다. 없으면 일정마다 새로 만들어 다른 요청과 공유하지 않습니다.
+        """
+        if visited is None:
+            visited = set()
+        with ITINERARIES_IN_PROGRESS.track_in_progress(), ITINERARY_SECONDS.time():
+            return self._recommend(profile, cluster_label, visited)
+
+    def _recommend(self, profile, cluster_label, visited):
+        if cluster_label is None:
+            cluster_label = self.predict_cluster(profile)
+
+        first_activities = self.first_activities(profile, cluster_label)
+
+        # 숙박 정보는 음식점 추천과 독립적이므로 따로 실행 (당일 여행이 아닌 경우에만)
+        lodging_requested = profile.top_n > 1
+        lodging_future = self._lookup_pool.submit(bind(self.lodging), profile, first_activities) if lodging_requested else None
+
+        lunch_coords = list(zip(first_activities['X_COORD'], first_activities['Y_COORD']))
+        lunches = self.food_places(lunch_coords, cluster_label, visited=visited)
+        second_activities = self.second_activities(cluster_label, first_activities, lunches)
+        dinners = self.food_places(
+            zip(second_activities['X_COORD'], second_activities['Y_COORD']), cluster_label, visited=visited
+        )
+
+        lodging = lodging_future.result() if lodging_future is not None else None
+
+        return Itinerary(profile, cluster_label, first_activities, lunches, second_activities, dinners, lodging, lodging_requested)
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from snapshot import load_or_build
+from spatial_index import SpatialIndex
+from tables import iter_visit_area_chunks
+
+# 시/도, 시군구 라벨이 붙은 좌표 데이터
+VISIT_AREA_FILE = 'data/tn_visit_area_info_방문지정보2nd.csv'
+
+K_NEIGHBORS = 15          # 투표에 사용할 최근접 지점 수
+MAX_DISTANCE_KM = 5.0     # 가장 가까운 라벨 지점이 이보다 멀면 신뢰도를 0으로 처리
+DISTANCE_EPS_KM = 0.05    # 거리 가중치 계산 시 0으로 나누는 것 방지
+SOURCE_CHECK_SECONDS = 60 # 라벨 데이터 파일이 바뀌었는지 확인하는 간격 (조회마다 확인하지 않음)
+
+############################ 라벨 데이터 ############################
+
+def build_region_points():
+    """
+    방문지 데이터에서 (좌표, 시/도, 시군구)만 추려 중복을 제거합니다.
+    """
+    # 청크마다 먼저 중복을 줄여 방문지 파일 전체를 메모리에 올리지 않음
+    parts = [
+        chunk.dropna(subset=['X_COORD', 'Y_COORD', 'SIDO_NM', 'SGG_NM']).drop_duplicates()
+        for chunk in iter_visit_area_chunks('region_points', VISIT_AREA_FILE)
+    ]
+    return pd.concat(parts).drop_duplicates().reset_index(drop=True)
+
+############################ 역지오코더 ############################
+
+class LocalReverseGeocoder:
+    """
+    라벨이 붙은 방문지 좌표에 대한 최근접 이웃 투표로 좌표의 (시/도, 시군구)를 추정합니다.
+    신뢰도는 거리 가중치 기준 1위 라벨의 득표 비율(0~1)입니다.
+    """
+
+    def __init__(self, region_points, k=K_NEIGHBORS, max_distance_km=MAX_DISTANCE_KM):
+        self.k = k
+        self.max_distance_km = max_distance_km
+
+        # 라벨은 정수 코드로 저장해 투표를 배열 연산으로 처리
+        labels = region_points['SIDO_NM'].astype(str) + '\t' + region_points['SGG_NM'].astype(str)
+        codes, uniques = pd.factorize(labels)
+        self.label_codes = codes
+        self.labels = [tuple(label.split('\t', 1)) for label in uniques]
+        self.index = SpatialIndex(region_points['Y_COORD'].values, region_points['X_COORD'].values)
+
+    def lookup(self, x, y):
+        """
+        좌표(x=경도, y=위도)의 행정구역을 추정합니다.
+        반환값: (sido_nm, sgg_nm, confidence)
+        """
+        positions, distances = self.index.query_knn(float(y), float(x), self.k)
+        if len(positions) == 0 or distances[0] > self.max_distance_km:
+            return "알 수 없음", "알 수 없음", 0.0
+
+        weights = 1.0 / (distances + DISTANCE_EPS_KM)
+        votes = np.bincount(self.label_codes[positions], weights=weights)
+        best = int(np.argmax(votes))
+        confidence = float(votes[best] / weights.sum())
+
+        sido_nm, sgg_nm = self.labels[best]
+        return sido_nm, sgg_nm, confidence
+
+# 모듈 전역 역지오코더 (라벨 데이터가 바뀌면 다시 생성)
+# checked_at: 마지막으로 라벨 데이터 파일을 확인한 시각 (time.monotonic)
+_local_geocoder = {'source': None, 'geocoder': None, 'checked_at': None}
+_local_geocoder_lock = threading.Lock()  # 여러 스레드가 동시에 처음 호출해도 한 번만 생성
+
+def _recently_checked():
+    checked_at = _local_geocoder['checked_at']
+    return checked_at is not None and time.monotonic() - checked_at < SOURCE_CHECK_SECONDS
+
+def get_local_reverse_geocoder():
+    """
+    로컬 역지오코더를 반환합니다. 라벨 데이터 파일이 없으면 None을 반환합니다.
+    파일 변경 확인(스냅샷 지문)은 SOURCE_CHECK_SECONDS마다 한 번만 하고, 그 사이에는 잠금 없이 바로 반환합니다.
+    """
+    if _recently_checked():
+        return _local_geocoder['geocoder']
+
+    with _local_geocoder_lock:
+        # 잠금을 기다리는 동안 다른 스레드가 이미 확인했으면 그 결과 사용
+        if _recently_checked():
+            return _local_geocoder['geocoder']
+
+        geocoder = None
+        if os.path.exists(VISIT_AREA_FILE):
+            try:
+                region_points = load_or_build('region_points', [VISIT_AREA_FILE], build_region_points)
+                if _local_geocoder['source'] is not region_points:
+                    _local_geocoder['geocoder'] = LocalReverseGeocoder(region_points)
+                    _local_geocoder['source'] = region_points
+                geocoder = _local_geocoder['geocoder']
+            except (FileNotFoundError, ValueError) as e:
+                print(f"로컬 역지오코딩 데이터를 불러올 수 없습니다: {e}")
+        if geocoder is None:
+            _local_geocoder.update(source=None, geocoder=None)
+        # 역지오코더를 먼저 바꾼 뒤 확인 시각을 기록 (잠금 없이 읽는 쪽이 이전 상태를 보지 않도록)
+        _local_geocoder['checked_at'] = time.monotonic()
+        return geocoder
@@ -0,0 +1,356 @@
+import json
+import math
+import asyncio
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import geocoding
+import profiling
+import metrics
+from recommendation_engine import RecommendationEngine, TravelProfile, ANY_REGION, LODGING_BOUNDARY_KM
+from Lodging import get_lodging_score_result
+
+# 서버 기본 설정
+HOST = '127.0.0.1'
+PORT = 8000
+MAX_CONCURRENT_REQUESTS = 8      # 동시에 처리할 추천 요청 수 (초과분은 대기)
+REQUEST_TIMEOUT_SECONDS = 30     # 대기 + 처리 시간 제한 (초과 시 504)
+WORKER_THREADS = 4               # 점수 계산을 실행할 스레드 수
+KEEP_ALIVE_TIMEOUT_SECONDS = 15  # 유휴 연결 유지 시간
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+MAX_NIGHTS = 7                   # 숙박 일수 상한 (GUI 선택지와 같은 7박 8일)
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error', 504: 'Gateway Timeout',
+}
+
+# 운영 지표 (path: 등록된 경로, 그 외는 other)
+HTTP_REQUESTS = metrics.counter('travel_http_requests_total', "HTTP 요청 수", ['method', 'path', 'status'])
+HTTP_LATENCY = metrics.histogram('travel_http_request_seconds', "HTTP 요청 처리 시간(초, 대기 포함)", ['path'])
+HTTP_IN_FLIGHT = metrics.gauge('travel_http_requests_in_flight', "스레드 풀에서 계산 중인 요청 수")
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class TextResponse:
+    """
+    JSON이 아닌 본문으로 응답할 때 핸들러가 반환하는 값 (예: /metrics)
+    """
+
+    def __init__(self, text, content_type='text/plain; charset=utf-8'):
+        self.text = text
+        self.content_type = content_type
+
+############################ JSON 변환 ############################
+
+def to_json_safe(value):
+    """
+    numpy/pandas 값과 NaN을 JSON으로 바꿀 수 있는 값으로 변환합니다.
+    """
+    if isinstance(value, dict):
+        return {str(k): to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(v) for v in value]
+    if isinstance(value, pd.DataFrame):
+        return to_json_safe(value.to_dict('records'))
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+############################ 요청 파싱 ############################
+
+def _require(payload, name):
+    if name not in payload or payload[name] in (None, ''):
+        raise HTTPError(400, f"필수 항목이 없습니다: {name}")
+    return payload[name]
+
+def parse_profile(payload, require_location=True):
+    """
+    요청 JSON을 TravelProfile로 변환합니다.
+    위치는 x(경도)/y(위도) 또는 location(주소, 캐시에 있는 경우만 오프라인 조회 가능)으로 받습니다.
+    """
+    region = None
+    x, y = payload.get('x'), payload.get('y')
+    if (x is None or y is None) and payload.get('location'):
+        x, y, region = geocoding.get_coordinates(payload['location'])
+        if x is None or y is None:
+            raise HTTPError(422, f"위치 정보를 가져올 수 없습니다: {payload['location']}")
+    if x is None or y is None:
+        if require_location:
+            raise HTTPError(400, "x, y 좌표 또는 location이 필요합니다.")
+        x, y = 0.0, 0.0
+
+    try:
+        profile = TravelProfile(
+            user_lon=x, user_lat=y,
+            age=_require(payload, 'age'),
+            cp_status=_require(payload, 'cp_status'),
+            cp_num=_require(payload, 'cp_num'),
+            nights=payload.get('nights', 0),
+            traffic=_require(payload, 'traffic'),
+            purpose=_require(payload, 'purpose'),
+            preferred_region=payload.get('preferred_region') or ANY_REGION,
+            location=payload.get('location'),
+            region=region,
+        )
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, f"입력값 형식이 올바르지 않습니다: {e}")
+    if not 0 <= profile.nights <= MAX_NIGHTS:
+        raise HTTPError(400, f"nights는 0 이상 {MAX_NIGHTS} 이하여야 합니다: {profile.nights}")
+    return profile
+
+############################ 서버 ############################
+
+class RecommendationServer:
+    """
+    asyncio 기반 로컬 HTTP 추천 서비스.
+    - 데이터와 모델은 RecommendationEngine에 한 번만 로드되어 메모리에 유지
+    - 점수 계산(CPU 작업)은 스레드 풀에서 실행하고, 동시 처리 수는 세마포어로 제한
+    - 요청마다 (대기 + 처리) 시간 제한, 초과 시 504 (이미 시작된 계산은 스레드에서 끝까지 실행됨)
+
+    엔드포인트
+    - GET  /health    : 상태 확인
+    - GET  /stats     : 요청 처리 통계
+    - GET  /metrics   : 운영 지표 (Prometheus 텍스트 형식)
+    - POST /cluster   : 프로필 -> 클러스터 번호
+    - POST /itinerary : 프로필 -> 여행 일정 (Itinerary.to_dict)
+    - POST /lodging   : 좌표, 이동 수단, 동행 형태 -> 숙박 추천
+    """
+
+    def __init__(self, engine=None, host=HOST, port=PORT, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                 timeout=REQUEST_TIMEOUT_SECONDS, workers=WORKER_THREADS):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recommend')
+        self.routes = {
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/stats'): self.handle_stats,
+            ('GET', '/metrics'): self.handle_metrics,
+            ('POST', '/cluster'): self.handle_cluster,
+            ('POST', '/itinerary'): self.handle_itinerary,
+            ('POST', '/lodging'): self.handle_lodging,
+        }
+        self.counters = {'requests': 0, 'in_flight': 0, 'errors': 0, 'timeouts': 0}
+        self._semaphore = None
+        self._server = None
+
+    async def start(self):
+        """
+        엔진을 미리 로드(warm-up)한 뒤 연결을 받기 시작합니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self.engine is None:
+            self.engine = await loop.run_in_executor(self.executor, RecommendationEngine)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    ############################ HTTP 처리 ############################
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT_SECONDS)
+                except HTTPError as e:
+                    await self._write_response(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "잘못된 요청입니다.")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(400, "헤더가 너무 많습니다.")
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length 값이 올바르지 않습니다.")
+        if length < 0:
+            raise HTTPError(400, "Content-Length 값이 올바르지 않습니다.")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "요청 본문이 너무 큽니다.")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target.split('?', 1)[0], headers, body
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        if isinstance(payload, TextResponse):
+            body, content_type = payload.text.encode('utf-8'), payload.content_type
+        else:
+            body = json.dumps(to_json_safe(payload), ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        start = time.perf_counter()
+        status, payload = await self._route(method, path, body)
+        path_label = path if any(route_path == path for _, route_path in self.routes) else 'other'
+        HTTP_REQUESTS.inc(method=method, path=path_label, status=status)
+        HTTP_LATENCY.observe(time.perf_counter() - start, path=path_label)
+        return status, payload
+
+    async def _route(self, method, path, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            allowed = any(route_path == path for _, route_path in self.routes)
+            return (405, {'error': "허용되지 않는 메서드입니다."}) if allowed else (404, {'error': "없는 경로입니다."})
+
+        self.counters['requests'] += 1
+        try:
+            payload = json.loads(body.decode('utf-8')) if body else {}
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "요청 본문은 JSON 객체여야 합니다.")
+            with profiling.trace(f"{method} {path}"):
+                return 200, await handler(payload)
+        except json.JSONDecodeError as e:
+            self.counters['errors'] += 1
+            return 400, {'error': f"JSON 형식 오류: {e}"}
+        except HTTPError as e:
+            self.counters['errors'] += 1
+            return e.status, {'error': e.message}
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            return 504, {'error': f"요청 처리 시간이 {self.timeout}초를 넘었습니다."}
+        except Exception as e:
+            self.counters['errors'] += 1
+            return 500, {'error': str(e)}
+
+    async def run_limited(self, func, *args):
+        """
+        동시 처리 수 제한과 시간 제한을 적용해 func를 스레드 풀에서 실행합니다.
+        """
+        async def run():
+            async with self._semaphore:
+                self.counters['in_flight'] += 1
+                HTTP_IN_FLIGHT.inc()
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(self.executor, profiling.bind(func), *args)
+                finally:
+                    self.counters['in_flight'] -= 1
+                    HTTP_IN_FLIGHT.dec()
+        return await asyncio.wait_for(run(), self.timeout)
+
+    ############################ 엔드포인트 ############################
+
+    async def handle_health(self, payload):
+        return {'status': 'ok', 'offline': geocoding.OFFLINE_MODE}
+
+    async def handle_stats(self, payload):
+        return {**self.counters, 'max_concurrency': self.max_concurrency, 'timeout': self.timeout}
+
+    async def handle_metrics(self, payload):
+        return TextResponse(metrics.render(), metrics.CONTENT_TYPE)
+
+    async def handle_cluster(self, payload):
+        # location 주소 조회(카카오 API)는 블로킹이므로 계산과 함께 스레드 풀에서 실행 (시간 제한/동시 처리 수는 요청당 한 번)
+        def work():
+            profile = parse_profile(payload, require_location=False)
+            return self.engine.predict_cluster(profile)
+        cluster = await self.run_limited(work)
+        return {'cluster': int(cluster)}
+
+    async def handle_itinerary(self, payload):
+        def work():
+            profile = parse_profile(payload)
+            return self.engine.recommend(profile)
+        itinerary = await self.run_limited(work)
+        return itinerary.to_dict()
+
+    async def handle_lodging(self, payload):
+        try:
+            x, y = float(_require(payload, 'x')), float(_require(payload, 'y'))
+            boundary = float(payload.get('boundary', LODGING_BOUNDARY_KM))
+            top_k = int(payload.get('top_k', 1))
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, f"입력값 형식이 올바르지 않습니다: {e}")
+        traffic, cp_status = _require(payload, 'traffic'), _require(payload, 'cp_status')
+
+        lodgings = await self.run_limited(get_lodging_score_result, x, y, boundary, traffic, cp_status, top_k)
+        return {'lodgings': lodgings}
+
+############################ 실행 ############################
+
+async def run_server(host=HOST, port=PORT, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                     timeout=REQUEST_TIMEOUT_SECONDS, workers=WORKER_THREADS):
+    server = RecommendationServer(host=host, port=port, max_concurrency=max_concurrency, timeout=timeout, workers=workers)
+    await server.start()
+    metrics.start_dumper_from_env()
+    print(f"추천 서버 실행 중: http://{server.host}:{server.port} (오프라인 모드: {geocoding.OFFLINE_MODE})")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여행 추천 로컬 HTTP 서버")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--max-concurrency', type=int, default=MAX_CONCURRENT_REQUESTS)
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT_SECONDS)
+    parser.add_argument('--workers', type=int, default=WORKER_THREADS)
+    parser.add_argument('--online', action='store_true', help="카카오 API 사용 (기본은 오프라인)")
+    args = parser.parse_args()
+
+    geocoding.OFFLINE_MODE = not args.online
+    try:
+        asyncio.run(run_server(args.host, args.port, args.max_concurrency, args.timeout, args.workers))
+    except KeyboardInterrupt:
+        pass
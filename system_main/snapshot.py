@@ -0,0 +1,123 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from profiling import stage
+import metrics
+import dtypes
+
+# 스냅샷 저장 경로
+SNAPSHOT_DIR = 'data/cache'
+
+# 스냅샷 형식이 바뀌면 값을 올려서 기존 스냅샷을 모두 무효화
+SNAPSHOT_VERSION = 2
+
+# 프로세스 내 메모리 캐시 {이름: (지문, 데이터프레임)}
+_memory_snapshots = {}
+
+############################ 지문 계산 ############################
+
+def file_fingerprint(source_files):
+    """
+    원본 파일들의 크기와 수정 시각으로 지문(fingerprint)을 만듭니다.
+    파일이 없으면 None으로 기록하여 생성/삭제도 변경으로 감지합니다.
+    """
+    stats = {}
+    for path in source_files:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stats[path] = [stat.st_size, stat.st_mtime_ns]
+        else:
+            stats[path] = None
+    payload = json.dumps(
+        {'version': SNAPSHOT_VERSION, 'compact_dtypes': dtypes.COMPACT_DTYPES, 'files': stats},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+############################ 저장 / 로드 ############################
+
+def _snapshot_path(name, fingerprint):
+    return os.path.join(SNAPSHOT_DIR, f"{name}-{fingerprint[:16]}.parquet")
+
+def _write_snapshot(df, path):
+    """
+    Parquet(열 기반 바이너리)으로 저장합니다. pyarrow가 없으면 pickle로 대체합니다.
+    """
+    try:
+        df.to_parquet(path, index=False)
+        return path
+    except ImportError:
+        pickle_path = os.path.splitext(path)[0] + '.pkl'
+        df.to_pickle(pickle_path)
+        return pickle_path
+
+def _read_snapshot(path):
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except ImportError:
+            pass
+    pickle_path = os.path.splitext(path)[0] + '.pkl'
+    if os.path.exists(pickle_path):
+        return pd.read_pickle(pickle_path)
+    return None
+
+def _remove_stale_snapshots(name, keep_path):
+    """
+    같은 이름의 예전 스냅샷 파일을 정리합니다.
+    """
+    keep = os.path.splitext(os.path.basename(keep_path))[0]
+    for file_name in os.listdir(SNAPSHOT_DIR):
+        stem, ext = os.path.splitext(file_name)
+        if stem.startswith(f"{name}-") and stem != keep and ext in ('.parquet', '.pkl'):
+            try:
+                os.remove(os.path.join(SNAPSHOT_DIR, file_name))
+            except OSError:
+                pass
+
+def load_or_build(name, source_files, builder):
+    """
+    원본 파일 지문이 같으면 저장된 스냅샷을 그대로 반환하고,
+    하나라도 바뀌었으면 builder()로 다시 만들어 저장합니다.
+    반환된 데이터프레임은 여러 호출자가 공유하므로 수정하지 말고 복사해서 사용해야 합니다.
+    """
+    fingerprint = file_fingerprint(source_files)
+
+    # 1. 메모리에 같은 지문의 스냅샷이 있으면 바로 반환
+    cached = _memory_snapshots.get(name)
+    if cached is not None and cached[0] == fingerprint:
+        metrics.CACHE_REQUESTS.inc(cache=f'snapshot.{name}', result='hit')
+        return cached[1]
+
+    # 2. 디스크 스냅샷 확인
+    path = _snapshot_path(name, fingerprint)
+    df = None
+    try:
+        with stage(f'snapshot.{name}.read') as s:
+            df = _read_snapshot(path)
+            s.rows_out = None if df is None else len(df)
+    except Exception as e:
+        print(f"스냅샷 읽기 중 오류 발생, 다시 생성합니다: {e}")
+
+    # 3. 없으면 새로 생성 후 저장
+    metrics.CACHE_REQUESTS.inc(cache=f'snapshot.{name}', result='miss' if df is None else 'disk')
+    if df is None:
+        with stage(f'snapshot.{name}.build') as s:
+            df = builder()
+            s.rows_out = len(df)
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            written_path = _write_snapshot(df, path)
+            _remove_stale_snapshots(name, written_path)
+        except Exception as e:
+            print(f"스냅샷 저장 중 오류 발생: {e}")
+
+    _memory_snapshots[name] = (fingerprint, df)
+    return df
+
+def clear_memory_snapshots():
+    """
+    프로세스 내 캐시를 비웁니다. (디스크 스냅샷은 유지)
+    """
+    _memory_snapshots.clear()
@@ -0,0 +1,61 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+# 지구 반지름 (km) - 기존 haversine 함수와 동일한 값 사용
+EARTH_RADIUS_KM = 6371.0
+
+class SpatialIndex:
+    """
+    위도/경도 좌표에 대한 공간 인덱스 (라디안 좌표 + haversine BallTree).
+    데이터셋마다 한 번만 만들어 두고 반경 검색과 최근접 검색에 재사용합니다.
+    반환되는 인덱스는 생성 시 넘긴 좌표 배열의 위치(0부터 시작)입니다.
+    """
+
+    def __init__(self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+
+        # 좌표가 비어 있는 행은 인덱스에서 제외하고 원래 위치만 기억
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        self.positions = np.flatnonzero(valid)
+        self.size = len(lat)
+
+        coords = np.radians(np.column_stack([lat[valid], lon[valid]]))
+        self.tree = BallTree(coords, metric='haversine') if len(coords) else None
+
+    def __len__(self):
+        return self.size
+
+    def query_radius(self, lat, lon, radius_km, sort_results=False):
+        """
+        (lat, lon)에서 radius_km 이내의 모든 지점을 반환합니다.
+        반환값: (위치 배열, 거리(km) 배열). 기본은 원래 데이터 순서, sort_results=True면 거리순.
+        """
+        if self.tree is None:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        point = np.radians([[float(lat), float(lon)]])
+        ind, dist = self.tree.query_radius(
+            point, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=sort_results
+        )
+        positions = self.positions[ind[0]]
+        distances = dist[0] * EARTH_RADIUS_KM
+
+        # 원래 데이터 순서를 유지해야 이후 정렬 결과가 기존 방식과 같아짐
+        if not sort_results:
+            order = np.argsort(positions, kind='stable')
+            positions, distances = positions[order], distances[order]
+        return positions, distances
+
+    def query_knn(self, lat, lon, k):
+        """
+        (lat, lon)에서 가장 가까운 k개 지점을 거리순으로 반환합니다.
+        반환값: (위치 배열, 거리(km) 배열)
+        """
+        k = min(int(k), len(self.positions))
+        if self.tree is None or k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        point = np.radians([[float(lat), float(lon)]])
+        dist, ind = self.tree.query(point, k=k)
+        return self.positions[ind[0]], dist[0] * EARTH_RADIUS_KM
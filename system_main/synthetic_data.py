@@ -0,0 +1,545 @@
+import os
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from geo import haversine_pairwise
+from geocoding import REGION_NAME_NORMALIZATION, normalize_region_name
+
+# 원본 데이터 스키마를 따르는 합성 데이터 생성기 (규모 테스트용)
+# 저장소에 포함된 여행/여행객 Master/클러스터/코드 테이블을 기준으로
+# 방문지정보, 활동내역, 이동내역, 소비 카테고리 테이블을 만듭니다.
+DATA_DIR = 'data'
+TRAVEL_FILE = 'tn_travel_여행.csv'
+TRAVELLER_FILE = 'tn_traveller_master_여행객 Master.csv'
+CLUSTER_FILE = 'temp_cluster.csv'
+CODE_FILE = 'tc_codeb_코드B.csv'
+VISIT_AREA_FILE = 'tn_visit_area_info_방문지정보2nd.csv'
+ACTIVITY_FILE = 'tn_activity_his_활동내역.csv'
+MOVE_FILE = 'tn_move_his_이동내역.csv'
+CONSUMPTION_FILE = 'consumption_category.csv'
+MODEL_FILES = ['kprototype_model.pkl', 'kprototype_scaler.json']  # 작업 폴더에 함께 복사할 모델 파일
+BASE_ENCODING = 'cp949'   # 여행/여행객 Master/클러스터/코드 테이블 인코딩 (각 모듈의 'ANSI')
+
+MIN_SCALE, MAX_SCALE = 1, 1000
+SEED = 0
+TRAVEL_BATCH = 20_000          # 한 번에 생성해 파일에 이어 쓰는 여행 수 (메모리 상한)
+PLACES_PER_TRAVEL = 1.0        # 여행 1건당 장소 풀 크기 (규모에 비례해 장소 수도 늘어남)
+MIN_PLACES_PER_KEY = 3         # (시군구, 방문지 유형)마다 최소 장소 수
+VISITS_PER_DAY = (3, 6)        # 하루 방문지 수 범위 (숙소 제외)
+MAX_NIGHTS = 7
+KOREA_BOUNDS = {'lat': (33.0, 38.7), 'lon': (124.5, 131.0)}
+
+# 시/도별 주요 시군구 (시/도 약칭, 시군구, 위도, 경도, 좌표 분포 표준편차(도))
+REGIONS = [
+    ('서울', '종로구', 37.5735, 126.9790, 0.015), ('서울', '중구', 37.5641, 126.9979, 0.012),
+    ('서울', '강남구', 37.5173, 127.0473, 0.018), ('서울', '마포구', 37.5663, 126.9019, 0.015),
+    ('서울', '송파구', 37.5145, 127.1059, 0.015),
+    ('부산', '해운대구', 35.1631, 129.1636, 0.025), ('부산', '중구', 35.1062, 129.0323, 0.010),
+    ('부산', '수영구', 35.1455, 129.1131, 0.010), ('부산', '기장군', 35.2446, 129.2222, 0.040),
+    ('대구', '중구', 35.8694, 128.6062, 0.010), ('대구', '동구', 35.8866, 128.6356, 0.030),
+    ('대구', '수성구', 35.8582, 128.6306, 0.020),
+    ('인천', '중구', 37.4737, 126.6216, 0.030), ('인천', '연수구', 37.4101, 126.6783, 0.020),
+    ('인천', '강화군', 37.7467, 126.4880, 0.060),
+    ('광주', '동구', 35.1461, 126.9231, 0.015), ('광주', '서구', 35.1520, 126.8902, 0.015),
+    ('광주', '북구', 35.1741, 126.9120, 0.020),
+    ('대전', '중구', 36.3255, 127.4213, 0.015), ('대전', '유성구', 36.3622, 127.3562, 0.025),
+    ('대전', '서구', 36.3554, 127.3838, 0.015),
+    ('울산', '남구', 35.5438, 129.3301, 0.015), ('울산', '동구', 35.5049, 129.4166, 0.015),
+    ('울산', '울주군', 35.5623, 129.2424, 0.060),
+    ('세종', '세종시', 36.4800, 127.2890, 0.040),
+    ('경기', '수원시', 37.2636, 127.0286, 0.030), ('경기', '가평군', 37.8315, 127.5105, 0.060),
+    ('경기', '용인시', 37.2411, 127.1776, 0.050), ('경기', '파주시', 37.7599, 126.7800, 0.050),
+    ('경기', '고양시', 37.6584, 126.8320, 0.030),
+    ('강원', '강릉시', 37.7519, 128.8761, 0.050), ('강원', '속초시', 38.2070, 128.5918, 0.020),
+    ('강원', '춘천시', 37.8813, 127.7298, 0.050), ('강원', '평창군', 37.3707, 128.3903, 0.070),
+    ('충북', '청주시', 36.6424, 127.4890, 0.040), ('충북', '충주시', 36.9910, 127.9260, 0.050),
+    ('충북', '단양군', 36.9845, 128.3655, 0.050),
+    ('충남', '천안시', 36.8151, 127.1139, 0.040), ('충남', '공주시', 36.4465, 127.1190, 0.050),
+    ('충남', '태안군', 36.7456, 126.2979, 0.060), ('충남', '보령시', 36.3333, 126.6127, 0.050),
+    ('전북', '전주시', 35.8242, 127.1480, 0.030), ('전북', '군산시', 35.9676, 126.7366, 0.040),
+    ('전북', '남원시', 35.4164, 127.3903, 0.050),
+    ('전남', '여수시', 34.7604, 127.6622, 0.050), ('전남', '순천시', 34.9506, 127.4872, 0.050),
+    ('전남', '목포시', 34.8118, 126.3922, 0.020), ('전남', '담양군', 35.3211, 126.9882, 0.040),
+    ('경북', '경주시', 35.8562, 129.2247, 0.060), ('경북', '안동시', 36.5684, 128.7294, 0.060),
+    ('경북', '포항시', 36.0190, 129.3435, 0.050), ('경북', '울릉군', 37.4844, 130.9057, 0.020),
+    ('경남', '창원시', 35.2280, 128.6811, 0.050), ('경남', '통영시', 34.8544, 128.4332, 0.040),
+    ('경남', '거제시', 34.8806, 128.6211, 0.050), ('경남', '남해군', 34.8377, 127.8924, 0.040),
+    ('제주', '제주시', 33.4996, 126.5312, 0.080), ('제주', '서귀포시', 33.2541, 126.5601, 0.080),
+]
+DONG_NAMES = ['중앙동', '명동', '신흥동', '청운동', '해안동', '용두동', '송정동', '대화동', '남산동', '영동']
+ROAD_WORDS = ['중앙로', '해안로', '공원로', '시장길', '문화로', '역전로', '호수로', '관광로']
+
+# 여행 중 방문지 유형(VISIT_AREA_TYPE_CD) 비율 - 집(21)/숙소(24)는 일정 구조로 따로 만듭니다
+VISIT_TYPE_WEIGHTS = {
+    1: 0.13, 2: 0.06, 3: 0.05, 4: 0.08, 5: 0.03, 6: 0.02, 7: 0.05,
+    8: 0.02, 9: 0.05, 10: 0.08, 11: 0.28, 12: 0.03, 13: 0.03, 22: 0.01, 23: 0.005,
+}
+HOME_TYPE, LODGING_TYPE = 21, 24
+PLACE_WORDS = {
+    1: '공원', 2: '박물관', 3: '미술관', 4: '시장', 5: '레저파크', 6: '테마파크', 7: '둘레길', 8: '축제',
+    9: '터미널', 10: '상점', 11: '식당', 12: '기타', 13: '체험마을', 21: '집', 22: '친구집', 23: '사무실', 24: '호텔',
+}
+UNRATED_TYPES = [21, 22, 23]   # 만족도/재방문/추천 의향이 없는 방문지
+
+# 방문지 유형별 주 활동(ACTIVITY_TYPE_CD) - 나머지는 ACTIVITY_NOISE 확률로 임의 활동
+VISIT_TYPE_ACTIVITY = {
+    1: 4, 2: 3, 3: 3, 4: 2, 5: 3, 6: 3, 7: 4, 8: 3, 9: 7, 10: 2, 11: 1, 12: 6, 13: 3,
+    21: 5, 22: 5, 23: 6, 24: 5,
+}
+ACTIVITY_NOISE = 0.2
+SECOND_ACTIVITY_RATE = 0.3     # 한 방문지에서 활동을 2개 기록한 비율
+
+# 소비 카테고리 (pre_calculation/음식카테고리처리.ipynb 과 같은 방문지 유형, 장소 유형 이름)
+CONSUMPTION_VISIT_TYPES = [4, 8, 10, 11, 12]
+CONSUMPTION_CATEGORIES = {
+    4: (['백화점', '의류점', '음식점', '기타'], [0.3, 0.3, 0.2, 0.2]),
+    8: (['관광 명소', '음식점', '기타'], [0.5, 0.2, 0.3]),
+    10: (['편의점', '의류점', '생활용품점', '카페', '기타'], [0.3, 0.2, 0.2, 0.2, 0.1]),
+    11: (['음식점', '카페', '제과점'], [0.8, 0.15, 0.05]),
+    12: (['기타', '음식점'], [0.8, 0.2]),
+}
+
+# 이동 수단(MVMN_CD_1)
+CAR_CODE, RENTAL_CAR_CODE, WALK_CODE, AIRPLANE_CODE = 1, 2, 15, 9
+CAR_TRAVEL_RATE = 0.59         # 여행의 MVMN_NM이 비어 있을 때 자가용 여행 비율
+PUBLIC_MODES_BY_DISTANCE = [   # (거리 상한 km, 이동 수단 후보, 비율)
+    (2, [15, 13], [0.7, 0.3]),
+    (30, [13, 5, 4, 50], [0.4, 0.3, 0.2, 0.1]),
+    (150, [12, 8, 11], [0.6, 0.25, 0.15]),
+    (np.inf, [7, 12, 6], [0.6, 0.3, 0.1]),
+]
+TRAVEL_SPEED_KMH = 40
+
+VISIT_AREA_COLUMNS = [
+    'VISIT_AREA_ID', 'TRAVEL_ID', 'VISIT_ORDER', 'VISIT_AREA_NM', 'VISIT_START_YMD', 'VISIT_END_YMD',
+    'ROAD_NM_ADDR', 'LOTNO_ADDR', 'X_COORD', 'Y_COORD', 'POI_ID', 'POI_NM', 'RESIDENCE_TIME_MIN',
+    'VISIT_AREA_TYPE_CD', 'REVISIT_YN', 'DGSTFN', 'REVISIT_INTENTION', 'RCMDTN_INTENTION',
+    'SIDO_NM', 'SGG_NM', 'DONG_NM',
+    'REVISIT_YN_NUMERIC', 'Mean_Score', 'Std_Dev', 'Normalized_DGSTFN', 'Calculated_Final_Score',
+]
+ACTIVITY_COLUMNS = ['TRAVEL_ID', 'VISIT_AREA_ID', 'ACTIVITY_TYPE_CD', 'ACTIVITY_TYPE_SEQ', 'RESERVATION_YN']
+MOVE_COLUMNS = [
+    'TRAVEL_ID', 'TRIP_ID', 'START_VISIT_AREA_ID', 'END_VISIT_AREA_ID',
+    'START_DT_MIN', 'END_DT_MIN', 'MVMN_CD_1', 'MVMN_CD_2',
+]
+CONSUMPTION_COLUMNS = VISIT_AREA_COLUMNS + ['CATEGORY']
+
+# 시/도 약칭 -> 정식 명칭 (주소 문자열용)
+FULL_REGION_NAMES = {short: full for full, short in REGION_NAME_NORMALIZATION.items()}
+# 여행객 Master 거주지 중 정규화 표에 없는 옛 명칭
+RESIDENCE_ALIASES = {'강원도': '강원'}
+
+############################ 코드 / 기준 테이블 ############################
+
+def load_code_domains(data_dir=DATA_DIR):
+    """
+    코드 테이블에서 {코드 그룹: {코드(int): 코드명}}을 만듭니다. (숫자 코드 그룹만)
+    """
+    code = pd.read_csv(os.path.join(data_dir, CODE_FILE), encoding=BASE_ENCODING)
+    domains = {}
+    for cd_a, group in code.groupby('cd_a'):
+        cd_b = pd.to_numeric(group['cd_b'], errors='coerce')
+        if cd_b.notna().all():
+            domains[cd_a] = dict(zip(cd_b.astype(int), group['cd_nm']))
+    return domains
+
+def check_code_domains(domains):
+    """
+    생성기에서 쓰는 코드가 코드 테이블(VIS/ACT/MOV)에 모두 있는지 확인합니다.
+    """
+    used = {
+        'VIS': set(VISIT_TYPE_WEIGHTS) | {HOME_TYPE, LODGING_TYPE} | set(VISIT_TYPE_ACTIVITY),
+        'ACT': set(VISIT_TYPE_ACTIVITY.values()),
+        'MOV': {CAR_CODE, RENTAL_CAR_CODE, WALK_CODE, AIRPLANE_CODE}
+               | {code for _, codes, _ in PUBLIC_MODES_BY_DISTANCE for code in codes},
+    }
+    for cd_a, codes in used.items():
+        missing = codes - set(domains.get(cd_a, {}))
+        if missing:
+            raise ValueError(f"코드 테이블에 없는 {cd_a} 코드: {sorted(missing)}")
+
+def load_base_travels(data_dir=DATA_DIR):
+    """
+    여행 테이블에 여행객 Master의 거주지/목적지를 붙인 기준 여행 목록
+    """
+    tv = pd.read_csv(os.path.join(data_dir, TRAVEL_FILE), encoding=BASE_ENCODING)
+    tm = pd.read_csv(os.path.join(data_dir, TRAVELLER_FILE), encoding=BASE_ENCODING)
+    travels = tv[['TRAVEL_ID', 'TRAVELER_ID', 'TRAVEL_START_YMD', 'TRAVEL_END_YMD', 'MVMN_NM']].merge(
+        tm[['TRAVELER_ID', 'TRAVEL_STATUS_RESIDENCE', 'TRAVEL_STATUS_DESTINATION']].drop_duplicates('TRAVELER_ID'),
+        on='TRAVELER_ID', how='left'
+    )
+    start = pd.to_datetime(travels['TRAVEL_START_YMD'])
+    nights = (pd.to_datetime(travels['TRAVEL_END_YMD']) - start).dt.days
+    travels['START_DATE'] = start.values.astype('datetime64[D]')
+    travels['NIGHTS'] = nights.fillna(0).clip(0, MAX_NIGHTS).astype(int)
+    return travels
+
+def replica_ids(ids, replica):
+    """
+    규모를 늘릴 때 복제한 여행/여행객 ID (0번 복제본은 원래 ID 그대로)
+    """
+    if replica == 0:
+        return ids
+    return ids.astype(str) + f'_{replica}'
+
+############################ 지역 / 장소 풀 ############################
+
+class PlacePool:
+    """
+    (시군구, 방문지 유형)별 장소 목록. 장소마다 이름/주소/좌표/품질(만족도 평균)/소비 카테고리를 가집니다.
+    같은 키의 장소는 연속된 위치에 있어 start/count로 바로 뽑을 수 있습니다.
+    """
+
+    def __init__(self, n_places, rng):
+        regions = pd.DataFrame(REGIONS, columns=['SIDO_NM', 'SGG_NM', 'LAT', 'LON', 'SPREAD'])
+        self.regions = regions
+        self.types = np.array(sorted(set(VISIT_TYPE_WEIGHTS) | {LODGING_TYPE}))
+        self.type_slot = {visit_type: i for i, visit_type in enumerate(self.types)}
+        # 시/도 -> 시군구 위치 목록
+        self.sido_regions = {sido: group.index.to_numpy() for sido, group in regions.groupby('SIDO_NM', sort=False)}
+
+        # 시/도 비중은 같게, 시/도 안에서 시군구도 같게 나눔
+        region_weight = 1.0 / regions['SIDO_NM'].map(regions['SIDO_NM'].value_counts()).to_numpy() / len(self.sido_regions)
+        type_weight = np.array([VISIT_TYPE_WEIGHTS.get(t, 0.05) for t in self.types])
+        type_weight = type_weight / type_weight.sum()
+        counts = np.maximum(MIN_PLACES_PER_KEY, np.round(n_places * region_weight[:, None] * type_weight[None, :])).astype(int)
+
+        self.counts = counts.ravel()
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+        total = int(self.counts.sum())
+        key = np.repeat(np.arange(len(self.counts)), self.counts)
+        region = key // len(self.types)
+        visit_type = self.types[key % len(self.types)]
+        number = np.arange(total) - self.starts[key] + 1
+
+        spread = regions['SPREAD'].to_numpy()[region]
+        self.lat = np.clip(regions['LAT'].to_numpy()[region] + rng.normal(0, 1, total) * spread, *KOREA_BOUNDS['lat']).round(6)
+        self.lon = np.clip(regions['LON'].to_numpy()[region] + rng.normal(0, 1, total) * spread, *KOREA_BOUNDS['lon']).round(6)
+        self.region = region
+        self.visit_type = visit_type
+        self.quality = np.clip(rng.normal(4.0, 0.5, total), 1, 5)
+
+        sido = regions['SIDO_NM'].to_numpy()[region]
+        sgg = regions['SGG_NM'].to_numpy()[region]
+        words = np.array([PLACE_WORDS[t] for t in visit_type], dtype=object)
+        dong = np.array(DONG_NAMES, dtype=object)[rng.integers(0, len(DONG_NAMES), total)]
+        road = np.array(ROAD_WORDS, dtype=object)[rng.integers(0, len(ROAD_WORDS), total)]
+        full_sido = np.array([FULL_REGION_NAMES.get(s, s) for s in sido], dtype=object)
+        number_text = number.astype(str).astype(object)
+        self.sido, self.sgg, self.dong = sido, sgg, dong
+        self.name = sgg + ' ' + words + ' ' + number_text
+        self.road_addr = full_sido + ' ' + sgg + ' ' + road + ' ' + number_text
+        self.lotno_addr = full_sido + ' ' + sgg + ' ' + dong + ' ' + (number * 7 % 997 + 1).astype(str).astype(object)
+        self.poi_id = np.char.add('SP', np.char.zfill(np.arange(1, total + 1).astype(str), 8)).astype(object)
+
+        # 소비 카테고리는 장소마다 고정
+        self.category = np.full(total, None, dtype=object)
+        for visit_type_cd, (names, weights) in CONSUMPTION_CATEGORIES.items():
+            rows = np.flatnonzero(visit_type == visit_type_cd)
+            self.category[rows] = np.array(names, dtype=object)[rng.choice(len(names), len(rows), p=weights)]
+
+    def pick(self, regions, visit_types, rng):
+        """
+        (시군구 위치, 방문지 유형)마다 장소 하나를 고릅니다. 앞쪽 장소일수록 자주 선택됩니다. (인기 장소 편중)
+        """
+        keys = regions * len(self.types) + np.array([self.type_slot[t] for t in visit_types], dtype=int)
+        counts = self.counts[keys]
+        return self.starts[keys] + np.minimum((counts * rng.random(len(keys)) ** 2).astype(int), counts - 1)
+
+    def random_region(self, sido_names, rng):
+        """
+        시/도 약칭마다 그 시/도의 시군구 하나 (목록에 없는 시/도는 전체 시군구 중 임의 선택)
+        """
+        result = rng.integers(0, len(self.regions), len(sido_names))
+        for sido, positions in self.sido_regions.items():
+            rows = np.flatnonzero(sido_names == sido)
+            if len(rows):
+                result[rows] = positions[rng.integers(0, len(positions), len(rows))]
+        return result
+
+############################ 방문지 / 활동 / 이동 생성 ############################
+
+def _travel_layout(nights, rng):
+    """
+    여행별 일정 구조. 집 -> (날마다 방문지 여러 곳 + 마지막 날을 빼고 숙소) -> 집 순서입니다.
+    반환값: 행마다 (여행 위치, 일차, 일차 내 순서, 종류) - 종류 0=집(출발), 1=방문지, 2=숙소, 3=집(귀가)
+    """
+    n_days = nights + 1
+    day_travel = np.repeat(np.arange(len(nights)), n_days)
+    day_no = np.arange(len(day_travel)) - np.repeat(np.cumsum(n_days) - n_days, n_days)
+    visits = rng.integers(VISITS_PER_DAY[0], VISITS_PER_DAY[1] + 1, len(day_travel))
+    lodge = day_no < nights[day_travel]
+    day_len = visits + lodge
+
+    row_day = np.repeat(np.arange(len(day_travel)), day_len)
+    pos = np.arange(len(row_day)) - np.repeat(np.cumsum(day_len) - day_len, day_len)
+    middle_travel = day_travel[row_day]
+    middle_kind = np.where(pos >= visits[row_day], 2, 1)
+
+    # 여행마다 앞뒤에 집 행을 넣은 위치 계산
+    middle_count = np.bincount(middle_travel, minlength=len(nights))
+    total = middle_count + 2
+    travel_start = np.cumsum(total) - total
+    n_rows = int(total.sum())
+    travel = np.repeat(np.arange(len(nights)), total)
+    day = np.zeros(n_rows, dtype=int)
+    order = np.zeros(n_rows, dtype=int)
+    kind = np.zeros(n_rows, dtype=int)
+
+    middle_at = np.arange(len(row_day)) + 2 * middle_travel + 1
+    day[middle_at], order[middle_at], kind[middle_at] = day_no[row_day], pos, middle_kind
+    end_at = travel_start + total - 1
+    day[end_at], kind[end_at] = nights, 3
+    return travel, day, order, kind, row_day, middle_at
+
+def _calculated_final_score(visits):
+    """
+    pre_calculation/음식_만족도생성코드.ipynb 의 Calculated_Final_Score 계산과 같은 방식
+    """
+    visits['REVISIT_YN_NUMERIC'] = visits['REVISIT_YN'].map({'Y': 1, 'N': 0})
+    stats = visits.groupby('TRAVEL_ID')['DGSTFN']
+    visits['Mean_Score'] = stats.transform('mean')
+    visits['Std_Dev'] = stats.transform('std')
+    visits['Normalized_DGSTFN'] = ((visits['DGSTFN'] - visits['Mean_Score']) / visits['Std_Dev']).fillna(0)
+
+    revisit_factor = np.where(visits['REVISIT_INTENTION'] <= 2, 0.7, 1.0)
+    mismatch_factor = np.where((visits['REVISIT_INTENTION'] <= 2) & (visits['RCMDTN_INTENTION'] > 3), 0.8, 1.0)
+    visits['Calculated_Final_Score'] = (
+        0.25 * visits['REVISIT_YN_NUMERIC'] +
+        0.40 * visits['Normalized_DGSTFN'] +
+        0.20 * revisit_factor +
+        0.15 * visits['RCMDTN_INTENTION'] * mismatch_factor
+    ).round(2)
+    return visits
+
+def _rating(quality, rng):
+    return np.clip(np.round(quality + rng.normal(0, 0.7, len(quality))), 1, 5)
+
+def _timestamp(dates, minutes):
+    stamps = dates.astype('datetime64[m]') + minutes.astype('timedelta64[m]')
+    return np.char.replace(np.datetime_as_string(stamps, unit='m').astype(str), 'T', ' ')
+
+def generate_batch(travels, pool, rng, id_offset):
+    """
+    여행 묶음 하나의 방문지/활동/이동/소비 테이블을 만듭니다.
+    id_offset: 이전 묶음까지 사용한 VISIT_AREA_ID 수 (ID는 전체에서 유일)
+    """
+    nights = travels['NIGHTS'].to_numpy()
+    travel, day, order, kind, row_day, middle_at = _travel_layout(nights, rng)
+    n_rows = len(travel)
+
+    # 장소 선택 - 방문지/숙소는 그날의 목적지 시군구, 집은 거주지 시군구
+    destination = np.array([normalize_region_name(v) for v in travels['TRAVEL_STATUS_DESTINATION'].fillna('')], dtype=object)
+    residence = np.array([
+        RESIDENCE_ALIASES.get(v, normalize_region_name(v)) for v in travels['TRAVEL_STATUS_RESIDENCE'].fillna('')
+    ], dtype=object)
+    day_region = pool.random_region(destination[np.repeat(np.arange(len(nights)), nights + 1)], rng)
+    home_region = pool.random_region(residence, rng)
+
+    is_home = (kind == 0) | (kind == 3)
+    middle = ~is_home
+    visit_type = np.full(n_rows, HOME_TYPE)
+    type_codes = np.array(list(VISIT_TYPE_WEIGHTS))
+    type_p = np.array(list(VISIT_TYPE_WEIGHTS.values()))
+    visit_type[middle_at] = np.where(
+        kind[middle_at] == 2, LODGING_TYPE, rng.choice(type_codes, len(middle_at), p=type_p / type_p.sum())
+    )
+    place = np.full(n_rows, -1)
+    place[middle_at] = pool.pick(day_region[row_day], visit_type[middle_at], rng)
+
+    lat = np.empty(n_rows)
+    lon = np.empty(n_rows)
+    lat[middle], lon[middle] = pool.lat[place[middle]], pool.lon[place[middle]]
+    # 집 좌표는 여행객마다 거주지 시군구 안의 한 점
+    home_spread = pool.regions['SPREAD'].to_numpy()[home_region]
+    home_lat = np.clip(pool.regions['LAT'].to_numpy()[home_region] + rng.normal(0, 1, len(nights)) * home_spread, *KOREA_BOUNDS['lat']).round(6)
+    home_lon = np.clip(pool.regions['LON'].to_numpy()[home_region] + rng.normal(0, 1, len(nights)) * home_spread, *KOREA_BOUNDS['lon']).round(6)
+    lat[is_home], lon[is_home] = home_lat[travel[is_home]], home_lon[travel[is_home]]
+
+    def place_values(values, home_values):
+        out = np.empty(n_rows, dtype=object)
+        out[middle] = values[place[middle]]
+        out[is_home] = home_values
+        return out
+
+    region_of_row = np.where(middle, pool.region[np.maximum(place, 0)], home_region[travel])
+    dates = travels['START_DATE'].to_numpy().astype('datetime64[D]')[travel] + day.astype('timedelta64[D]')
+    end_dates = dates + (kind == 2).astype('timedelta64[D]')
+
+    quality = np.where(middle, pool.quality[np.maximum(place, 0)], np.nan)
+    rated = ~np.isin(visit_type, UNRATED_TYPES)
+    dgstfn = np.where(rated, _rating(quality, rng), np.nan)
+    revisit_intention = np.where(rated, _rating(quality, rng), np.nan)
+    rcmdtn_intention = np.where(rated, _rating(quality, rng), np.nan)
+    revisit_yn = np.where(rated, np.where(rng.random(n_rows) < 0.25, 'Y', 'N'), None)
+    residence_time = np.where(kind == 2, rng.integers(600, 900, n_rows), rng.integers(30, 240, n_rows)).astype(float)
+    residence_time[is_home] = np.nan
+
+    travel_ids = travels['TRAVEL_ID'].to_numpy()[travel]
+    visit_area_id = id_offset + np.arange(1, n_rows + 1)
+    travel_start = np.flatnonzero(kind == 0)
+    visit_order = np.arange(n_rows) - np.repeat(travel_start, np.diff(np.append(travel_start, n_rows))) + 1
+
+    visits = pd.DataFrame({
+        'VISIT_AREA_ID': visit_area_id,
+        'TRAVEL_ID': travel_ids,
+        'VISIT_ORDER': visit_order,
+        'VISIT_AREA_NM': place_values(pool.name, PLACE_WORDS[HOME_TYPE]),
+        'VISIT_START_YMD': np.datetime_as_string(dates),
+        'VISIT_END_YMD': np.datetime_as_string(end_dates),
+        'ROAD_NM_ADDR': place_values(pool.road_addr, None),
+        'LOTNO_ADDR': place_values(pool.lotno_addr, None),
+        'X_COORD': lon,
+        'Y_COORD': lat,
+        'POI_ID': place_values(pool.poi_id, None),
+        'POI_NM': place_values(pool.name, None),
+        'RESIDENCE_TIME_MIN': residence_time,
+        'VISIT_AREA_TYPE_CD': visit_type,
+        'REVISIT_YN': revisit_yn,
+        'DGSTFN': dgstfn,
+        'REVISIT_INTENTION': revisit_intention,
+        'RCMDTN_INTENTION': rcmdtn_intention,
+        'SIDO_NM': pool.regions['SIDO_NM'].to_numpy()[region_of_row],
+        'SGG_NM': pool.regions['SGG_NM'].to_numpy()[region_of_row],
+        'DONG_NM': place_values(pool.dong, None),
+    })
+    visits = _calculated_final_score(visits)
+
+    # 활동내역 - 방문지마다 1~2개
+    activity_count = 1 + (rng.random(n_rows) < SECOND_ACTIVITY_RATE)
+    activity_row = np.repeat(np.arange(n_rows), activity_count)
+    activity_seq = np.arange(len(activity_row)) - np.repeat(np.cumsum(activity_count) - activity_count, activity_count) + 1
+    main_activity = np.array([VISIT_TYPE_ACTIVITY[t] for t in visit_type])[activity_row]
+    activity_codes = np.array(sorted(set(VISIT_TYPE_ACTIVITY.values())))
+    noisy = (rng.random(len(activity_row)) < ACTIVITY_NOISE) | (activity_seq > 1)
+    activity_type = np.where(noisy, rng.choice(activity_codes, len(activity_row)), main_activity)
+    activities = pd.DataFrame({
+        'TRAVEL_ID': travel_ids[activity_row],
+        'VISIT_AREA_ID': visit_area_id[activity_row],
+        'ACTIVITY_TYPE_CD': activity_type,
+        'ACTIVITY_TYPE_SEQ': activity_seq,
+        'RESERVATION_YN': np.where(rng.random(len(activity_row)) < 0.1, 'Y', 'N'),
+    })
+
+    # 이동내역 - 여행의 두 번째 방문지부터 (TRIP_ID는 Transports가 도착 방문지로 병합하는 값이므로 도착 VISIT_AREA_ID와 같게)
+    arrive = np.flatnonzero(kind != 0)
+    depart = arrive - 1
+    distance = haversine_pairwise(lat[depart], lon[depart], lat[arrive], lon[arrive])
+    mvmn_nm = travels['MVMN_NM'].to_numpy()
+    car_travel = np.where(pd.isna(mvmn_nm), rng.random(len(nights)) < CAR_TRAVEL_RATE, mvmn_nm == '자가용')[travel[arrive]]
+
+    public_mode = np.zeros(len(arrive), dtype=int)
+    lower = 0
+    for upper, codes, weights in PUBLIC_MODES_BY_DISTANCE:
+        rows = np.flatnonzero((distance >= lower) & (distance < upper))
+        public_mode[rows] = rng.choice(codes, len(rows), p=weights)
+        lower = upper
+    sido_row = visits['SIDO_NM'].to_numpy()
+    crosses_sea = (sido_row[depart] == '제주') != (sido_row[arrive] == '제주')
+    jeju_trip = (destination == '제주')[travel[arrive]]
+    car_mode = np.where(jeju_trip, RENTAL_CAR_CODE, CAR_CODE)
+    mode = np.where(crosses_sea, AIRPLANE_CODE, np.where(car_travel, car_mode, public_mode))
+    mode = np.where(~crosses_sea & (distance < 0.5) & (rng.random(len(arrive)) < 0.5), WALK_CODE, mode)
+    second_mode = np.where((mode != WALK_CODE) & ~car_travel & (rng.random(len(arrive)) < 0.2), WALK_CODE, np.nan)
+
+    # 도착 시각: 집 출발 08시, 방문지는 10시부터 2시간 간격, 귀가는 23시
+    arrive_minutes = np.where(kind[arrive] == 3, 23 * 60, 10 * 60 + 120 * order[arrive])
+    move_minutes = np.maximum(5, distance / TRAVEL_SPEED_KMH * 60).round().astype(int)
+    moves = pd.DataFrame({
+        'TRAVEL_ID': travel_ids[arrive],
+        'TRIP_ID': visit_area_id[arrive],
+        'START_VISIT_AREA_ID': visit_area_id[depart],
+        'END_VISIT_AREA_ID': visit_area_id[arrive],
+        'START_DT_MIN': _timestamp(dates[arrive], arrive_minutes - move_minutes),
+        'END_DT_MIN': _timestamp(dates[arrive], arrive_minutes),
+        'MVMN_CD_1': mode,
+        'MVMN_CD_2': second_mode,
+    })
+
+    # 소비 카테고리 - 소비가 있는 방문지 유형만
+    consumption = visits[np.isin(visit_type, CONSUMPTION_VISIT_TYPES)].copy()
+    consumption['CATEGORY'] = pool.category[place[consumption.index.to_numpy()]]
+
+    return visits[VISIT_AREA_COLUMNS], activities[ACTIVITY_COLUMNS], moves[MOVE_COLUMNS], consumption[CONSUMPTION_COLUMNS]
+
+############################ 전체 생성 ############################
+
+def _copy_base_tables(data_dir, output_dir, scale):
+    """
+    여행/여행객 Master/클러스터 테이블을 scale배로 복제해 쓰고 코드 테이블은 그대로 복사합니다.
+    """
+    for file_name, id_columns in [
+        (TRAVEL_FILE, ['TRAVEL_ID', 'TRAVELER_ID']),
+        (TRAVELLER_FILE, ['TRAVELER_ID']),
+        (CLUSTER_FILE, ['TRAVEL_ID']),
+    ]:
+        base = pd.read_csv(os.path.join(data_dir, file_name), encoding=BASE_ENCODING)
+        path = os.path.join(output_dir, file_name)
+        for replica in range(scale):
+            copy = base.copy()
+            for column in id_columns:
+                copy[column] = replica_ids(copy[column], replica)
+            copy.to_csv(path, index=False, encoding=BASE_ENCODING, mode='w' if replica == 0 else 'a', header=replica == 0)
+    shutil.copyfile(os.path.join(data_dir, CODE_FILE), os.path.join(output_dir, CODE_FILE))
+
+def generate_dataset(workdir='.', scale=1, seed=SEED, data_dir=DATA_DIR, verbose=True):
+    """
+    workdir/data 아래에 방문지정보/활동내역/이동내역/소비 카테고리 테이블을 만듭니다.
+    scale배로 늘릴 때는 여행/여행객 Master/클러스터 테이블도 ID를 바꿔 복제하므로
+    원본 data 폴더가 아닌 다른 작업 폴더를 지정해야 합니다. 이후 그 작업 폴더에서 benchmark.py 등을 실행합니다.
+    반환값: {파일 이름: 행 수}
+    """
+    if not MIN_SCALE <= scale <= MAX_SCALE:
+        raise ValueError(f"scale은 {MIN_SCALE} ~ {MAX_SCALE} 사이여야 합니다: {scale}")
+    output_dir = os.path.join(workdir, 'data')
+    in_place = os.path.abspath(output_dir) == os.path.abspath(data_dir)
+    if scale > 1 and in_place:
+        raise ValueError("scale > 1이면 원본 여행 테이블을 덮어쓰지 않도록 다른 작업 폴더를 지정해야 합니다.")
+
+    rng = np.random.default_rng(seed)
+    check_code_domains(load_code_domains(data_dir))
+    base_travels = load_base_travels(data_dir)
+    pool = PlacePool(int(len(base_travels) * scale * PLACES_PER_TRAVEL), rng)
+
+    os.makedirs(output_dir, exist_ok=True)
+    if not in_place:
+        _copy_base_tables(data_dir, output_dir, scale)
+        for file_name in MODEL_FILES:
+            if os.path.exists(file_name):
+                shutil.copyfile(file_name, os.path.join(workdir, file_name))
+
+    outputs = [
+        (VISIT_AREA_FILE, 'utf-8'), (ACTIVITY_FILE, 'utf-8'), (MOVE_FILE, 'utf-8'), (CONSUMPTION_FILE, 'utf-8-sig'),
+    ]
+    row_counts = {file_name: 0 for file_name, _ in outputs}
+    id_offset = 0
+    first = True
+    for replica in range(scale):
+        travels = base_travels.copy()
+        travels['TRAVEL_ID'] = replica_ids(travels['TRAVEL_ID'], replica)
+        for start in range(0, len(travels), TRAVEL_BATCH):
+            tables = generate_batch(travels.iloc[start:start + TRAVEL_BATCH], pool, rng, id_offset)
+            id_offset += len(tables[0])
+            for (file_name, encoding), table in zip(outputs, tables):
+                # utf-8-sig는 파일 처음에만 BOM을 쓰도록 이어 쓸 때는 utf-8 사용
+                table.to_csv(
+                    os.path.join(output_dir, file_name), index=False, header=first,
+                    mode='w' if first else 'a', encoding=encoding if first else 'utf-8'
+                )
+                row_counts[file_name] += len(table)
+            first = False
+        if verbose:
+            print(f"복제본 {replica + 1}/{scale} 생성 완료 (방문지 {row_counts[VISIT_AREA_FILE]:,}행)")
+    return row_counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="원본 스키마를 따르는 합성 데이터 생성")
+    parser.add_argument('--workdir', default='.', help="출력 작업 폴더 (테이블은 <workdir>/data에 저장)")
+    parser.add_argument('--scale', type=int, default=1, help=f"여행 수 배율 ({MIN_SCALE} ~ {MAX_SCALE})")
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    counts = generate_dataset(workdir=args.workdir, scale=args.scale, seed=args.seed)
+    for file_name, count in counts.items():
+        print(f"{file_name}: {count:,}행")
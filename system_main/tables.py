@@ -0,0 +1,172 @@
+import os
+import codecs
+import threading
+import pandas as pd
+from snapshot import load_or_build
+import dtypes
+
+# 데이터셋 원본 표 목록 {이름: (CSV 경로, category로 바꾸지 않을 컬럼)}
+# 나중에 .map()으로 숫자로 바꾸는 컬럼은 문자열로 유지합니다. (dtypes.compact 참고)
+TABLES = {
+    'travel': ('data/tn_travel_여행.csv', ['MVMN_NM']),
+    'traveller_master': ('data/tn_traveller_master_여행객 Master.csv', ['TRAVEL_STATUS_ACCOMPANY']),
+    'activity_his': ('data/tn_activity_his_활동내역.csv', []),
+    'visit_area': ('data/tn_visit_area_info_방문지정보2nd.csv', []),
+    'move_his': ('data/tn_move_his_이동내역.csv', []),
+    'code': ('data/tc_codeb_코드B.csv', []),
+    'cluster': ('data/temp_cluster.csv', []),
+    'consumption': ('data/consumption_category.csv', []),
+}
+
+# 방문지 표는 쓰는 곳(consumer)마다 필요한 컬럼과 방문지 유형(VISIT_AREA_TYPE_CD)만 나눠 읽습니다.
+# include_types/exclude_types 조건은 읽는 중에 청크마다 적용하므로 전체 파일이 메모리에 올라오지 않습니다.
+VISIT_AREA_TYPE_COLUMN = 'VISIT_AREA_TYPE_CD'
+LODGING_TYPES = [24]                                # 숙박
+NON_ACTIVITY_TYPES = [9, 10, 11, 12, 21, 22, 23, 24]  # 액티비티 추천에서 제외하는 유형 (activity.preprocessed와 동일)
+VISIT_AREA_PARTITIONS = {
+    'activity': {
+        'columns': ['VISIT_AREA_ID', 'TRAVEL_ID', 'VISIT_AREA_NM', 'ROAD_NM_ADDR', 'X_COORD', 'Y_COORD',
+                    'REVISIT_YN', 'DGSTFN', 'REVISIT_INTENTION', 'RCMDTN_INTENTION', 'Calculated_Final_Score',
+                    'SIDO_NM', 'SGG_NM', 'DONG_NM', VISIT_AREA_TYPE_COLUMN],
+        'exclude_types': NON_ACTIVITY_TYPES,
+    },
+    'lodging': {
+        'columns': ['TRAVEL_ID', 'VISIT_AREA_NM', 'ROAD_NM_ADDR', 'X_COORD', 'Y_COORD', 'REVISIT_YN', 'DGSTFN',
+                    'REVISIT_INTENTION', 'RCMDTN_INTENTION', 'VISIT_START_YMD', 'VISIT_END_YMD', VISIT_AREA_TYPE_COLUMN],
+        'include_types': LODGING_TYPES,
+    },
+    'transport': {'columns': ['TRAVEL_ID', 'VISIT_AREA_ID', 'X_COORD', 'Y_COORD']},
+    'region_points': {'columns': ['X_COORD', 'Y_COORD', 'SIDO_NM', 'SGG_NM']},
+    'places': {'columns': ['VISIT_AREA_NM', 'ROAD_NM_ADDR', 'LOTNO_ADDR', 'X_COORD', 'Y_COORD', 'SIDO_NM', 'SGG_NM', 'DONG_NM']},
+}
+CHUNK_ROWS = 50_000   # 나눠 읽을 때 한 번에 읽는 행 수 (최대 메모리는 이 값에 비례)
+
+# 인코딩 판별 순서 (Windows에서 저장한 'ANSI' 파일은 한국어 환경에서 cp949)
+ENCODING_CANDIDATES = ['utf-8', 'cp949']
+DETECT_CHUNK_BYTES = 1024 * 1024
+
+# 파일별 판별된 인코딩, 표 이름별 읽기 잠금 (같은 파일을 여러 스레드가 동시에 읽지 않도록)
+_encodings = {}
+_locks = {}
+_locks_lock = threading.Lock()
+
+############################ 인코딩 판별 ############################
+
+def detect_encoding(path):
+    """
+    파일 전체를 나눠 읽으며 오류 없이 디코딩되는 첫 인코딩을 반환합니다. (UTF-8 BOM이 있으면 utf-8-sig)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8:
+            return 'utf-8-sig'
+
+    for encoding in ENCODING_CANDIDATES:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(DETECT_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"파일 인코딩을 판별할 수 없습니다: {path} (시도: {ENCODING_CANDIDATES})")
+
+def file_encoding(path):
+    path = os.path.normpath(path)
+    if path not in _encodings:
+        _encodings[path] = detect_encoding(path)
+    return _encodings[path]
+
+############################ 표 읽기 ############################
+
+def _table_name(path):
+    """
+    경로에 해당하는 표 이름 (목록에 없으면 파일 이름)
+    """
+    path = os.path.normpath(path)
+    for name, (table_path, _) in TABLES.items():
+        if os.path.normpath(table_path) == path:
+            return name
+    return os.path.splitext(os.path.basename(path))[0]
+
+def _lock_for(name):
+    with _locks_lock:
+        return _locks.setdefault(name, threading.Lock())
+
+def _parse_csv(path, exclude):
+    df = pd.read_csv(path, encoding=file_encoding(path))
+    return dtypes.compact(df, float32=False, exclude=exclude)
+
+def load_csv(path):
+    """
+    CSV 파일을 표로 읽습니다. 처음 한 번만 파싱하고 바이너리 스냅샷(data/cache)에 저장하며,
+    이후에는 같은 프로세스 안에서 메모리의 표를 공유합니다. (파일이 바뀌면 다시 파싱)
+    반환값은 공유된 표의 얕은 복사본이라 컬럼을 추가/변경해도 다른 호출자에게 영향이 없습니다.
+    (pandas Copy-on-Write: 데이터는 수정하는 순간에만 복사됨)
+    """
+    path = os.path.normpath(path)   # './data/a.csv'와 'data/a.csv'를 같은 파일로 처리
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"파일이 없습니다: {path}")
+    name = _table_name(path)
+    exclude = TABLES[name][1] if name in TABLES else []
+    with _lock_for(name):
+        df = load_or_build(f'table.{name}', [path], lambda: _parse_csv(path, exclude))
+    return df.copy(deep=False)
+
+def read_table(name, columns=None):
+    """
+    TABLES에 등록된 표를 이름으로 읽습니다. columns를 지정하면 해당 컬럼만 반환합니다.
+    """
+    df = load_csv(TABLES[name][0])
+    return df[columns] if columns is not None else df
+
+def table_path(name):
+    return TABLES[name][0]
+
+############################ 방문지 나눠 읽기 ############################
+
+def iter_visit_area_chunks(consumer, path=None, chunk_rows=CHUNK_ROWS):
+    """
+    방문지 CSV를 chunk_rows행씩 읽으며 consumer에 필요한 컬럼과 유형 조건에 맞는 행만 돌려줍니다.
+    파일에 없는 컬럼은 건너뜁니다. (예: LOTNO_ADDR)
+    """
+    path = os.path.normpath(path or table_path('visit_area'))
+    spec = VISIT_AREA_PARTITIONS[consumer]
+    include, exclude = spec.get('include_types'), spec.get('exclude_types')
+    columns = set(spec['columns'])
+    if include is not None or exclude is not None:
+        columns.add(VISIT_AREA_TYPE_COLUMN)
+
+    reader = pd.read_csv(path, encoding=file_encoding(path), usecols=lambda column: column in columns, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            if include is not None:
+                chunk = chunk[chunk[VISIT_AREA_TYPE_COLUMN].isin(include)]
+            if exclude is not None:
+                chunk = chunk[~chunk[VISIT_AREA_TYPE_COLUMN].isin(exclude)]
+            # 원래 컬럼 순서 유지
+            yield chunk[[c for c in spec['columns'] if c in chunk.columns]]
+
+def _build_visit_area_partition(consumer, path, chunk_rows):
+    # 조건에 맞는 행/컬럼만 모으므로 최대 메모리는 (결과 크기 + 청크 하나)
+    chunks = list(iter_visit_area_chunks(consumer, path, chunk_rows))
+    df = pd.concat(chunks, ignore_index=True)
+    return dtypes.compact(df, float32=False, exclude=TABLES['visit_area'][1])
+
+def read_visit_area(consumer, path=None, chunk_rows=CHUNK_ROWS):
+    """
+    consumer용 방문지 데이터(필요한 컬럼, 조건에 맞는 행만)를 반환합니다.
+    consumer마다 따로 바이너리 스냅샷(table.visit_area.<consumer>)으로 저장하고 메모리에서 공유하므로
+    load_csv와 같이 원본이 바뀌었을 때만 다시 읽습니다.
+    """
+    path = os.path.normpath(path or table_path('visit_area'))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"파일이 없습니다: {path}")
+    name = f"table.{_table_name(path)}.{consumer}"
+    with _lock_for(name):
+        df = load_or_build(name, [path], lambda: _build_visit_area_partition(consumer, path, chunk_rows))
+    return df.copy(deep=False)
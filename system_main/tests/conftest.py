@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 모듈은 system_main 폴더 기준으로 import하고, 데이터 경로('data/...')도 이 폴더 기준이므로 맞춰 둡니다.
+SYSTEM_MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SYSTEM_MAIN_DIR not in sys.path:
+    sys.path.insert(0, SYSTEM_MAIN_DIR)
+os.chdir(SYSTEM_MAIN_DIR)
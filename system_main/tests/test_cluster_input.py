@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import cluster_input
+from cluster_input import ClusterPredictor, CATEGORICAL_INDICES, FEATURE_COLUMNS
+
+pytestmark = pytest.mark.skipif(
+    not (os.path.exists(cluster_input.MODEL_FILE) and os.path.exists(cluster_input.CLUSTER_FILE)),
+    reason="모델 또는 학습 데이터 파일이 없습니다.",
+)
+
+N_SAMPLES = 40
+# 조회 테이블 범위를 벗어나 모델로 예측하는 입력 (연령대, 동행자 수, 숙박 일수, 이동 수단)
+OUT_OF_RANGE = [
+    (70, 1, 0, 2, 0),
+    (30, cluster_input.LOOKUP_MAX_COMPANIONS + 5, 0, 2, 0),
+    (30, 1, 0, max(cluster_input.LOOKUP_DAYS) + 2, 0),
+]
+
+def legacy_predict(df_cluster, model, model_features, age_grp, cp_num, cp_status, day, purpose, traffic):
+    """
+    기존 cluster_predict: 학습 데이터 + 입력 1행으로 StandardScaler를 다시 학습한 뒤 마지막 행을 예측
+    """
+    input_data = pd.DataFrame({
+        'AGE_GRP': [age_grp],
+        'TRAVEL_COMPANIONS_NUM': [cp_num],
+        'TRAVEL_STATUS_ACCOMPANY': [cp_status],
+        'SLEEP': [day - 1],
+        'ACTIVITY': [', '.join(purpose) if isinstance(purpose, list) else purpose],
+        'RESULT_MVMN': [traffic]
+    })
+    combined = pd.concat([df_cluster.drop(columns=['TRAVEL_ID', 'Cluster']), input_data], ignore_index=True)
+    preprocessed = cluster_input.preprocessing_dataframe(combined, model_features)[FEATURE_COLUMNS]
+    for i in CATEGORICAL_INDICES:
+        column = FEATURE_COLUMNS[i]
+        preprocessed[column] = preprocessed[column].astype(object)
+    return int(model.predict(preprocessed.tail(1), categorical=CATEGORICAL_INDICES)[0])
+
+@pytest.fixture(scope='module')
+def predictor():
+    return ClusterPredictor(use_lookup=False)
+
+@pytest.fixture(scope='module')
+def samples(predictor):
+    """
+    조회 테이블 범위 안의 무작위 입력(고정 시드)과 범위 밖 입력, 각 입력의 기존 방식 예측 결과
+    """
+    rng = np.random.default_rng(0)
+    domains = predictor.lookup_domains()
+    inputs = [
+        tuple(values[rng.integers(len(values))] for values in domains)
+        for _ in range(N_SAMPLES)
+    ]
+    statuses, purposes, traffics = domains[2], domains[4], domains[5]
+    for age_grp, cp_num, status, day, traffic in OUT_OF_RANGE:
+        inputs.append((age_grp, cp_num, statuses[status], day, purposes[0], traffics[traffic]))
+
+    df_cluster, model, model_features = cluster_input.load_data_and_model()
+    expected = [legacy_predict(df_cluster, model, model_features, *args) for args in inputs]
+    return inputs, expected
+
+def test_predict_matches_legacy(predictor, samples):
+    inputs, expected = samples
+    assert [int(predictor.predict(*args)) for args in inputs] == expected
+
+def test_predict_batch_matches_legacy(predictor, samples):
+    inputs, expected = samples
+    profiles = pd.DataFrame(
+        [(age_grp, cp_num, status, day - 1, purpose, traffic) for age_grp, cp_num, status, day, purpose, traffic in inputs],
+        columns=FEATURE_COLUMNS,
+    )
+    assert predictor.predict_batch(profiles, chunk_size=7).tolist() == expected
+
+def test_lookup_table_matches_legacy(tmp_path, samples):
+    inputs, expected = samples
+    lookup_file = str(tmp_path / 'cluster_lookup.npz')
+
+    # 생성자는 조회 테이블을 만들지 않고, 저장된 파일이 없으면 모델로 예측
+    predictor = ClusterPredictor(lookup_file=lookup_file)
+    assert predictor.lookup_table is None
+    assert int(predictor.predict(*inputs[0])) == expected[0]
+    assert predictor.lookup_table is None
+    assert not os.path.exists(lookup_file)
+
+    predictor.build_lookup_table()
+    assert os.path.exists(lookup_file)
+    in_range = inputs[:N_SAMPLES]
+    assert [predictor.lookup_label(*args) for args in in_range] == expected[:N_SAMPLES]
+    assert all(predictor.lookup_label(*args) is None for args in inputs[N_SAMPLES:])
+
+    # 새 예측기는 첫 예측 때 저장된 파일을 불러와 사용
+    reloaded = ClusterPredictor(lookup_file=lookup_file)
+    assert [int(reloaded.predict(*args)) for args in inputs] == expected
+    assert reloaded.lookup_table is not None
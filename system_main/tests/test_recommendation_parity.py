@@ -0,0 +1,214 @@
+import os
+import math
+import numpy as np
+import pandas as pd
+import pytest
+import consumption
+import Lodging
+from Lodging import accompany_mapping
+
+############################ 기존 방식 (기준) ############################
+
+def legacy_food_top_place(consumption_data, cluster_data, sido_nm, sgg_nm, cluster, visited):
+    """
+    기존 food_top_place: 매 호출마다 전체 표를 필터링하고 DataFrame.sample로 1개 선택
+    """
+    relevant_travelers = cluster_data[cluster_data['Cluster'] == cluster]['TRAVEL_ID']
+
+    def filter_data(travelers_filter=True):
+        return consumption_data[
+            ((consumption_data['TRAVEL_ID'].isin(relevant_travelers)) if travelers_filter else True) &
+            (consumption_data['SIDO_NM'] == sido_nm) &
+            (consumption_data['SGG_NM'] == sgg_nm) &
+            (consumption_data['CATEGORY'] == "음식점") &
+            (~consumption_data['VISIT_AREA_NM'].isin(visited))
+        ]
+
+    filtered = filter_data(travelers_filter=True)
+    if filtered.empty:
+        filtered = filter_data(travelers_filter=False)
+    if filtered.empty:
+        return None
+
+    filtered = filtered.copy()
+    min_score = filtered['Calculated_Final_Score'].min()
+    if min_score < 0:
+        filtered['Calculated_Final_Score'] -= min_score
+
+    top_places = filtered.nlargest(10, 'Calculated_Final_Score')
+    if top_places.empty:
+        return None
+    top_places.loc[:, 'Weight'] = (
+        top_places['Calculated_Final_Score'] / top_places['Calculated_Final_Score'].sum()
+    ).fillna(0)
+
+    try:
+        recommended = top_places.sample(n=1, weights=top_places['Weight']).iloc[0]
+    except ValueError:
+        # 남은 후보의 점수가 모두 0이면 가중치 합이 0 (기존 함수는 예외를 잡아 None 반환)
+        return None
+    visited.add(recommended['VISIT_AREA_NM'])
+    return recommended
+
+def legacy_lodging_scores(df, x_coord, y_coord, boundary, mvmn, family):
+    """
+    기존 get_lodging_score_result: 행마다 하버사인 거리와 FINAL_SCORE를 계산 (상위 1개가 아닌 반경 내 전체 반환)
+    """
+    def haversine(lat1, lon1, lat2, lon2):
+        lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+        a = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+        return 6371.0 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    n_mvmn = 0 if (mvmn == '자가용') else 1
+    n_family = accompany_mapping[family]
+
+    df = df.copy()
+    df['DISTANCE'] = [
+        haversine(y_coord, x_coord, lat, lon) for lat, lon in zip(df['Y_COORD'], df['X_COORD'])
+    ]
+    filtered = df[df['DISTANCE'] <= boundary].copy()
+    filtered['FINAL_SCORE'] = filtered.apply(
+        lambda row: row['AVG_SCORE']
+        + ((row['SUM_MVMN_TYPE'] / row['TOTAL_COUNT']) if n_mvmn == 1 else ((row['TOTAL_COUNT'] - row['SUM_MVMN_TYPE']) / row['TOTAL_COUNT'])) * 0.5
+        + ((row['SUM_FAMILY_TPYE'] / row['TOTAL_COUNT']) if n_family == 1 else ((row['TOTAL_COUNT'] - row['SUM_FAMILY_TPYE']) / row['TOTAL_COUNT'])) * 0.5
+        , axis=1
+    )
+    return filtered
+
+############################ 음식점 ############################
+
+food_data_missing = not (os.path.exists(consumption.CONSUMPTION_FILE) and os.path.exists(consumption.CLUSTER_FILE))
+
+CALLS_PER_CASE = 12
+CLUSTERS = [0, 4, 9]
+
+@pytest.fixture(scope='module')
+def food_data():
+    consumption_data = pd.read_csv(consumption.CONSUMPTION_FILE, encoding='utf-8-sig')
+    cluster_data = pd.read_csv(consumption.CLUSTER_FILE, encoding='cp949')
+    restaurants = consumption_data[consumption_data['CATEGORY'] == "음식점"]
+    sizes = restaurants.groupby(['SIDO_NM', 'SGG_NM']).size().sort_values()
+    # 가장 작은 지역과 가장 큰 지역
+    regions = [sizes.index[0], sizes.index[-1]]
+    return consumption_data, cluster_data, restaurants, regions
+
+def region_names(restaurants, region, travel_ids=None):
+    rows = restaurants[(restaurants['SIDO_NM'] == region[0]) & (restaurants['SGG_NM'] == region[1])]
+    if travel_ids is not None:
+        rows = rows[rows['TRAVEL_ID'].isin(travel_ids)]
+    return set(rows['VISIT_AREA_NM'])
+
+def run_both(monkeypatch, food_data, region, cluster, visited, calls=CALLS_PER_CASE, seed=0):
+    """
+    같은 시드로 기존 방식과 새 방식을 번갈아 calls번 호출해 (기존, 새) 결과 목록을 반환
+    """
+    consumption_data, cluster_data, _, _ = food_data
+    monkeypatch.setattr(consumption, 'get_region_from_coords', lambda x, y: region)
+    legacy_visited, new_visited = set(visited), consumption.visited_places
+    new_visited.clear()
+    new_visited.update(visited)
+    legacy_results, new_results = [], []
+    for i in range(calls):
+        np.random.seed(seed + i)
+        row = legacy_food_top_place(consumption_data, cluster_data, *region, cluster, legacy_visited)
+        legacy_results.append(None if row is None else (
+            row['VISIT_AREA_NM'], row['ROAD_NM_ADDR'], row['X_COORD'], row['Y_COORD']
+        ))
+
+        np.random.seed(seed + i)
+        result = consumption.food_top_place(0, 0, cluster)
+        new_results.append(None if result is None else (
+            result['VISIT_AREA_NM'], result['ROAD_NM_ADDR'], result['X_COORD'], result['Y_COORD']
+        ))
+    assert legacy_visited == new_visited
+    new_visited.clear()
+    return legacy_results, new_results
+
+def assert_same_results(legacy_results, new_results):
+    assert len(legacy_results) == len(new_results)
+    for legacy, new in zip(legacy_results, new_results):
+        if legacy is None or new is None:
+            assert legacy is None and new is None
+            continue
+        assert new[0] == legacy[0]
+        assert (pd.isna(new[1]) and pd.isna(legacy[1])) or new[1] == legacy[1]
+        assert new[2] == pytest.approx(legacy[2]) and new[3] == pytest.approx(legacy[3])
+
+@pytest.mark.skipif(food_data_missing, reason="음식점/클러스터 데이터 파일이 없습니다.")
+@pytest.mark.parametrize('cluster', CLUSTERS)
+def test_food_sequence_matches_legacy(monkeypatch, food_data, cluster):
+    for region in food_data[3]:
+        legacy_results, new_results = run_both(monkeypatch, food_data, region, cluster, set())
+        assert all(result is not None for result in new_results)
+        assert_same_results(legacy_results, new_results)
+
+@pytest.mark.skipif(food_data_missing, reason="음식점/클러스터 데이터 파일이 없습니다.")
+@pytest.mark.parametrize('cluster', CLUSTERS)
+def test_food_cluster_fallback_matches_legacy(monkeypatch, food_data, cluster):
+    # 클러스터 여행객의 음식점을 모두 방문한 상태 -> 클러스터 제한 해제 경로
+    _, cluster_data, restaurants, regions = food_data
+    travel_ids = cluster_data[cluster_data['Cluster'] == cluster]['TRAVEL_ID']
+    for region in regions:
+        visited = region_names(restaurants, region, travel_ids)
+        legacy_results, new_results = run_both(monkeypatch, food_data, region, cluster, visited)
+        assert all(result is not None and result[0] not in visited for result in new_results)
+        assert_same_results(legacy_results, new_results)
+
+@pytest.mark.skipif(food_data_missing, reason="음식점/클러스터 데이터 파일이 없습니다.")
+def test_food_exhausted_matches_legacy(monkeypatch, food_data):
+    # 남은 음식점이 3곳뿐이면 모두 추천한 뒤에는 None (추천할 음식점 없음)
+    _, _, restaurants, regions = food_data
+    for region in regions:
+        names = sorted(region_names(restaurants, region))
+        visited = set(names[3:])
+        legacy_results, new_results = run_both(monkeypatch, food_data, region, CLUSTERS[0], visited, calls=5)
+        assert 0 < sum(result is not None for result in new_results) <= 3
+        assert new_results[3:] == [None, None]
+        assert_same_results(legacy_results, new_results)
+
+@pytest.mark.skipif(food_data_missing, reason="음식점/클러스터 데이터 파일이 없습니다.")
+def test_food_fully_visited_and_unknown_region(monkeypatch, food_data):
+    _, _, restaurants, regions = food_data
+    for region in regions:
+        visited = region_names(restaurants, region)
+        legacy_results, new_results = run_both(monkeypatch, food_data, region, CLUSTERS[0], visited, calls=2)
+        assert legacy_results == new_results == [None, None]
+
+    legacy_results, new_results = run_both(monkeypatch, food_data, ('없는 시도', '없는 시군구'), CLUSTERS[0], set(), calls=1)
+    assert legacy_results == new_results == [None]
+
+############################ 숙소 ############################
+
+lodging_data_missing = not all(os.path.exists(path) for path in Lodging.LODGING_SOURCE_FILES)
+
+@pytest.fixture(scope='module')
+def lodging_data():
+    grouped = Lodging.load_lodging_data()
+    return grouped, Lodging.LodgingIndex(grouped)
+
+@pytest.mark.skipif(lodging_data_missing, reason="숙박 데이터 파일이 없습니다.")
+@pytest.mark.parametrize('boundary', [1, 5, 20])
+@pytest.mark.parametrize('mvmn, family', [('자가용', '나홀로 여행'), ('기차', '자녀 동반 여행')])
+def test_lodging_query_matches_legacy(lodging_data, boundary, mvmn, family):
+    grouped, index = lodging_data
+    rng = np.random.default_rng(0)
+    for position in rng.choice(len(grouped), size=5, replace=False):
+        x_coord = float(grouped['X_COORD'].iloc[position]) + 0.01
+        y_coord = float(grouped['Y_COORD'].iloc[position]) - 0.01
+
+        legacy = legacy_lodging_scores(grouped, x_coord, y_coord, boundary, mvmn, family)
+        result = index.query(x_coord, y_coord, boundary, mvmn, family, top_k=len(grouped))
+
+        assert set(result['VISIT_AREA_NM']) == set(legacy['VISIT_AREA_NM'])
+        if legacy.empty:
+            assert result.empty
+            continue
+        legacy_scores = legacy.set_index('VISIT_AREA_NM')['FINAL_SCORE']
+        new_scores = result.set_index('VISIT_AREA_NM')['FINAL_SCORE']
+        np.testing.assert_allclose(new_scores.loc[legacy_scores.index], legacy_scores, rtol=1e-6)
+        np.testing.assert_allclose(
+            result.set_index('VISIT_AREA_NM')['DISTANCE'].loc[legacy_scores.index],
+            legacy.set_index('VISIT_AREA_NM')['DISTANCE'], rtol=1e-6,
+        )
+        # 상위 1개 (기존 추천 결과)의 점수가 같아야 함
+        assert result['FINAL_SCORE'].iloc[0] == pytest.approx(legacy['FINAL_SCORE'].max())
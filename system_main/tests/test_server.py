@@ -0,0 +1,59 @@
+import json
+import asyncio
+import pytest
+import server
+
+PROFILE = {
+    'x': 126.9780, 'y': 37.5665, 'age': 30, 'cp_status': '2인 가족 여행', 'cp_num': 1,
+    'nights': 1, 'traffic': '자가용', 'purpose': '쇼핑',
+}
+
+class RecordingEngine:
+    """
+    데이터 없이 서버 입력 검증만 확인하기 위한 엔진 (호출된 프로필을 기록)
+    """
+
+    def __init__(self):
+        self.profiles = []
+
+    def predict_cluster(self, profile):
+        self.profiles.append(profile)
+        return 3
+
+async def _post(port, path, payload):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1')
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    return status, json.loads(body.decode('utf-8'))
+
+def _run(engine, path, payload):
+    async def run():
+        srv = await server.RecommendationServer(engine=engine, port=0).start()
+        try:
+            return await _post(srv.port, path, payload)
+        finally:
+            await srv.close()
+    return asyncio.run(run())
+
+@pytest.mark.parametrize('nights', [-3, server.MAX_NIGHTS + 1, 10_000])
+def test_itinerary_rejects_out_of_range_nights(nights):
+    engine = RecordingEngine()
+    status, body = _run(engine, '/itinerary', {**PROFILE, 'nights': nights})
+    assert status == 400
+    assert 'nights' in body['error']
+    assert engine.profiles == []
+
+def test_cluster_accepts_nights_in_range():
+    engine = RecordingEngine()
+    status, body = _run(engine, '/cluster', {**PROFILE, 'nights': server.MAX_NIGHTS})
+    assert status == 200
+    assert body == {'cluster': 3}
+    assert engine.profiles[0].nights == server.MAX_NIGHTS
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from snapshot import load_or_build
+from Transports import TRANSPORT_SOURCE_FILES, get_transport_engine, category_mapping, transport_priority
+
+# 격자 크기(도) - 촘촘한 격자부터 조회하고 표본이 부족하면 더 큰 격자로 넘어감
+GRID_LEVELS_DEG = [0.02, 0.1, 0.5]
+MIN_SUPPORT = 5          # 한 격자 쌍에서 분포를 믿고 쓸 최소 이동 건수
+
+# 격자 번호 -> 정수 키 변환용 (위도 -90~90, 경도 -180~180 범위를 0 이상으로 이동)
+_LAT_OFFSET_DEG = 90.0
+_LON_OFFSET_DEG = 180.0
+_PAIR_SHIFT = 31         # 출발 격자 키 << 31 | 도착 격자 키
+
+############################ 격자 키 ############################
+
+def cell_keys(lat, lon, grid_deg):
+    """
+    좌표를 grid_deg 크기 격자의 정수 키로 변환합니다.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    n_lon = int(np.ceil(360.0 / grid_deg)) + 1
+    row = np.floor((lat + _LAT_OFFSET_DEG) / grid_deg).astype(np.int64)
+    col = np.floor((lon + _LON_OFFSET_DEG) / grid_deg).astype(np.int64)
+    return row * n_lon + col
+
+def pair_keys(origin_lat, origin_lon, dest_lat, dest_lon, grid_deg):
+    return (cell_keys(origin_lat, origin_lon, grid_deg) << _PAIR_SHIFT) | cell_keys(dest_lat, dest_lon, grid_deg)
+
+############################ OD 집계 ############################
+
+def build_od_counts():
+    """
+    이동내역의 연속된 두 방문지(같은 여행)를 출발/도착 쌍으로 보고,
+    격자 단계별로 (출발 격자, 도착 격자, 이동 수단) 건수를 집계합니다.
+    도착 방문지의 MVMN_CD_1이 그 구간의 이동 수단이며, 한 구간짜리 경로의 대표 이동 수단과 같습니다.
+    """
+    engine = get_transport_engine()
+    row_names, _ = engine.mode_tables(category_mapping, transport_priority)
+
+    origin = np.arange(len(engine) - 1)
+    dest = origin + 1
+    same_travel = engine.travel[origin] == engine.travel[dest]
+    has_coords = ~(np.isnan(engine.lat[origin]) | np.isnan(engine.lon[origin]) |
+                   np.isnan(engine.lat[dest]) | np.isnan(engine.lon[dest]))
+    origin, dest = origin[same_travel & has_coords], dest[same_travel & has_coords]
+
+    mode_codes, mode_names = pd.factorize(row_names[dest])
+    frames = []
+    for level, grid_deg in enumerate(GRID_LEVELS_DEG):
+        keys = pair_keys(engine.lat[origin], engine.lon[origin], engine.lat[dest], engine.lon[dest], grid_deg)
+        counts = pd.DataFrame({'PAIR_KEY': keys, 'MODE_CODE': mode_codes}).value_counts(sort=False).reset_index(name='COUNT')
+        counts.insert(0, 'LEVEL', level)
+        frames.append(counts)
+
+    od_counts = pd.concat(frames, ignore_index=True)
+    od_counts['MODE'] = np.asarray(mode_names, dtype=object)[od_counts.pop('MODE_CODE').to_numpy()]
+    return od_counts.sort_values(['LEVEL', 'PAIR_KEY', 'COUNT'], ascending=[True, True, False], kind='stable').reset_index(drop=True)
+
+############################ OD 행렬 ############################
+
+class ODModeMatrix:
+    """
+    격자 단계별 OD 쌍 x 이동 수단 희소 행렬 (CSR 형태: 쌍마다 indptr 구간에 이동 수단과 건수).
+    쌍 키 -> 행 번호는 사전으로 찾으므로 조회는 상수 시간입니다.
+    """
+
+    def __init__(self, od_counts):
+        modes, mode_codes = np.unique(od_counts['MODE'].to_numpy(dtype=object).astype(str), return_inverse=True)
+        self.modes = modes.tolist()
+        self.levels = []
+        for level in range(len(GRID_LEVELS_DEG)):
+            mask = (od_counts['LEVEL'] == level).to_numpy()
+            keys = od_counts['PAIR_KEY'].to_numpy()[mask]
+            row_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+            self.levels.append({
+                'rows': {int(key): row for row, key in enumerate(keys[row_starts])},
+                'indptr': np.r_[row_starts, len(keys)],
+                'mode_codes': mode_codes[mask],
+                'counts': od_counts['COUNT'].to_numpy()[mask],
+            })
+
+        # 모든 격자에서 표본이 부족할 때 사용할 전체 분포
+        self.total_counts = np.bincount(
+            mode_codes[(od_counts['LEVEL'] == 0).to_numpy()],
+            weights=od_counts['COUNT'].to_numpy()[(od_counts['LEVEL'] == 0).to_numpy()],
+            minlength=len(self.modes)
+        )
+
+    def _distribution(self, mode_codes, counts):
+        order = np.argsort(-counts, kind='stable')
+        total = counts.sum()
+        return {self.modes[code]: float(count / total) for code, count in zip(mode_codes[order], counts[order]) if count > 0}
+
+    def lookup(self, prev_lon, prev_lat, next_lon, next_lat, min_support=MIN_SUPPORT):
+        """
+        출발/도착 좌표 사이의 이동 수단 분포.
+        반환값: {'grid_deg': 사용한 격자 크기(전체 분포면 None), 'support': 이동 건수,
+                 'distribution': {이동 수단: 비율} (비율 내림차순), 'primary': 가장 많은 이동 수단}
+        """
+        for grid_deg, level in zip(GRID_LEVELS_DEG, self.levels):
+            key = int(pair_keys(prev_lat, prev_lon, next_lat, next_lon, grid_deg))
+            row = level['rows'].get(key)
+            if row is None:
+                continue
+            lo, hi = level['indptr'][row], level['indptr'][row + 1]
+            counts = level['counts'][lo:hi]
+            if counts.sum() >= min_support:
+                distribution = self._distribution(level['mode_codes'][lo:hi], counts)
+                return {'grid_deg': grid_deg, 'support': int(counts.sum()),
+                        'distribution': distribution, 'primary': next(iter(distribution))}
+
+        distribution = self._distribution(np.arange(len(self.modes)), self.total_counts)
+        return {'grid_deg': None, 'support': int(self.total_counts.sum()),
+                'distribution': distribution, 'primary': next(iter(distribution), None)}
+
+# 모듈 전역 OD 행렬 (원본 데이터가 바뀌면 다시 생성)
+_od_matrix = {'source': None, 'matrix': None}
+
+def get_od_mode_matrix():
+    od_counts = load_or_build('transport_od', TRANSPORT_SOURCE_FILES, build_od_counts)
+    if _od_matrix['source'] is not od_counts:
+        _od_matrix['matrix'] = ODModeMatrix(od_counts)
+        _od_matrix['source'] = od_counts
+    return _od_matrix['matrix']
+
+def od_mode_distribution(prev_lon, prev_lat, next_lon, next_lat, min_support=MIN_SUPPORT):
+    """
+    "A 지역에서 B 지역으로 갈 때 여행객들이 주로 이용한 이동 수단" 조회
+    """
+    return get_od_mode_matrix().lookup(prev_lon, prev_lat, next_lon, next_lat, min_support)